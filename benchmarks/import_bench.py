@@ -0,0 +1,53 @@
+"""
+Description:
+    Startup cost of kaleidoscope: how long `import kaleidoscope` takes in a fresh
+    interpreter, and how long it takes to get to the point of being able to render (the
+    default Render object built and the formatters loaded).
+
+    python benchmarks/import_bench.py --repeat 10
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+IMPORT_ONLY = '''
+import time
+start = time.perf_counter()
+import kaleidoscope
+print(time.perf_counter() - start)
+'''
+
+FIRST_USE = '''
+import time
+start = time.perf_counter()
+import kaleidoscope
+kaleidoscope.get_renderer()
+kaleidoscope.ensure_formatters_loaded()
+print(time.perf_counter() - start)
+'''
+
+
+def time_snippet(code, repeat):
+    """median seconds reported by code over repeat fresh interpreters"""
+    timings = list()
+    for n in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], check=True,\
+            stdout=subprocess.PIPE, universal_newlines=True).stdout
+        timings.append(float(output.split()[-1]))
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print("import kaleidoscope: {:.1f}ms".format(time_snippet(IMPORT_ONLY,\
+        args.repeat) * 1000))
+    print("ready to render: {:.1f}ms".format(time_snippet(FIRST_USE,\
+        args.repeat) * 1000))
+
+
+if __name__ == '__main__':
+    main()
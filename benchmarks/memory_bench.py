@@ -0,0 +1,57 @@
+"""
+Description:
+    Bytes of memory held per rendered row: the ObjectModel and AttributeModels of each
+    object (with their formatted values), and the ObjectView and AttributeViews made
+    from them, measured with tracemalloc.
+
+    python benchmarks/memory_bench.py --rows 20000 --attributes 10
+"""
+import argparse
+import gc
+import tracemalloc
+
+from kaleidoscope.model import ObjectModel
+
+from render_bench import make_objects, make_spec
+
+
+def held_bytes(build):
+    """bytes still allocated after build() returns (what it returns is kept alive)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--attributes', type=int, default=10)
+    args = parser.parse_args()
+
+    objects = make_objects(args.rows, args.attributes)
+    spec = make_spec(args.attributes)
+
+    def build_models():
+        object_models = [ObjectModel(obj_x, spec, colors=next(spec.colors))\
+            for obj_x in objects]
+        for object_model_x in object_models:
+            for attribute_model_x in object_model_x.attribute_models:
+                attribute_model_x.format_value()
+        return object_models
+
+    model_bytes, object_models = held_bytes(build_models)
+    view_bytes, object_views = held_bytes(lambda: [object_model_x.render_view() for\
+        object_model_x in object_models])
+
+    print("rows: {} | attributes: {}".format(args.rows, args.attributes + 1))
+    print("models: {:.0f} bytes/row".format(model_bytes / args.rows))
+    print("views: {:.0f} bytes/row".format(view_bytes / args.rows))
+    print("total: {:.0f} bytes/row".format((model_bytes + view_bytes) / args.rows))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Description:
+    Rough timing of the model --> view --> text render pipeline for a group of simple
+    objects, without any terminal output.
+
+    python benchmarks/render_bench.py --rows 5000 --attributes 8
+
+    --format-cost makes every attribute go through a CPU heavy formatter, to compare
+    formatting in one process against a process pool (--processes)
+
+    --columnar renders through a RenderTable instead of a model per object/attribute
+"""
+import argparse
+from functools import partial
+import hashlib
+import logging
+import time
+
+from kaleidoscope.model import ObjectModel, GroupModel
+from kaleidoscope.spec import ObjectModelSpec
+
+
+class BenchObject(object):
+    def __init__(self, n, num_attributes):
+        for m in range(num_attributes):
+            setattr(self, 'attr_{}'.format(m), 'value_{}_{}'.format(n, m * n % 97))
+        self.nested = {'key' : n}
+
+
+def make_objects(rows, num_attributes):
+    return [BenchObject(n, num_attributes) for n in range(rows)]
+
+
+def heavy_format(value, rounds):
+    """stand-in for a slow pure-python formatter"""
+    digest = str(value).encode()
+    for n in range(rounds):
+        digest = hashlib.md5(digest).digest()
+    return '{} {}'.format(value, digest.hex()[0:8])
+
+
+def make_spec(num_attributes, format_cost=0):
+    attributes = ['attr_{}'.format(m) for m in range(num_attributes)]
+    if format_cost:
+        formatter = partial(heavy_format, rounds=format_cost)
+        attributes = [(name, None, formatter) for name in attributes]
+    attributes.append("nested['key']")
+    return ObjectModelSpec(colors=['green', 'bright green', 'dim green'],\
+        attributes=attributes)
+
+
+def bench_group_render(objects, num_attributes, align=True, format_cost=0,\
+    processes=None, columnar=False):
+    """time building the models and rendering the group view to text"""
+    start = time.perf_counter()
+    spec = make_spec(num_attributes, format_cost)
+    if columnar:
+        group_model = GroupModel(align=align)
+        output = group_model.render_table_view(objects, spec).get_render_output()
+        return time.perf_counter() - start, len(output)
+
+    object_models = [ObjectModel(obj_x, spec, colors=next(spec.colors))\
+        for obj_x in objects]
+    group_model = GroupModel(object_models=object_models, align=align,\
+        format_processes=processes)
+    output = group_model.render_view().get_render_output()
+    return time.perf_counter() - start, len(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--attributes', type=int, default=6)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-align', dest='align', action='store_false')
+    parser.add_argument('--format-cost', type=int, default=0,\
+        help='md5 rounds per attribute formatted')
+    parser.add_argument('--processes', type=int, default=None,\
+        help='format in a pool of this many processes')
+    parser.add_argument('--columnar', action='store_true')
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level)
+    objects = make_objects(args.rows, args.attributes)
+    timings = list()
+    for n in range(args.repeat):
+        elapsed, output_len = bench_group_render(objects, args.attributes, args.align,\
+            args.format_cost, args.processes, args.columnar)
+        timings.append(elapsed)
+
+    best = min(timings)
+    print("rows: {} | attributes: {} | output: {} chars".format(args.rows,\
+        args.attributes + 1, output_len))
+    print("best of {}: {:.3f}s ({:.0f} rows/s)".format(args.repeat, best,\
+        args.rows / best))
+
+
+if __name__ == '__main__':
+    main()
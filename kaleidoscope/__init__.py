@@ -5,24 +5,59 @@ import logging
 from logging import getLogger, LoggerAdapter
 logger = getLogger(__name__)
 
-from .formatter import load_formatters
+from .formatter import load_formatters, ensure_formatters_loaded
 from .renderable import Renderable
 from .rendersys import Render
 from .model import CollectionModel, GroupModel, ObjectModel
 from .spec import ObjectModelSpec
 from .color import ColoredText, Color, ColorScheme, demo
+from .instrument import RenderStats, collecting
+from .cellcache import CellCache
 
 #- compile the various mappings that will be passed to Render for initialization
 #- 1- read config / search for mappings
 #- 2- load and parse and serialize
 
-load_formatters()
-
-#- make render system object render method available for direct calling
 log = LoggerAdapter(logger, {'name_ext' : 'module_level'})
-log.debug("Creating default render object")
-renderer = Render()
-render =  renderer.render_object
+
+#- the default render object is made the first time it is used, not at import time:
+#- making it reads and parses the object spec file, and lots of importers never render
+_renderer = None
+
+
+def get_renderer():
+    """Return the default Render object, creating it on first use"""
+    global _renderer
+    if _renderer is None:
+        log.debug("Creating default render object")
+        _renderer = Render()
+    return _renderer
+
+
+def __getattr__(name):
+    """
+    Description:
+        make render system object render method available for direct calling
+        (kaleidoscope.render, kaleidoscope.render_stream, kaleidoscope.render_async,
+        kaleidoscope.watch, kaleidoscope.renderer)
+        without creating the default render object on import
+    """
+    if name == 'renderer':
+        value = get_renderer()
+    elif name == 'render':
+        value = get_renderer().render_object
+    elif name == 'render_stream':
+        value = get_renderer().render_stream
+    elif name == 'render_async':
+        value = get_renderer().render_async
+    elif name == 'watch':
+        value = get_renderer().watch
+    else:
+        raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
+
+    #- only look it up once
+    globals()[name] = value
+    return value
 
 #- enable logging for debugging /development
 #logging.basicConfig(level = logging.DEBUG)
@@ -0,0 +1,224 @@
+"""
+Description:
+    Keep formatted attributes (cells) across renders.
+
+    In interactive sessions and dashboards the same objects get rendered over and over,
+    and each render builds new models that fetch and format every attribute again.
+    A CellCache given to a Render (or GroupModel) remembers what the formatter returned
+    for each cell, keyed by the object and the attribute of the spec (its
+    AttributeColumn), so rendering an object again skips fetching and formatting the
+    attributes it has already been rendered with.
+
+    Objects are identified either by identity, which assumes an object's attributes
+    don't change while it is alive (call invalidate() if they do), or by a fingerprint
+    function that returns a hashable version of the object, e.g.
+        CellCache(fingerprint=lambda i: (i.id, i.state['Name']))
+    Cells of objects identified by identity are dropped when the object is garbage
+    collected; objects that can't be weakly referenced aren't cached by identity.
+    The least recently used cells are dropped past maxsize cells.
+
+    Usage:
+        renderer = Render(cell_cache=CellCache())
+        renderer.render_object(instances)
+        renderer.render_object(instances)
+        print(renderer.cell_cache.summary())
+"""
+from logging import getLogger, LoggerAdapter
+logger = getLogger(__name__)
+
+_load_log = LoggerAdapter(logger, {'name_ext' : 'CellCache.load'})
+
+from collections import OrderedDict
+import weakref
+
+from kaleidoscope import defaults
+
+
+
+class CellCache(object):
+    """
+    Description:
+        LRU cache of formatted cells. See the module description.
+    """
+    def __init__(self, maxsize=defaults.cell_cache_size, fingerprint=None):
+        """
+        Input:
+            maxsize: max number of cells to keep
+            fingerprint: callable that returns a hashable key for an object (or None
+                to not cache it) [default: identify objects by identity]
+        """
+        self.maxsize = maxsize
+        self.fingerprint = fingerprint
+
+        #- (object key, AttributeColumn) --> (formatted lines, width)
+        self._cells = OrderedDict()
+        #- id(object) --> (weakref, set of the cell keys of the object); identity only
+        self._objects = dict()
+        #- weakrefs of objects that have been collected since the last load/store.
+        #- the weakref callbacks only queue them up, they can run at any time
+        self._collected = list()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+
+    def object_key(self, obj):
+        """the key of an object's cells, or None if it can't be cached"""
+        if self.fingerprint is not None:
+            return self.fingerprint(obj)
+        if not type(obj).__weakrefoffset__:
+            return None
+        return id(obj)
+
+
+
+    def load(self, object_models):
+        """
+        Description:
+            Fill in the formatted value of every attribute model that has a cached cell
+        Input:
+            object_models: ObjectModels about to be rendered
+        Output:
+            list of (cell key, AttributeModel) of the cells that weren't cached; hand
+            it to store() after they have been formatted
+        """
+        self._purge_collected()
+        cells = self._cells
+        misses = list()
+        hits = 0
+        for object_model_x in object_models:
+            okey = self.object_key(object_model_x.source_object)
+            if okey is None:
+                continue
+            for attribute_model_x in object_model_x.attribute_models:
+                if attribute_model_x._formatted is not None:
+                    continue
+                column = attribute_model_x.column
+                #- a render method set directly on a model isn't part of the key
+                if attribute_model_x.render_method is not column.render_method:
+                    continue
+                key = (okey, column)
+                formatted = cells.get(key)
+                if formatted is None:
+                    misses.append((key, attribute_model_x))
+                else:
+                    cells.move_to_end(key)
+                    attribute_model_x.set_formatted(*formatted)
+                    hits += 1
+
+        self.hits += hits
+        self.misses += len(misses)
+        _load_log.debug("%d hits | %d misses", hits, len(misses))
+        return misses
+
+
+
+    def store(self, misses):
+        """
+        Description:
+            Cache the formatted values of the cells that load() didn't find
+        Input:
+            misses: what load() returned
+        """
+        self._purge_collected()
+        cells = self._cells
+        for key, attribute_model_x in misses:
+            formatted = attribute_model_x._formatted
+            if formatted is None:
+                continue
+            if self.fingerprint is None:
+                self._track(attribute_model_x.source_object, key)
+            cells[key] = formatted
+            cells.move_to_end(key)
+
+        while len(cells) > self.maxsize:
+            key, _formatted = cells.popitem(last=False)
+            self.evictions += 1
+            if self.fingerprint is None:
+                self._untrack(key)
+
+
+
+    def invalidate(self, obj):
+        """forget the cells of an object, e.g. after it has changed"""
+        okey = self.object_key(obj)
+        if okey is None:
+            return
+        if self.fingerprint is None:
+            ref, keys = self._objects.pop(okey, (None, ()))
+        else:
+            keys = [key for key in self._cells if key[0] == okey]
+        for key in keys:
+            self._cells.pop(key, None)
+
+
+
+    def clear(self):
+        """forget every cell; the hit and miss counts are kept"""
+        self._cells.clear()
+        self._objects.clear()
+        del self._collected[:]
+
+
+
+    def _track(self, obj, key):
+        """remember a cell key of an object identified by identity"""
+        try:
+            self._objects[key[0]][1].add(key)
+        except KeyError:
+            self._objects[key[0]] = (weakref.KeyedRef(obj, self._collected.append,\
+                key[0]), {key})
+
+
+
+    def _untrack(self, key):
+        """forget an evicted cell key of an object identified by identity"""
+        record = self._objects.get(key[0])
+        if record is not None:
+            record[1].discard(key)
+            if not record[1]:
+                del self._objects[key[0]]
+
+
+
+    def _purge_collected(self):
+        """drop the cells of the objects that have been garbage collected"""
+        while self._collected:
+            ref = self._collected.pop()
+            record = self._objects.get(ref.key)
+            #- the id may belong to a newer object by now
+            if record is not None and record[0] is ref:
+                del self._objects[ref.key]
+                for key in record[1]:
+                    self._cells.pop(key, None)
+
+
+
+    def __len__(self):
+        return len(self._cells)
+
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+    def summary(self):
+        """the cache counters as a plain dict"""
+        return {
+            'cells' : len(self._cells),
+            'maxsize' : self.maxsize,
+            'hits' : self.hits,
+            'misses' : self.misses,
+            'evictions' : self.evictions,
+            'hit_rate' : self.hit_rate,
+        }
+
+
+    def __repr__(self):
+        return '{}(cells={}, maxsize={}, hits={}, misses={}, evictions={})'.format(\
+            self.__class__.__name__, len(self._cells), self.maxsize, self.hits,\
+            self.misses, self.evictions)
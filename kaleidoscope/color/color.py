@@ -2,11 +2,20 @@
 from .terminalcolorcodes import TerminalColorCodes
 
 class Color(object):
+    '''
+    Description:
+        Terminal color. Colors are immutable and interned: constructing a Color with a
+        name that has been used before returns the same object, with its terminal codes
+        already worked out, so they are cheap to create in the render loops.
+    '''
     _terminal_color_codes = TerminalColorCodes()
     _terminal_reset = TerminalColorCodes.default_colors['style']['reset_all']
     terminal_reset = TerminalColorCodes.default_colors['style']['reset_all']
 
-    def __init__(self, color):
+    #- process-wide color name --> Color
+    _interned = dict()
+
+    def __new__(cls, color=None):
         '''color: a readable way to specify the color.
                 OR
                 another Color object which we'll copy
@@ -20,21 +29,30 @@ class Color(object):
                 'bright cyan on white'
                 'dim yellow on black'
         '''
+        if isinstance(color, Color):
+            #- Colors are immutable, so a copy is the same object
+            return color
 
-        self._init_color = color
+        try:
+            return cls._interned[color]
+        except KeyError:
+            pass
 
-        if not isinstance(color, Color):
-            (self.foreground, self.style, self.background) = self.parse_color_name(color)
-            #- fail fast: if the color is invalid,just fail now
-            try:
-                self._terminal_codes = self.terminal_codes()
-            except ValueError as err:
-                raise err
+        self = super().__new__(cls)
+        self._init_color = color
+        (self.foreground, self.style, self.background) = self.parse_color_name(color)
+        #- fail fast: if the color is invalid, terminal_codes() raises ValueError now
+        self._terminal_codes = self.terminal_codes()
+
+        #- precompute what text() wraps around a string
+        if color is not None:
+            self._prefix = self._terminal_codes
+            self._suffix = self.terminal_reset
         else:
-            self.foreground = self._init_color.foreground
-            self.background = self._init_color.background
-            self.style = self._init_color.style
-            self._terminal_codes = self.terminal_codes()
+            self._prefix = self._suffix = ''
+
+        cls._interned[color] = self
+        return self
 
 
 
@@ -94,11 +112,8 @@ class Color(object):
 
 
     def text(self, string):
-        if len(string) > 0:
-            if self._init_color is not None:
-                return self._terminal_codes+string+self.terminal_reset
-            else:
-                return string
+        if string:
+            return self._prefix + string + self._suffix
         else:
             #- don't send color / reset codes if there's no string to print
             return ''
@@ -1,22 +1,26 @@
 from .color import Color
 
-class ColoredText(Color):
+class ColoredText(object):
     """
     Description:
-        Subclass of Color object that stores a text object with the color
+        Text along with the (interned) Color object used to render it.
+        Lightweight value object; lots of these get made while laying out views.
     """
+    __slots__ = ('text', 'color')
+
     def __init__(self, text, color='normal green on black'):
         """
         Input:
             text : text to be colored
             color: how to color the text. Example: 'bright white on red'
+                A Color object can be passed as well.
         """
         if isinstance(text, ColoredText):
-            super().__init__(text)
             self.text = text.text
+            self.color = text.color
         else:
-            super().__init__(color)
             self.text = str(text)
+            self.color = Color(color)
 
 
     def to_str(self):
@@ -32,7 +36,16 @@ class ColoredText(Color):
 
 
     def render(self):
-        return super().text(self.text)
+        return self.color.text(self.text)
+
+
+    def get_color_name(self):
+        return self.color.get_color_name()
+
+
+    def terminal_codes(self):
+        return self.color.terminal_codes()
+
 
     def __str__(self):
         return self.to_str()
@@ -41,6 +54,9 @@ class ColoredText(Color):
     def __repr__(self):
         return 'ColoredText(text="{}", color="{}")'.format(str(self.text),\
                                     self.get_color_name())
-       
 
 
+
+#- ColoredText is never changed once made, so views without a prologue / epilogue all
+#- share this empty one
+no_text = ColoredText('')
@@ -1,2 +1,11 @@
 config_dir = "~/.config/kaleidoscope"
 object_spec_file = "objectspec.yaml"
+#- parsed config files are cached here; set to None to turn caching off
+cache_dir = "~/.cache/kaleidoscope"
+#- number of objects Render.render_async formats at once
+async_concurrency = 16
+#- max number of formatted cells a CellCache keeps
+cell_cache_size = 100000
+#- groups with fewer rows than this are formatted without the process pool; starting
+#- the pool and pickling the rows costs more than it saves on small groups
+format_processes_min_rows = 1000
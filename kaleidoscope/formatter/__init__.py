@@ -1,11 +1,40 @@
 from logging import getLogger, LoggerAdapter
+import ast
+import builtins
 import os
 import pkgutil
 import itertools
 import importlib
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
 
 logger = getLogger(__name__)
 
+#- modules imported by the first call to ensure_formatters_loaded()
+_loaded_formatters = None
+
+
+def ensure_formatters_loaded():
+    """
+    Description:
+        Load the bundled formatter modules the first time this is called.
+        Formatters are referenced by their importable names in object specs, so their
+        modules need to be imported before a spec that uses them is rendered. Importing
+        kaleidoscope doesn't do this up front; the render path calls this instead.
+    Output:
+        list of the loaded formatter modules and packages
+    """
+    global _loaded_formatters
+    if _loaded_formatters is None:
+        _loaded_formatters = load_formatters()
+    return _loaded_formatters
+
+
+
 def load_formatters(path=None, prefix='kaleidoscope.formatter'):
     log_name = '{}.load_formatters'.format(__name__)
     log = LoggerAdapter(logger, {'name_ext' : log_name})
@@ -37,3 +66,474 @@ def load_formatters(path=None, prefix='kaleidoscope.formatter'):
                 modinfo.name, err))
 
     return successful_imports
+
+
+
+class Formatter(object):
+    """
+    Description:
+        A formatter resolved from its name: the formatter callable along with the
+        keyword arguments from its spec.
+        Formatters named in specs are called with the source object of the attribute as
+        the 'source' keyword argument; plain callables are called with just the value.
+    """
+    __slots__ = ('name', 'func', 'kwargs', 'scoped_kwargs', 'takes_source', 'prefetcher',\
+        'batcher')
+
+    def __init__(self, name, func, kwargs=None, takes_source=True, scoped_kwargs=None):
+        """
+        Input:
+            name: name of the formatter
+            func: the formatter callable
+            kwargs: keyword arguments with fixed values
+            takes_source: pass the source object as the 'source' keyword argument
+            scoped_kwargs: keyword arguments whose values are evaluated from an
+                expression: name --> ScopedKwarg
+        """
+        self.name = name
+        self.func = func
+        self.kwargs = kwargs if kwargs else dict()
+        self.scoped_kwargs = scoped_kwargs if scoped_kwargs else dict()
+        self.takes_source = takes_source
+        #- optional batch stage of the formatter; see prefetch()
+        self.prefetcher = getattr(func, 'prefetch', None)
+        #- optional column-at-a-time version of the formatter; see format_batch()
+        self.batcher = getattr(func, 'batch', None)
+
+
+    def get_kwargs(self):
+        """the keyword arguments to call the formatter with"""
+        if not self.scoped_kwargs:
+            return self.kwargs
+        kwargs = dict(self.kwargs)
+        for kwarg_name, scoped_kwarg in self.scoped_kwargs.items():
+            kwargs[kwarg_name] = scoped_kwarg.get_value()
+        return kwargs
+
+
+    def prefetch(self, values, sources):
+        """
+        Description:
+            Formatters can have a prefetch stage: a callable set as the formatter's
+            'prefetch' attribute. The render system runs it once over a whole batch of
+            objects before formatting any of them and passes what it returns to the
+            formatter of each object as the 'prefetched' keyword argument. That way a
+            formatter that needs to look things up (over the network, etc.) can do it
+            in a few batched calls instead of once per object.
+
+            The prefetch callable is called as prefetch(values, sources, **kwargs) with
+            the attribute values, their source objects and the formatter kwargs.
+        Output:
+            whatever the prefetch callable returns; None if there is no prefetch stage
+        """
+        if self.prefetcher is None:
+            return None
+        return self.prefetcher(values, sources, **self.get_kwargs())
+
+
+    def format_batch(self, values, sources, **extra_kwargs):
+        """
+        Description:
+            Formatters can opt in to formatting a whole column at once: a callable set as
+            the formatter's 'batch' attribute is called with every value of the
+            attribute across a group, instead of the formatter being called once per
+            value. That lets it share work between values (caching repeated values,
+            vectorized number formatting, one lookup for all the ids, etc).
+
+            The batch callable is called as batch(values, sources, **kwargs) with the
+            attribute values, their source objects and the formatter kwargs (plus
+            'prefetched' if there is a prefetch stage). It must return one rendering
+            (a string or a list of lines) per value, in order.
+        Output:
+            list of renderings
+        Raises:
+            ValueError if the batch doesn't return a rendering for every value
+        """
+        kwargs = dict(self.get_kwargs()) if self.takes_source else dict()
+        kwargs.update(extra_kwargs)
+        renderings = list(self.batcher(values, sources, **kwargs))
+        if len(renderings) != len(values):
+            raise ValueError("batch formatter {} returned {} renderings for {} values"\
+                .format(self.name, len(renderings), len(values)))
+        return renderings
+
+
+    def bind(self, source, **extra_kwargs):
+        """
+        Description:
+            Make the render method for the attribute of a single object
+        Input:
+            source: the object the attribute value comes from
+            extra_kwargs: more keyword arguments for the formatter (e.g. prefetched)
+        Output:
+            callable(attribute value) -> formatted text or lines of text
+        """
+        if not self.takes_source:
+            return partial(self.func, **extra_kwargs) if extra_kwargs else self.func
+        return partial(self.func, source=source, **self.get_kwargs(), **extra_kwargs)
+
+
+    def __repr__(self):
+        return "Formatter(name={}, kwargs={})".format(self.name, self.kwargs)
+
+
+
+class FormatterRegistry(object):
+    """
+    Description:
+        Resolves formatter names to the callables they refer to.
+        Names are resolved once: every name and every FormatterSpec is only ever looked
+        up, imported and have its keyword arguments evaluated the first time it is used.
+
+        Names can be:
+            a name registered with register()
+            an importable dotted name: package.module.callable
+            a dotted name relative to kaleidoscope.formatter
+            a builtin: str, repr, etc.
+        and can be prefixed with 'nsid://'
+    """
+    nsid_prefix = 'nsid://'
+
+    def __init__(self, package='kaleidoscope.formatter'):
+        """
+        Input:
+            package: package to also look relative names up in
+        """
+        self.package = package
+        #- name --> formatter callable
+        self._formatters = dict()
+        #- name --> error message for names that didn't resolve
+        self._failed = dict()
+
+
+    def register(self, name, func):
+        """make func available as a formatter named name"""
+        name = self._normalize(name)
+        self._formatters[name] = func
+        self._failed.pop(name, None)
+
+
+    def lookup(self, name):
+        """
+        Description:
+            Get the formatter callable by name
+        Output:
+            the formatter callable
+        Raises:
+            ValueError if there is no such formatter
+        """
+        name = self._normalize(name)
+        try:
+            return self._formatters[name]
+        except KeyError:
+            pass
+        if name in self._failed:
+            raise ValueError(self._failed[name])
+
+        log = LoggerAdapter(logger, {'name_ext' : 'FormatterRegistry.lookup'})
+        #- spec formatters are usually in the bundled formatter modules
+        ensure_formatters_loaded()
+        for candidate in (name, '{}.{}'.format(self.package, name)):
+            try:
+                func = self.resolve_name(candidate)
+            except ValueError as err:
+                log.debug("%s", err)
+                continue
+            if callable(func):
+                self._formatters[name] = func
+                return func
+        self._failed[name] = "failed to find formatter: {}".format(name)
+        raise ValueError(self._failed[name])
+
+
+    def resolve(self, formatter):
+        """
+        Description:
+            Resolve whatever an attribute has as its formatter into a Formatter
+        Input:
+            formatter: one of
+                None
+                a formatter name
+                a FormatterSpec (or anything with .name and .kwargs)
+                a callable
+                a Formatter
+        Output:
+            Formatter or None if formatter is None
+        Raises:
+            ValueError if the formatter can't be resolved
+        """
+        if formatter is None or isinstance(formatter, Formatter):
+            return formatter
+
+        if isinstance(formatter, str):
+            return Formatter(formatter, self.lookup(formatter))
+
+        if callable(formatter):
+            return Formatter(getattr(formatter, '__name__', repr(formatter)), formatter,\
+                takes_source=False)
+
+        try:
+            name = formatter.name
+            kwargs = formatter.kwargs
+        except AttributeError as err:
+            raise ValueError('formatter must be a callable, a string representing an'\
+                ' importable callable or a FormatterSpec-compatible object: {}'.format(\
+                err))
+
+        #- specs are long-lived (see Render.lookup_object_spec) so keep the result there
+        resolved = getattr(formatter, '_resolved', None)
+        if resolved is None:
+            func = self.lookup(name)
+            resolved_kwargs = dict()
+            scoped_kwargs = dict()
+            for kwarg_name, kwarg_value in (kwargs or dict()).items():
+                try:
+                    kwarg_value = self.resolve_value(kwarg_value)
+                except ValueError as err:
+                    raise ValueError("Error filling in kwarg: {} : {}".format(kwarg_name,\
+                        err))
+                if isinstance(kwarg_value, ScopedKwarg):
+                    scoped_kwargs[kwarg_name] = kwarg_value
+                else:
+                    resolved_kwargs[kwarg_name] = kwarg_value
+            resolved = Formatter(name, func, resolved_kwargs, scoped_kwargs=scoped_kwargs)
+            try:
+                formatter._resolved = resolved
+            except AttributeError:
+                pass
+        return resolved
+
+
+    def resolve_value(self, value):
+        """
+        Description:
+            Get the runtime value of a formatter keyword argument from the spec.
+            Strings are taken to be python literals, importable dotted names or python
+            expressions. Literals and names are resolved right away. Other expressions
+            (calls, etc.) can be expensive and their results can change, so they become
+            a ScopedKwarg that is evaluated once per render.
+
+            A mapping with an 'expression' key gives an expression along with how long
+            its value can be reused for:
+                expression: the python expression
+                scope: render (default), ttl or process
+                ttl: seconds the value is good for (ttl scope only)
+            Anything else is used as is.
+        Output:
+            the value or a ScopedKwarg
+        Raises:
+            ValueError if the value doesn't resolve
+        """
+        if isinstance(value, Mapping) and 'expression' in value:
+            return ScopedKwarg(value['expression'], scope=value.get('scope', 'render'),\
+                ttl=value.get('ttl', None))
+
+        if not isinstance(value, str):
+            return value
+        try:
+            return ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            pass
+
+        if _is_dotted_name(value):
+            return self.resolve_name(value)
+        return ScopedKwarg(value)
+
+
+    @staticmethod
+    def resolve_name(dotted_name):
+        """
+        Description:
+            Import the longest importable prefix of a dotted name and get the rest of the
+            name as attributes of it. Single names are looked up in builtins.
+        Output:
+            the object the name refers to
+        Raises:
+            ValueError if the name doesn't resolve
+        """
+        parts = dotted_name.split('.')
+        for n in range(len(parts), 0, -1):
+            try:
+                obj = importlib.import_module('.'.join(parts[0:n]))
+            except ImportError:
+                continue
+            except Exception as err:
+                raise ValueError("error importing {}: {}".format(dotted_name, err))
+            break
+        else:
+            if not hasattr(builtins, parts[0]):
+                raise ValueError("can't import any part of: {}".format(dotted_name))
+            obj, n = getattr(builtins, parts[0]), 1
+
+        for part in parts[n:]:
+            try:
+                obj = getattr(obj, part)
+            except AttributeError:
+                raise ValueError("no such name: {} (from {})".format(part, dotted_name))
+        return obj
+
+
+    def _normalize(self, name):
+        name = str(name)
+        if name.startswith(self.nsid_prefix):
+            name = name[len(self.nsid_prefix):]
+        return name
+
+
+
+def _is_dotted_name(expression):
+    """check if expression is just a (dotted) name, like os.path.sep"""
+    try:
+        node = ast.parse(expression, mode='eval').body
+    except SyntaxError:
+        return False
+    while isinstance(node, ast.Attribute):
+        node = node.value
+    return isinstance(node, ast.Name)
+
+
+
+#- cache of ScopedKwarg values for the render in progress; see render_scope()
+_render_values = ContextVar('kaleidoscope_render_kwarg_values', default=None)
+
+
+@contextmanager
+def render_scope():
+    """
+    Description:
+        Formatter keyword arguments with the 'render' scope are evaluated once within
+        this block and the value is shared by every object rendered in it.
+        Nested blocks share the scope of the outermost one.
+    """
+    if _render_values.get() is not None:
+        yield
+        return
+
+    token = _render_values.set(dict())
+    try:
+        yield
+    finally:
+        _render_values.reset(token)
+
+
+
+class ScopedKwarg(object):
+    """
+    Description:
+        A formatter keyword argument whose value comes from evaluating a python
+        expression from the spec, along with how long the value can be reused:
+            render: evaluated once per render (see render_scope()). Outside of a render
+                it is evaluated every time it is used.
+            ttl: reused for ttl seconds
+            process: evaluated once
+        The expression is compiled once and the modules it refers to are imported once.
+        ttl and process scoped values are shared by every thread and task rendering
+        with the kwarg; only one of them evaluates the expression when it is due.
+    """
+    scopes = ('render', 'ttl', 'process')
+
+    def __init__(self, expression, scope='render', ttl=None):
+        """
+        Input:
+            expression: python expression; dotted names in it are imported as needed
+            scope: one of ScopedKwarg.scopes
+            ttl: seconds; required for the ttl scope
+        Raises:
+            ValueError on a bad expression, scope or ttl
+        """
+        if scope not in self.scopes:
+            raise ValueError("scope must be one of {}, not {}".format(self.scopes, scope))
+        if scope == 'ttl':
+            try:
+                ttl = float(ttl)
+            except (TypeError, ValueError):
+                raise ValueError("ttl scope needs a number of seconds, not {}".format(ttl))
+
+        self.expression = str(expression)
+        self.scope = scope
+        self.ttl = ttl
+        try:
+            self.code = compile(self.expression, '<formatter kwarg>', 'eval')
+        except SyntaxError as err:
+            raise ValueError("invalid expression: {}: {}".format(self.expression, err))
+        #- modules the expression refers to; imported on first evaluation
+        self.namespace = None
+
+        self._value = None
+        self._expires = None
+        #- held while (re)evaluating a ttl or process scoped value
+        self._lock = threading.Lock()
+
+
+    def get_value(self):
+        """the value of the expression, evaluated as often as the scope requires"""
+        if self.scope == 'render':
+            values = _render_values.get()
+            if values is None:
+                return self.evaluate()
+            try:
+                return values[self]
+            except KeyError:
+                value = values[self] = self.evaluate()
+                return value
+
+        if self._is_due(time.monotonic()):
+            with self._lock:
+                #- another thread may have evaluated it while this one waited
+                now = time.monotonic()
+                if self._is_due(now):
+                    self._value = self.evaluate()
+                    self._expires = now + self.ttl if self.scope == 'ttl' else now
+        return self._value
+
+
+    def _is_due(self, now):
+        """check if a ttl or process scoped value needs to be (re)evaluated"""
+        expires = self._expires
+        return expires is None or (self.scope == 'ttl' and now >= expires)
+
+
+    def evaluate(self):
+        """evaluate the expression"""
+        if self.namespace is None:
+            self.namespace = self._import_names()
+        return eval(self.code, self.namespace)
+
+
+    def _import_names(self):
+        """
+        Description:
+            Import the modules referred to by the dotted names in the expression: for
+            a.b.c.func() that is a, a.b and a.b.c (whichever of those are modules)
+        Output:
+            dict of top level name --> module, to evaluate the expression in
+        """
+        namespace = dict()
+        for node in ast.walk(ast.parse(self.expression, mode='eval')):
+            if not isinstance(node, ast.Attribute):
+                continue
+            parts = list()
+            while isinstance(node, ast.Attribute):
+                parts.insert(0, node.attr)
+                node = node.value
+            if not isinstance(node, ast.Name):
+                continue
+            parts.insert(0, node.id)
+            for n in range(1, len(parts)):
+                try:
+                    module = importlib.import_module('.'.join(parts[0:n]))
+                except ImportError:
+                    break
+                if n == 1:
+                    namespace[parts[0]] = module
+        return namespace
+
+
+    def __repr__(self):
+        return "ScopedKwarg(expression={}, scope={}, ttl={})".format(self.expression,\
+            self.scope, self.ttl)
+
+
+
+#- formatter registry used by the render system
+registry = FormatterRegistry()
@@ -1,9 +1,97 @@
-#- TODO - get the partial defined at the end of this module to be able to be defined in
-#-        configuration files, including references to kwargs
+"""
+Description:
+    Formatter for the ip_permissions, ip_permissions_egress attributes of boto3 resource
+    SecurityGroup objects.
 
-import functools
+    Rules can reference other security groups by id. The names of those groups are
+    looked up by prefetch_group_names(), which the render system runs over every
+    SecurityGroup in a group before formatting any of them (see GroupModel.prefetch), so
+    rendering N security groups takes a describe_security_groups call or so per region
+    rather than one per rule.
 
-def _format_ip_permissions(ip_permissions, source, ec2_rs):
+    The names are only a nicety: if a lookup fails (throttled, access denied, etc.) the
+    groups are rendered by id alone.
+"""
+from logging import getLogger, LoggerAdapter
+logger = getLogger(__name__)
+
+from collections import defaultdict
+
+#- describe_security_groups filter values per call
+GROUP_ID_BATCH_SIZE = 200
+
+
+
+def _region_name(source):
+    return source.meta.client.meta.region_name
+
+
+
+def _ec2_clients(ec2_rs):
+    """
+    Description:
+        Turn the ec2_rs formatter argument into a region name --> EC2 client mapping
+    Input:
+        ec2_rs: boto3 ec2 resource objects; either a dict keyed by region name or an
+            iterable of resources
+    """
+    if not ec2_rs:
+        return dict()
+    resources = ec2_rs.values() if hasattr(ec2_rs, 'values') else ec2_rs
+    return { _region_name(ec2_r) : ec2_r.meta.client for ec2_r in resources }
+
+
+
+def prefetch_group_names(ip_permissions_list, sources, ec2_rs=None, **kwargs):
+    """
+    Description:
+        Look up the names of all the security groups referenced by the rules of a batch
+        of security groups: one describe_security_groups call per region (per
+        GROUP_ID_BATCH_SIZE referenced groups).
+        A failed call is logged and the rest of the groups of its region go without a
+        name; it doesn't fail the lookup.
+    Input:
+        ip_permissions_list: the ip_permissions of each source object
+        sources: the SecurityGroup objects the ip_permissions came from
+        ec2_rs: boto3 ec2 resources to make the calls with, by region. Defaults to the
+            client of the source objects in each region.
+    Output:
+        dict mapping referenced group id --> group name; groups that couldn't be looked
+        up are left out
+    """
+    log = LoggerAdapter(logger, {'name_ext' : 'prefetch_group_names'})
+    clients = _ec2_clients(ec2_rs)
+    group_ids = defaultdict(set)
+    for ip_permissions, source in zip(ip_permissions_list, sources):
+        region = _region_name(source)
+        clients.setdefault(region, source.meta.client)
+        for rule in ip_permissions or list():
+            for pair in rule.get('UserIdGroupPairs') or list():
+                if pair.get('GroupId') and pair['GroupId'] != source.group_id:
+                    group_ids[region].add(pair['GroupId'])
+
+    group_names = dict()
+    for region, region_group_ids in group_ids.items():
+        region_group_ids = sorted(region_group_ids)
+        for n in range(0, len(region_group_ids), GROUP_ID_BATCH_SIZE):
+            #- a filter (unlike GroupIds=) doesn't fail the whole call when a group is
+            #- gone or belongs to another account
+            try:
+                response = clients[region].describe_security_groups(Filters=[{\
+                    'Name' : 'group-id',\
+                    'Values' : region_group_ids[n:n + GROUP_ID_BATCH_SIZE]}])
+            except Exception as err:
+                #- e.g. botocore ClientError when throttled or denied; don't keep trying
+                #- the same region
+                log.warning("can't look up security group names in %s: %s", region, err)
+                break
+            for group in response.get('SecurityGroups', list()):
+                group_names[group['GroupId']] = group.get('GroupName')
+    return group_names
+
+
+
+def format_ip_permissions(ip_permissions, source, ec2_rs=None, prefetched=None):
     """
     Description:
         formats the ip_permissions, ip_permissions_egress attributes of boto3 resource
@@ -11,16 +99,16 @@ def _format_ip_permissions(ip_permissions, source, ec2_rs):
     Input:
         ip_permissions: the ip_permissions we are rendering
         source: source object whose ip_permissions* attrs this method is rendering
-        ec2_rs: a dict whose values are the boto3 ec2 resource objects to use to lookup info
-            these should use the region name as the dictionary key
+        ec2_rs: boto3 ec2 resource objects to use to lookup info; see
+            prefetch_group_names()
+        prefetched: group id --> group name table made by prefetch_group_names() for
+            the whole batch. If not given (the render path didn't run the prefetch
+            stage), it is made for just this object.
     Output:
         list of lines of text to use as the attribute rendering
     """
-    import cush
-    #- create the table of EC2 implementors to access AWS when we render
-    c = cush.CushApplication('default')
-    ec2_rs = c._ns.get_leaf_nodes(".implementor.boto3.aws.ec2.resource")
-    ec2_rs_t = { ec2_r.meta.client.meta.region_name: ec2_r for ec2_r in ec2_rs }
+    if prefetched is None:
+        prefetched = prefetch_group_names([ip_permissions], [source], ec2_rs=ec2_rs)
 
     output = list()
     for rule in ip_permissions:
@@ -43,13 +131,15 @@ def _format_ip_permissions(ip_permissions, source, ec2_rs):
 
                 else:
                     #- the SG referenced isn't this one, but lets get a name
-                    region = source.meta.client.meta.region_name
-                    referenced_sg = ec2_rs[region].security_groups.filter(GroupIds=pair['GroupId'])
-
-                    output.append('Security Group Id: {} | UserId: {}'.format(pair['GroupId'], pair['UserId']))
+                    group_name = prefetched.get(pair['GroupId'])
+                    group_id = pair['GroupId']
+                    if group_name:
+                        group_id = '{} ({})'.format(group_id, group_name)
+                    output.append('Security Group Id: {} | UserId: {}'.format(group_id,\
+                        pair['UserId']))
 
         output.append('---------')
     return output
 
-ec2_rs_t = dict()
-format_ip_permissions = functools.partial(_format_ip_permissions, ec2_rs=ec2_rs_t)
+#- run over every SecurityGroup being rendered before any of them are formatted
+format_ip_permissions.prefetch = prefetch_group_names
@@ -0,0 +1,194 @@
+"""
+Description:
+    Opt-in render instrumentation.
+
+    While a RenderStats object is installed as the current stats (see collecting()) the
+    render pipeline records into it how long each stage took:
+        spec_resolution: looking up and building ObjectModelSpecs
+        model_construction: building the ObjectModels (and their AttributeModels)
+        prefetch: running the batch prefetch stage of formatters
+        attribute_fetch: reading attribute values off of the source objects
+        formatting: running attribute values through their formatters
+        layout: laying ObjectViews out into lines of text
+        emission: writing the text out
+    along with the cumulative fetch time per attribute, the cumulative time per
+    formatter and the number of rows and bytes written.
+
+    When no stats are installed, each instrumented spot costs a single ContextVar.get().
+
+    Usage:
+        with collecting() as stats:
+            render(objects)
+        print(stats.slowest_attributes())
+
+    or have a Render collect stats for every call: see Render.instrument()
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import defaultdict
+from time import perf_counter
+
+STAGES = ('spec_resolution', 'model_construction', 'prefetch', 'attribute_fetch',\
+    'formatting', 'layout', 'emission')
+
+_current_stats = ContextVar('kaleidoscope_render_stats', default=None)
+
+
+
+def current_stats():
+    """
+    Description:
+        Get the RenderStats that the render pipeline should record into
+    Output:
+        RenderStats or None if instrumentation is off
+    """
+    return _current_stats.get()
+
+
+
+@contextmanager
+def collecting(stats=None, callback=None):
+    """
+    Description:
+        Install a RenderStats object as the current stats for the duration of the block.
+    Input:
+        stats: RenderStats to record into [default: a new one]
+        callback: called with the stats when the block exits
+    Output:
+        the installed RenderStats
+    """
+    if stats is None:
+        stats = RenderStats()
+    token = _current_stats.set(stats)
+    start = perf_counter()
+    try:
+        yield stats
+    finally:
+        stats.elapsed += perf_counter() - start
+        _current_stats.reset(token)
+        if callback:
+            callback(stats)
+
+
+
+def callable_name(func):
+    """best effort readable name for a formatter callable"""
+    #- unwrap functools.partial
+    func = getattr(func, 'func', func)
+    module = getattr(func, '__module__', None)
+    name = getattr(func, '__qualname__', None) or getattr(func, '__name__', None)
+    if name is None:
+        return repr(func)
+    return '{}.{}'.format(module, name) if module else name
+
+
+
+class RenderStats(object):
+    """
+    Description:
+        Timings and counters collected while rendering.
+        All times are in seconds.
+    """
+    def __init__(self):
+        self.reset()
+
+
+    def reset(self):
+        """zero out everything that has been collected"""
+        self.stage_times = dict.fromkeys(STAGES, 0.0)
+        #- attribute name --> cumulative fetch time
+        self.attribute_times = defaultdict(float)
+        #- formatter name --> cumulative time, number of calls
+        self.formatter_times = defaultdict(float)
+        self.formatter_calls = defaultdict(int)
+        self.rows = 0
+        self.bytes_emitted = 0
+        self.elapsed = 0.0
+
+
+    def add_stage(self, stage, seconds):
+        self.stage_times[stage] += seconds
+
+
+    @contextmanager
+    def stage(self, stage):
+        """time a block of code as part of a render stage"""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_times[stage] += perf_counter() - start
+
+
+    def add_cell(self, attribute_name, formatter_name, fetch_seconds, format_seconds):
+        """record the cost of rendering a single attribute of a single object"""
+        self.stage_times['attribute_fetch'] += fetch_seconds
+        self.stage_times['formatting'] += format_seconds
+        self.attribute_times[attribute_name] += fetch_seconds
+        self.formatter_times[formatter_name] += format_seconds
+        self.formatter_calls[formatter_name] += 1
+
+
+    def add_column(self, attribute_name, formatter_name, fetch_seconds, format_seconds,\
+        cells):
+        """record the cost of rendering an attribute of many objects with a batch formatter"""
+        self.add_cell(attribute_name, formatter_name, fetch_seconds, format_seconds)
+        self.formatter_calls[formatter_name] += cells - 1
+
+
+    def add_emitted(self, text, rows=0):
+        """record text that has been written out"""
+        self.bytes_emitted += len(text.encode('utf-8'))
+        self.rows += rows
+
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+    def slowest_attributes(self, n=5):
+        """list of the n (attribute name, seconds) with the most total fetch time"""
+        return sorted(self.attribute_times.items(), key=lambda x: x[1], reverse=True)[0:n]
+
+
+    def slowest_formatters(self, n=5):
+        """list of the n (formatter name, seconds) with the most total formatting time"""
+        return sorted(self.formatter_times.items(), key=lambda x: x[1], reverse=True)[0:n]
+
+
+    def merge(self, other):
+        """add the numbers collected by another RenderStats into this one"""
+        for stage, seconds in other.stage_times.items():
+            self.stage_times[stage] = self.stage_times.get(stage, 0.0) + seconds
+        for name, seconds in other.attribute_times.items():
+            self.attribute_times[name] += seconds
+        for name, seconds in other.formatter_times.items():
+            self.formatter_times[name] += seconds
+        for name, calls in other.formatter_calls.items():
+            self.formatter_calls[name] += calls
+        self.rows += other.rows
+        self.bytes_emitted += other.bytes_emitted
+        self.elapsed += other.elapsed
+
+
+    def summary(self):
+        """the collected numbers as a plain dict"""
+        return {
+            'elapsed' : self.elapsed,
+            'rows' : self.rows,
+            'rows_per_second' : self.rows_per_second,
+            'bytes_emitted' : self.bytes_emitted,
+            'stages' : dict(self.stage_times),
+            'attributes' : dict(self.attribute_times),
+            'formatters' : dict(self.formatter_times),
+        }
+
+
+    def __repr__(self):
+        stages = ', '.join(['{}={:.6f}'.format(k, v) for k,v in self.stage_times.items()])
+        return '{}(rows={}, bytes_emitted={}, elapsed={:.6f}, {})'.format(\
+            self.__class__.__name__, self.rows, self.bytes_emitted, self.elapsed, stages)
+
+    def __str__(self):
+        return self.__repr__()
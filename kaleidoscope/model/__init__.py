@@ -11,3 +11,4 @@ from .object import ObjectModel
 from .attribute import AttributeModel
 from .group import GroupModel
 from .collection import CollectionModel
+from .table import RenderTable
@@ -1,169 +1,206 @@
-from logging import getLogger, LoggerAdapter
+from logging import getLogger, LoggerAdapter, DEBUG
 logger = getLogger(__name__)
 
+#- render path loggers are made once; messages use lazy %-style arguments and anything
+#- more expensive than that is guarded with logger.isEnabledFor(DEBUG)
+_init_log = LoggerAdapter(logger, {'name_ext' : 'AttributeColumn.__init__'})
+_format_log = LoggerAdapter(logger, {'name_ext' : 'AttributeModel.format_value'})
+
 import kaleidoscope
 from .modelabc import ModelABC
 from kaleidoscope.view import AttributeView
 from kaleidoscope.color import Color
 from kaleidoscope.spec import FormatterSpec
+from kaleidoscope.spec.attribute import compile_accessor
+from kaleidoscope.instrument import current_stats, callable_name
+from kaleidoscope.formatter import registry as formatter_registry
 from collections.abc import Iterable
-import functools
-from functools import partial
-import importlib
+from inspect import isawaitable
+from time import perf_counter
+
+#- AttributeModel._value before the attribute has been fetched
+_unfetched = object()
+
+
+
+def normalize_view_data(name, view_data):
+    """
+    Description:
+        Turn what a formatter returned into lines of text and their width
+    Input:
+        name: name of the attribute (for the error message)
+        view_data: a string or an iterable of lines
+    Output:
+        tuple of (list of lines, width of the longest line)
+    Raises:
+        ValueError if view_data is neither
+    """
+    #- figure out the width of this view
+    #- the render method may have returned a string or an iterable that will iterate
+    #- over each line for this view
+    if isinstance(view_data, str):
+        #- create an Iterable to simplify the rest of the processing
+        return [view_data], len(view_data)
+
+    elif isinstance(view_data, Iterable):
+        view_data = list(view_data)
+        if len(view_data) == 0:
+            view_width = 0
+        elif len(view_data) == 1:
+            view_width = len(view_data[0])
+        else:
+            #- choose the longest line as the view width
+            view_width = len(max(*view_data, key=len))
+        return view_data, view_width
 
+    msg = ["render method for {}".format(name)]
+    msg.append(" returned non-string, non-iterable object.")
+    raise ValueError(''.join(msg))
 
-class AttributeModel(ModelABC):
-    """Runtime model for the individual Attributes."""
-    def __init__(self, source_object, attribute_name, length=None, render_method=None,\
-            color=None):
+
+
+class AttributeColumn(object):
+    """
+    Description:
+        What every AttributeModel of the same attribute spec has in common: the name,
+        compiled accessor, spec length and resolved formatter of the attribute.
+        One is made per attribute of an ObjectModelSpec and shared by the models of
+        every object rendered with it (see spec_columns()), so the per object models
+        only hold the per object state.
+    """
+    __slots__ = ('name', 'accessor', 'length', 'render_method', 'render_method_name',\
+        'formatter')
+
+    def __init__(self, attribute_name, length=None, render_method=None):
         """
         Input:
-            source_object: the object that contains the attribute
-            attribute_name: the name of the attribute
-            length: the length to display [default: try to show all of it]
-            render_method: the method to call or a string that represents that runtime
-                name of the callable object used to render the attribute. [default: str()]
-                if you pass a string, it will be stored as the render_method_name. You can
-                always override this name by directly setting the .render_method attribute
-                of this object.
+            see AttributeModel
         """
-        self.source_object = source_object
         self.name = attribute_name
+        self.accessor = compile_accessor(attribute_name)
         self.length = length
-        self.set_color(color)
 
         self.render_method = None
         self.render_method_name = None
+        #- Formatter resolved from a formatter name or FormatterSpec
+        self.formatter = None
 
-        #- go through all the routine of figuring out how to apply the user-set
-        #- render_method, if there is one
-
+        #- figure out how to apply the user-set render_method, if there is one.
+        #- names and FormatterSpecs are resolved by the formatter registry, which only
+        #- does the work once per name / spec; here we just keep the result
         if render_method:
             if isinstance(render_method, str):
                 self.render_method_name = render_method
+                try:
+                    self.formatter = formatter_registry.resolve(render_method)
+                except ValueError as err:
+                    _init_log.error("render_method_name: '%s' seems invalid: %s."\
+                        " Skipping render_method", render_method, err)
             elif callable(render_method):
                 self.render_method = render_method
+                #- only needed for the optional batch stages; see uses_formatter()
+                if hasattr(render_method, 'batch') or hasattr(render_method, 'prefetch'):
+                    self.formatter = formatter_registry.resolve(render_method)
             else:
                 #- check if its something compatible with a FormatterSpec
                 try:
-                    _formatter_name = render_method.name
-                    _formatter_kwargs = render_method.kwargs
-                    try:
-                        _formatter_callable = eval(_formatter_name)
-                        #- will be overwritten if there are kwargs
-                        self.render_method = partial(_formatter_callable,\
-                            source=self.source_object)
-                    except NameError as err:
-                        msg = "failed to find render_method name: {}: {}".format(\
-                            _formatter_name, str(err))
-                        log.error(msg)
-                        raise ValueError(msg)
-
-                    #- overwrite render_method with new partial if kwargs exist
-                    if _formatter_kwargs is not None:
-                        #- grab runtime values for the formatter kwargs
-                        _runtime_kwargs = dict(_formatter_kwargs)
-                        for _kwarg_name, _kwarg_val in _formatter_kwargs.items():
-                            runtime_import_map = self._runtime_import(_kwarg_val)
-
-                            try:
-                                _runtime_kwargs[_kwarg_name] = eval(_kwarg_val, None,\
-                                    runtime_import_map)
-
-                                self.render_method = partial(_formatter_callable,\
-                                    source=self.source_object,\
-                                    **_runtime_kwargs)
-
-                            except (NameError, AttributeError, ValueError) as err:
-                                msg = "Error filling in kwarg: {} : {}".format(\
-                                    _kwarg_name, str(err))
-                                raise ValueError(msg)
-
-
-                except AttributeError as err:
-                    #- doesn't look like this is a FormatterSpec
-                    msg = 'AttributeModel render_method must be a callable, a string'\
-                          'representing an importable callable or a'\
-                          'FormatterSpec-compatible object: {}'.format(str(err))
-                    log.error(msg)
+                    self.formatter = formatter_registry.resolve(render_method)
+                except ValueError as err:
+                    msg = "AttributeModel render_method: {}".format(err)
+                    _init_log.error(msg)
                     raise ValueError(msg)
         else:
             self.render_method = str
 
 
-    def _runtime_import(self, importable_name, ignore_errors=True):
-        """
-        Description:
-            perform an import of given string.
-            starts with the whole string and tries successively smaller prefixes
+    def __repr__(self):
+        return "AttributeColumn(name={}, length={})".format(self.name, self.length)
+
+
+
+def spec_columns(spec):
+    """
+    Description:
+        Get the AttributeColumns of an ObjectModelSpec, made the first time they are
+        needed and then kept on the spec (specs are long-lived; see
+        Render.lookup_object_spec)
+        The columns are made again whenever the attributes of the spec are not the
+        same AttributeSpecs as the last time, whether the list was replaced or edited
+        in place. That check goes over every attribute, so code making the models of
+        many objects gets the columns once and hands them to each ObjectModel.
+    Output:
+        list of AttributeColumn, one per attribute of the spec
+    """
+    attributes = tuple(spec.attributes or ())
+    columns = getattr(spec, '_columns', None)
+    #- AttributeSpecs compare by identity, so this is a quick check
+    if columns is None or columns[0] != attributes:
+        columns = (attributes, [AttributeColumn(*attribute_x) for attribute_x in\
+            attributes])
+        spec._columns = columns
+    return columns[1]
 
-            Python imports within a block bind the name only to the local scope of the
-            enclosing block within which the binding statement occurs (import, in this
-            case).
 
-            In order to use this importable_name elsewhere, the object the name is locally
-            bound to must be passed into the execution scope of whatever relies on this
-            method
-        Input:
-            importable_name: string that should resolve to a runtime object after needed
-                imports
-            ignore_errors: don't raise an error if this fails. Assume that its probably okay
-                and that any error will be handled by code that uses the return value
 
-        Output:
-            Mapping of names imported to objects that resulted from import operations
-            dict mapping: import_name --> module object
+class AttributeModel(ModelABC):
+    """Runtime model for the individual Attributes."""
+    __slots__ = ('source_object', 'column', 'length', 'color', 'render_method',\
+        'prefetched', '_value', '_formatted', '_view_text')
+
+    def __init__(self, source_object, attribute_name, length=None, render_method=None,\
+            color=None, column=None):
         """
-        _nm_ex = { 'name_ext' : '{}._runtime_import'.format(self.__class__.__name__) }
-        log = LoggerAdapter(logger, _nm_ex)
+        Input:
+            source_object: the object that contains the attribute
+            attribute_name: the name of the attribute
+            length: the length to display [default: try to show all of it]
+            render_method: the method to call or a string that represents that runtime
+                name of the callable object used to render the attribute. [default: str()]
+                if you pass a string, it will be stored as the render_method_name. You can
+                always override this name by directly setting the .render_method attribute
+                of this object.
+            column: AttributeColumn shared with the other models of the attribute; if
+                given, it is used instead of attribute_name, length and render_method
+        """
+        if column is None:
+            column = AttributeColumn(attribute_name, length, render_method)
+        self.source_object = source_object
+        self.column = column
+        self.length = column.length
+        self.set_color(color)
+        self.render_method = column.render_method
 
-        all_imported = dict()
-        try:
-            imported = importlib.import_module(importable_name)
-        except ImportError as err:
-            pass
-        else:
-            return {importable_name, imported}
+        #- what the formatter's prefetch stage returned for this model's batch; see
+        #- GroupModel.prefetch
+        self.prefetched = None
 
-        #- if here, we could not import the name as given
-        try:
-            importable_name_components = importable_name.split('.')
-        except AttributeError as err:
-            msg =["AttributeError when calling split method."]
-            msg.append("Error in values when called from runtime import of \
-            formatter keyword args: \"{}\" is not a string".format(importable_name))
-            log.error(' '.join(msg))
-            raise ValueError("Couldn't split importable_name expression into components.")
-
-        n = len(importable_name_components)
-        while n > 0:
-            import_candidate = '.'.join(importable_name.split('.')[0:n])
-            try:
-                log.debug("Attempting to import '{}'".format(import_candidate))
-                imported = importlib.import_module(import_candidate)
-                log.debug("Success importing: '{}'".format(import_candidate))
-                all_imported[import_candidate] = imported
-
-            except ImportError as err:
-                imported = None
-                msg = "Failed to import runtime value: {} (full: {})".format(\
-                    import_candidate, importable_name)
-                log.error(msg)
-
-                #- it might be that the rest of the components are built by the import
-                #- or some other idiosyncracy of the importable_name that prevents this
-                #- function as written from being able to tell what it should be
-                if ignore_errors:
-                    pass
-                else:
-                    raise ValueError(msg)
-            finally:
-                n -= 1
+        #- cached attribute value, (lines, width) from the formatter and
+        #- (length, text, width) for the view
+        self._value = _unfetched
+        self._formatted = None
+        self._view_text = None
+
+
+
+    @property
+    def name(self):
+        return self.column.name
 
-        #- if we got this far, we imported everything that should be needed for the object
-        #- to be used
-        log.debug(f"all_imported: {all_imported}")
-        return all_imported if all_imported else None
+
+    @property
+    def accessor(self):
+        return self.column.accessor
+
+
+    @property
+    def render_method_name(self):
+        return self.column.render_method_name
+
+
+    @property
+    def formatter(self):
+        """Formatter resolved from a formatter name or FormatterSpec"""
+        return self.column.formatter
 
 
 
@@ -176,107 +213,197 @@ class AttributeModel(ModelABC):
 
 
 
+    def uses_formatter(self):
+        """
+        Description:
+            check if the attribute is formatted by its resolved Formatter (and not a
+            render_method set directly on the model), so the Formatter's batch stages
+            apply to it
+        """
+        return self.formatter is not None and\
+            self.render_method in (None, self.formatter.func)
+
+
+
     def build_formatter_callable(self):
         """
         Description:
             Encapsulate some logic needed to create the callable used as the Attribute
             Formatter callable.
+            A render_method set directly on the model wins over the resolved formatter.
         """
-        log = LoggerAdapter(logger, {'name_ext' : 'AttributeModel.build_formatter_callable'})
-        log.debug("entering: {}".format(self))
+        if self.prefetched is not None and self.uses_formatter():
+            #- including plain callables with a prefetch stage; see AttributeColumn
+            return self.formatter.bind(self.source_object, prefetched=self.prefetched)
+        if self.render_method is not None:
+            return self.render_method
+        if self.formatter is not None:
+            return self.formatter.bind(self.source_object)
+        return None
+
 
-        if self.uses_named_render_method():
-            try:
-                log.debug('Getting reference to formatter callable from formatter name')
-                #- TODO: instantiate / get references to named arguments
-                render_method = functools.partial(eval(self.render_method_name),\
-                    source=self.source_object)
-            except NameError:
-                log.error("render_method_name: '{}' seems invalid. Skipping render_method")
-                render_method = None
-        else:
-            log.debug('Getting reference to formatter callable from explicit callable')
-            render_method = self.render_method
 
-        log.debug("exiting")
-        return render_method
+    def fetch_value(self):
+        """
+        Description:
+            Get the value of the attribute from the source object. Only done once per
+            model.
+        """
+        if self._value is _unfetched:
+            #- accessor is compiled once per attribute expression and shared
+            self._value = self.accessor(self.source_object)
+        return self._value
+
 
 
+    def set_value(self, value):
+        """
+        Description:
+            Set the attribute value, when it has already been read off of the source
+            object some other way, so fetch_value() doesn't read it again
+        """
+        self._value = value
+        self._formatted = None
+        self._view_text = None
 
 
 
-    def render_view(self):
+    def format_value(self):
         """
         Description:
-            Abstract Method Implementation.
-            Capture the current model state in an AttributeView and return the view
+            Fetch the attribute value from the source object and run it through the
+            formatter. This is only done once per model; the resulting lines and their
+            natural width are cached and reused by alignment and view construction.
+        Output:
+            tuple of (list of formatted lines, width of the longest line)
         """
-        log = LoggerAdapter(logger, {'name_ext' : 'AttributeModel.render_view'})
-        log.debug("entering: {}".format(self))
+        if self._formatted is not None:
+            return self._formatted
+
+        if logger.isEnabledFor(DEBUG):
+            _format_log.debug("entering: %s", self)
 
         render_method = self.build_formatter_callable()
 
+        stats = current_stats()
         try:
-            #- first try the most specific; assume the attribute is an exact match
-            attr = getattr(self.source_object, self.name)
-            view_data = render_method(attr)
-        except AttributeError:
-            #- if there's not an exact match, it may be an expression, so try that too
-            attr = eval('self.source_object.{}'.format(self.name))
+            if stats is None:
+                attr = self.fetch_value()
+                view_data = render_method(attr)
+            else:
+                start = perf_counter()
+                attr = self.fetch_value()
+                fetched = perf_counter()
+                view_data = render_method(attr)
+                stats.add_cell(self.name, callable_name(render_method), fetched - start,\
+                    perf_counter() - fetched)
+        except TypeError as err:
+            _format_log.error('Error rendering AttributeView: %s: %s', self.name, err)
+            view_data = '_error_'
+
+        return self.set_formatted(view_data)
+
+
+
+    async def format_value_async(self):
+        """
+        Description:
+            format_value() for async sources and formatters: an attribute value that is
+            awaitable (e.g. a coroutine returned by an async property or accessor) is
+            awaited before it is formatted, and so is whatever the formatter returns
+            (e.g. the formatter is a coroutine function).
+        Output:
+            tuple of (list of formatted lines, width of the longest line)
+        """
+        if self._formatted is not None:
+            return self._formatted
+
+        render_method = self.build_formatter_callable()
+
+        stats = current_stats()
+        try:
+            start = perf_counter()
+            attr = self.fetch_value()
+            if isawaitable(attr):
+                attr = await attr
+                #- later fetch_value() calls get the result, not a spent coroutine
+                self._value = attr
+            fetched = perf_counter()
             view_data = render_method(attr)
+            if isawaitable(view_data):
+                view_data = await view_data
+            if stats is not None:
+                stats.add_cell(self.name, callable_name(render_method), fetched - start,\
+                    perf_counter() - fetched)
         except TypeError as err:
-            log.error('Error rendering AttributeView: {}: {}'.format(self.name, err))
+            _format_log.error('Error rendering AttributeView: %s: %s', self.name, err)
             view_data = '_error_'
 
-        #- figure out the width of this view
-        #- the render method may have returned a string or an iterable that will iterate
-        #- over each line for this view
-        if isinstance(view_data, str):
-            log.debug("render method for '{}' returned string".format(self.name))
-            view_width = len(view_data)
-            #- create an Iterable to simplify the rest of the processing
-            view_data = [view_data]
-
-        elif isinstance(view_data, Iterable):
-            view_lines = list(view_data)
-            msg = ["render method for '{}' returned iterable".format(self.name)]
-            msg.append(" of length: {}".format(len(view_lines)))
-            log.debug(''.join(msg))
-            if len(view_lines) == 0:
-                view_width = 0
-            elif len(view_lines) == 1:
-                log.debug("render method returned iterable with a single value")
-                view_width = len(view_lines[0])
-            else:
-                msg = "render method returned iterable with mulitple values ({})".format(\
-                    len(view_lines))
-                log.debug(msg)
-                #- choose the longest line as the view width
-                view_width = len(max(*view_lines, key=len))
-        else:
-            msg = ["render method for {}".format(self.name)]
-            msg.append(" returned non-string, non-iterable object.")
-            raise ValueError(''.join(msg))
-        log.debug("view width for attribute '{}': {}".format(self.name, view_width))
+        return self.set_formatted(view_data)
+
+
 
-        if self.length:
+    def set_formatted(self, view_data, view_width=None):
+        """
+        Description:
+            Set what the formatter returned for this attribute. Used by format_value()
+            and by batch formatters that format a whole column at once
+            (see GroupModel.format_columns)
+        Input:
+            view_data: a string or an iterable of lines
+            view_width: width of the longest line, if view_data is already a list of
+                lines that has been measured (see normalize_view_data)
+        Output:
+            tuple of (list of formatted lines, width of the longest line)
+        """
+        if view_width is None:
+            view_data, view_width = normalize_view_data(self.name, view_data)
+
+        if logger.isEnabledFor(DEBUG):
+            _format_log.debug("render method for '%s' returned %d line(s) | view width: %d",\
+                self.name, len(view_data), view_width)
+
+        self._formatted = (view_data, view_width)
+        return self._formatted
+
+
+
+    def get_view_text(self):
+        """
+        Description:
+            Fit the formatted lines to the current display length and join them into the
+            text of the AttributeView. Cached until the length changes.
+        Output:
+            tuple of (view text, display width of the view text)
+        """
+        if self._view_text is not None and self._view_text[0] == self.length:
+            return self._view_text[1:]
+
+        view_data, view_width = self.format_value()
+
+        if self.length and self.length != view_width:
             if self.length > view_width:
-                log.debug("padding view datum for '{}'".format(self.name))
-                for n, view_datum in enumerate(view_data[:]):
-                    log.debug("padding element {}".format(n))
-                    #- pad it with spaces to fit
-                    view_data[n] = view_datum + ' '*(self.length - view_width)
+                #- pad it with spaces to fit
+                padding = ' '*(self.length - view_width)
+                view_data = [view_datum + padding for view_datum in view_data]
+            else:
+                view_data = [view_datum[0:self.length] for view_datum in view_data]
+
+        view_text = '\n'.join(view_data)
+        text_width = max(map(len, view_text.split('\n')))
+        self._view_text = (self.length, view_text, text_width)
+        return view_text, text_width
 
-            elif self.length < view_width:
-                log.debug("trimming view datum for '{}'".format(self.name))
-                for n, view_datum in enumerate(view_data[:]):
-                    log.debug("trimming element {}".format(n))
-                    view_data[n] = view_datum[0:self.length]
 
-        view_data = '\n'.join(view_data)
-        log.debug("creating AttributeView with data: '{}'".format(view_data))
-        view = AttributeView(view_data, color=self.color)
-        return view
+
+    def render_view(self):
+        """
+        Description:
+            Abstract Method Implementation.
+            Capture the current model state in an AttributeView and return the view
+        """
+        view_text, text_width = self.get_view_text()
+        return AttributeView(view_text, color=self.color, width=text_width)
 
 
 
@@ -285,7 +412,20 @@ class AttributeModel(ModelABC):
         Description:
             return the length of the longest line in this Attribute's render output
         """
-        return self.render_view().get_width()
+        return self.get_view_text()[1]
+
+
+
+    def reset(self):
+        """
+        Description:
+            Drop the cached value and formatter output so the next render fetches and
+            formats the attribute again.
+        """
+        self._value = _unfetched
+        self._formatted = None
+        self._view_text = None
+        self.prefetched = None
 
 
     def get_source(self):
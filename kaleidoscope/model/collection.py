@@ -2,8 +2,9 @@ from logging import getLogger, LoggerAdapter
 logger = getLogger(__name__)
 
 
-from kaleidoscope.view import CollectionView
+from kaleidoscope.view import CollectionView, GroupView
 from .modelabc import ModelABC
+from .group import make_more_view
 
 class CollectionModel(ModelABC):
     """
@@ -16,15 +17,18 @@ class CollectionModel(ModelABC):
         to contain basically everything else that gets output.
 
     Notes:
-        Currently not used. Everything is currently done with Groups
+        Render uses a Collection for iterables of mixed types: one Group per type
     """
-    def __init__(self, group_models=None, colors=None):
+    def __init__(self, group_models=None, colors=None, hidden=(0, 0)):
         """
         group_models: initialize with a collection of GroupModel classes
+        hidden: numbers of objects left out before and after the collection; shown as
+            "... N more" lines (see Render.render_object)
         """
+        self.hidden = hidden
 
         if group_models:
-            self.group_models = group_models
+            self.group_models = list(group_models)
         else:
             self.group_models = list()
 
@@ -34,22 +38,35 @@ class CollectionModel(ModelABC):
             self.colors = self.make_default_colors()
 
 
+    def make_default_colors(self):
+        """Groups color their own objects; there are no collection-wide colors"""
+        return None
+
+
+
     def insert_group(self, group_model, index=0):
         """Add a group to the mapping and say what order it is"""
-        self.groups.insert(index, group_model)
+        self.group_models.insert(index, group_model)
+
+
+
+    def append_group(self, group_model):
+        """Add a group after all the others"""
+        self.group_models.append(group_model)
 
 
 
     def get_source(self):
         """Return the objects that make up this collection"""
-        return self.source
+        return [object_model_x.get_source() for group_model_x in self.group_models\
+            for object_model_x in group_model_x.object_models]
 
 
 
     def get_group(self, name):
         """Get a group by name. Abstract the details of how we store them
         NB: this only returns the first group found that matches the name given"""
-        for group_x in self.groups:
+        for group_x in self.group_models:
             if group_x.name == name:
                 return group_x
 
@@ -59,7 +76,7 @@ class CollectionModel(ModelABC):
         """Gets all the groups that match a name.
         Useful in the case that you have more than one group with the same name"""
         groups = []
-        for group_x in self.groups:
+        for group_x in self.group_models:
             if group_x.name == name:
                 groups.append(group_x)
         return groups
@@ -78,12 +95,18 @@ class CollectionModel(ModelABC):
 
 
 
-    def render_view(self):
+    def render_view(self, render_prologue=True):
         """Returns a CollectionView."""
         group_views = list()
 
         #TODO: account for groups not in group ordering list
         for group_model_x in self.group_models:
-            group_views.append(group_model_x.render_view())
+            group_views.append(group_model_x.render_view(render_prologue=render_prologue))
+
+        before, after = self.hidden
+        if before:
+            group_views.insert(0, GroupView(object_views=[make_more_view(before)]))
+        if after != 0:
+            group_views.append(GroupView(object_views=[make_more_view(after)]))
 
-        return CollectionView(group_views=group_views)
+        return CollectionView(group_views=group_views, render_prologue=render_prologue)
@@ -1,13 +1,58 @@
 from logging import getLogger, LoggerAdapter
 logger = getLogger(__name__)
 
+#- render path loggers; see model/attribute.py
+_prepare_log = LoggerAdapter(logger, {'name_ext' : 'GroupModel.prepare_object_model'})
+_render_log = LoggerAdapter(logger, {'name_ext' : 'GroupModel.render_view'})
+_stream_log = LoggerAdapter(logger, {'name_ext' : 'GroupModel.iter_object_views'})
+_prefetch_log = LoggerAdapter(logger, {'name_ext' : 'GroupModel.prefetch'})
+_format_columns_log = LoggerAdapter(logger, {'name_ext' : 'GroupModel.format_columns'})
+_table_log = LoggerAdapter(logger, {'name_ext' : 'GroupModel.make_table'})
+
+import asyncio
+import collections
 from collections.abc import Sequence, Generator
+from concurrent.futures import ThreadPoolExecutor
 import itertools
 from itertools import cycle, repeat
+import time
 
 from .modelabc import ModelABC
+from .attribute import AttributeModel, normalize_view_data
+from .table import RenderTable
 from kaleidoscope.color import Color, ColoredText
-from kaleidoscope.view import GroupView
+from kaleidoscope.view import GroupView, ObjectView, AttributeView, TableView
+from kaleidoscope.view.group import more_text, add_counts
+from kaleidoscope.instrument import current_stats, callable_name
+from kaleidoscope.util import as_async_iterable, window
+from kaleidoscope.parallel import format_in_processes
+
+#- GroupModel.prepare_object_model default: take the next group color
+_next_color = object()
+
+
+
+def make_more_view(count):
+    """make the ObjectView of the "... N more" line standing in for count objects"""
+    text = more_text(count)
+    return ObjectView(attribute_views=[AttributeView(text, width=len(text))],\
+        delimiters=list())
+
+
+
+def _fetch_object_model(object_model):
+    """read all the attribute values of an object model; run in the fetch thread pool"""
+    for attribute_model_x in object_model.attribute_models:
+        if attribute_model_x._formatted is not None:
+            #- e.g. from a CellCache; its value isn't needed
+            continue
+        try:
+            attribute_model_x.fetch_value()
+        except Exception:
+            #- formatting reads it again and handles the error in order
+            pass
+
+
 
 class GroupModel(ModelABC):
     """
@@ -24,7 +69,9 @@ class GroupModel(ModelABC):
     """
 
     def __init__(self, name='_default_group_', object_models=None, test_method=None,\
-        sort_attr=None, colors=None, align=False):
+        sort_attr=None, colors=None, align=False, fetch_workers=None,\
+        format_processes=None, cell_cache=None, offset=0, limit=None, tail=None,\
+        hidden=(0, 0)):
         """
         Input:
             name: the name of this group
@@ -33,11 +80,35 @@ class GroupModel(ModelABC):
             sort_attr: used to sort the objects in the group
             colors: TODO: document
             align: TODO: document
+            fetch_workers: read the attribute values of this many objects at once using a
+                thread pool (see iter_fetched) [default: read them one at a time]
+            format_processes: format the attributes in a pool of this many processes
+                when rendering the whole group, if it has at least
+                defaults.format_processes_min_rows objects (see kaleidoscope.parallel)
+                [default: format them in this process]
+            cell_cache: CellCache to take formatted attributes from and keep them in
+                when rendering the whole group (see kaleidoscope.cellcache)
+            offset: render the object models from this index on
+            limit: max number of object models to render [default: all of them]
+            tail: render only the last this many object models (instead of offset/limit)
+                Object models outside of the window are not fetched, formatted or
+                measured and a "... N more" line stands in for them.
+            hidden: numbers of objects before and after the object models that were
+                left out before they were ever modeled (see Render.render_object); the
+                index prologues and the "... N more" lines count them in. The number
+                after can be None: there are more, but how many isn't known
         """
         log = LoggerAdapter(logger, {'name_ext' : 'GroupModel.__init__'})
-        log.debug("Entering: align={}".format(align))
+        log.debug("Entering: align=%s", align)
         self.name = name
         self.align = align
+        self.fetch_workers = fetch_workers
+        self.format_processes = format_processes
+        self.cell_cache = cell_cache
+        self.offset = offset
+        self.limit = limit
+        self.tail = tail
+        self.hidden = hidden
         self.set_colors(colors)
 
         if test_method is None:
@@ -156,7 +227,7 @@ class GroupModel(ModelABC):
                 self.colors = colors
         else:
             self.colors = repeat(None)
-        log.debug("Exiting: self.colors is: {}".format(self.colors))
+        log.debug("Exiting: self.colors is: %s", self.colors)
         return
 
 
@@ -169,62 +240,643 @@ class GroupModel(ModelABC):
             return None
 
 
+    def prepare_object_model(self, index, object_model, index_width=0, render_prologue=True,\
+        color=_next_color):
+        """
+        Description:
+            Apply the group level state to a single ObjectModel before it is rendered:
+            the next group color (if set) and the group sequence index prologue.
+        Input:
+            index: position of the object model in the group
+            object_model: the ObjectModel to prepare
+            index_width: width to pad the index to so the prologues line up
+            render_prologue: whether or not to set the index prologue
+            color: color to use instead of the next group color (None for no color)
+        """
+        #- override object model colors with group colors, if set
+        next_color = self.get_next_color() if color is _next_color else color
+        if next_color:
+            _prepare_log.debug("setting object model color to next_color: %s", next_color)
+            object_model.set_colors([next_color], match_delimiter=True)
+
+        if render_prologue:
+            #- add the group sequence index as leading output of the object view
+            index_str = '{current_index: <{max_line_num_strlen}}: '.format(\
+                current_index=str(index), max_line_num_strlen=index_width)
+
+            #- match proglogue color to object color
+            prologue = ColoredText(index_str, next_color)
+            object_model.prologue = prologue
+
+
+
+    def iter_fetched(self, object_models, fetch_workers=None):
+        """
+        Description:
+            Read the attribute values of the object models concurrently in a thread pool.
+            Attribute access can be I/O bound (e.g. boto3 resources lazily load() their
+            data over the network the first time an attribute is read), and done one
+            object at a time a render takes the sum of all the round trips.
+
+            Object models are yielded in their original order as soon as their values
+            have been read. Reading runs at most 2 * fetch_workers objects ahead of the
+            consumer, so this works for streams of object models as well.
+
+            An attribute that fails to be read is left alone and is read (and fails)
+            again when it is formatted, just like without the thread pool.
+        Input:
+            object_models: iterable of ObjectModels
+            fetch_workers: max number of threads [default: self.fetch_workers]
+        Output:
+            generator of the same ObjectModels
+        """
+        workers = self.fetch_workers if fetch_workers is None else fetch_workers
+        if not workers or workers < 2:
+            yield from object_models
+            return
+
+        stats = current_stats()
+        with ThreadPoolExecutor(max_workers=workers,\
+            thread_name_prefix='kaleidoscope-fetch') as executor:
+            pending = collections.deque()
+            for object_model_x in object_models:
+                pending.append((object_model_x, executor.submit(_fetch_object_model,\
+                    object_model_x)))
+                if len(pending) >= 2 * workers:
+                    yield self._wait_fetched(pending.popleft(), stats)
+            while pending:
+                yield self._wait_fetched(pending.popleft(), stats)
+
+
+
+    async def aiter_formatted(self, object_models, concurrency):
+        """
+        Description:
+            The asyncio counterpart of iter_fetched(): fetch and format the object
+            models concurrently on the event loop (see ObjectModel.format_async), at
+            most `concurrency` of them at a time.
+            Object models are yielded in their original order as soon as they are
+            formatted, so this works for unbounded streams as well.
+        Input:
+            object_models: iterable or async iterable of ObjectModels
+            concurrency: max number of object models being formatted at once
+        Output:
+            async generator of the same ObjectModels
+        """
+        concurrency = max(1, concurrency or 1)
+        pending = collections.deque()
+        try:
+            async for object_model_x in as_async_iterable(object_models):
+                pending.append(asyncio.ensure_future(object_model_x.format_async()))
+                if len(pending) >= concurrency:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            #- the consumer stopped early or something failed; don't leave tasks behind
+            for task in pending:
+                task.cancel()
+
+
+
+    def _wait_fetched(self, pending_fetch, stats):
+        """wait on the read of an object model's attribute values and return the model"""
+        object_model, future = pending_fetch
+        if stats is None:
+            future.result()
+        else:
+            start = time.perf_counter()
+            future.result()
+            stats.add_stage('attribute_fetch', time.perf_counter() - start)
+        return object_model
+
+
+
+    def prefetch(self, object_models):
+        """
+        Description:
+            Run the prefetch stage of the attribute formatters that have one over a batch
+            of object models before any of them are formatted, so each formatter can
+            look up what it needs for the whole batch at once (see
+            formatter.Formatter.prefetch). The result is handed to every attribute
+            model in the batch.
+        Input:
+            object_models: ObjectModels to prefetch for
+        """
+        stats = current_stats()
+        for formatter, attribute_models in self._batch_attribute_models(object_models,\
+            'prefetcher'):
+            #- formatted ones (e.g. from a CellCache) don't need anything prefetched
+            attribute_models = [attribute_model_x for attribute_model_x in\
+                attribute_models if attribute_model_x._formatted is None]
+            if not attribute_models:
+                continue
+
+            start = time.perf_counter()
+            try:
+                prefetched = formatter.prefetch(\
+                    [attribute_model_x.fetch_value() for attribute_model_x in attribute_models],\
+                    [attribute_model_x.source_object for attribute_model_x in attribute_models])
+            except Exception as err:
+                #- the formatters can still do their own lookups
+                _prefetch_log.error("prefetch for %s failed: %s", formatter.name, err)
+                continue
+            finally:
+                if stats is not None:
+                    stats.add_stage('prefetch', time.perf_counter() - start)
+
+            _prefetch_log.debug("prefetched %s for %d objects", formatter.name,\
+                len(attribute_models))
+            for attribute_model_x in attribute_models:
+                attribute_model_x.prefetched = prefetched
+
+
+
+    def format_columns(self, object_models):
+        """
+        Description:
+            Format every attribute that has a batch formatter a column at a time: one
+            call to the batch formatter with the values of that attribute across the
+            object models (see formatter.Formatter.format_batch). Other attributes are
+            formatted per value later on, as usual.
+        Input:
+            object_models: ObjectModels to format the columns of
+        """
+        stats = current_stats()
+        for formatter, attribute_models in self._batch_attribute_models(object_models,\
+            'batcher'):
+            #- anything already formatted (e.g. an earlier render) stays as it is
+            attribute_models = [attribute_model_x for attribute_model_x in\
+                attribute_models if attribute_model_x._formatted is None]
+            if not attribute_models:
+                continue
+
+            start = time.perf_counter()
+            values = [attribute_model_x.fetch_value() for attribute_model_x in\
+                attribute_models]
+            fetched = time.perf_counter()
+            extra_kwargs = dict()
+            if attribute_models[0].prefetched is not None:
+                extra_kwargs['prefetched'] = attribute_models[0].prefetched
+            try:
+                renderings = formatter.format_batch(values,\
+                    [attribute_model_x.source_object for attribute_model_x in\
+                    attribute_models], **extra_kwargs)
+            except Exception as err:
+                #- leave them to be formatted one at a time
+                _format_columns_log.error("batch formatter %s failed: %s", formatter.name,\
+                    err)
+                continue
+
+            if stats is not None:
+                stats.add_column(attribute_models[0].name, formatter.name,\
+                    fetched - start, time.perf_counter() - fetched, len(values))
+
+            for attribute_model_x, rendering in zip(attribute_models, renderings):
+                attribute_model_x.set_formatted(rendering)
+
+
+
+    def _batch_attribute_models(self, object_models, stage):
+        """
+        Description:
+            Collect the attribute models across object models that share a Formatter
+            with a batch stage
+        Input:
+            object_models: ObjectModels to collect the attribute models of
+            stage: name of the Formatter attribute holding the batch stage
+                ('prefetcher' or 'batcher')
+        Output:
+            list of (Formatter, [AttributeModels]); one per attribute name and formatter
+        """
+        #- (attribute name, formatter callable) --> (Formatter, [AttributeModels])
+        batches = dict()
+        for object_model_x in object_models:
+            for attribute_model_x in object_model_x.attribute_models:
+                if not attribute_model_x.uses_formatter():
+                    continue
+                formatter = attribute_model_x.formatter
+                if getattr(formatter, stage) is None:
+                    continue
+                key = (attribute_model_x.name, formatter.func)
+                try:
+                    batches[key][1].append(attribute_model_x)
+                except KeyError:
+                    batches[key] = (formatter, [attribute_model_x])
+        return list(batches.values())
+
+
+
+    def window_object_models(self):
+        """
+        Description:
+            Get the object models to render, as set by offset, limit and tail
+        Output:
+            tuple of (list of ObjectModels, number of objects before them, number of
+                objects after them or None if that isn't known); the numbers include the
+            hidden ones
+        """
+        object_models, before, after = window(self.object_models, offset=self.offset,\
+            limit=self.limit, tail=self.tail)
+        return object_models, before + self.hidden[0], add_counts(after, self.hidden[1])
+
+
+
     def render_view(self, render_prologue=True):
         """Returns a GroupView"""
-        log = LoggerAdapter(logger, {'name_ext' : 'GroupModel.render_view'})
-        log.debug("Entering")
+        object_models, before, after = self.window_object_models()
 
-        #- get number of digits in the number of object models
-        max_line_num_strlen = len(str(len(self.object_models)))
-        log.debug("max_line_num_strlen: {}".format(max_line_num_strlen))
-        next_color = None
+        #- cached cells skip the fetch and format stages below
+        cache_misses = None
+        if self.cell_cache is not None:
+            cache_misses = self.cell_cache.load(object_models)
+
+        #- just run the fetch phase to completion
+        collections.deque(self.iter_fetched(object_models), maxlen=0)
+        self.prefetch(object_models)
+        self.format_columns(object_models)
 
         #- keep track of all the lengths of the attributes
         #- across objects (so we can line them all up when we render a view)
         attr_maxlens = dict()
+        if self.format_processes and self.format_processes > 1:
+            #- widths of the columns formatted in the pool are already known
+            attr_maxlens = format_in_processes(object_models, self.format_processes)
 
-        for n,object_model_x in enumerate(self.object_models):
-            #- override object model colors with group colors, if set
-            next_color = self.get_next_color()
-            if next_color:
-                log.debug("setting object model color to next_color: {}".format(next_color))
-                object_model_x.set_colors([next_color], match_delimiter=True)
-
-            if render_prologue:
-                #- add the group sequence index as leading output of the object view
-                index_str = '{current_index: <{max_line_num_strlen}}: '.format(\
-                    current_index=str(n), max_line_num_strlen=max_line_num_strlen)
+        #- get number of digits in the number of object models
+        max_line_num_strlen = len(str(before + len(object_models)))
+        _render_log.debug("max_line_num_strlen: %s", max_line_num_strlen)
 
-                log.debug("index_str: '{}'".format(index_str))
-                #- match proglogue color to object color
-                prologue = ColoredText(index_str, next_color)
-                object_model_x.prologue = prologue
+        for n,object_model_x in enumerate(object_models, before):
+            self.prepare_object_model(n, object_model_x, max_line_num_strlen,\
+                render_prologue=render_prologue)
 
             if self.align:
                 #- code to line up the attribute lengths across objects
-                for attribute_model_x in object_model_x.attribute_models:
-                    attr_name = attribute_model_x.name
-                    attr_width = attribute_model_x.get_width()
-                    log.debug(f"attr_name:'{attr_name}' | attr_width: {attr_width}")
-                    try:
-                        attr_maxlens[attr_name] = max(attr_maxlens[attr_name], attr_width)
-
-                    except KeyError:
-                        attr_maxlens[attr_name] = attr_width
+                self.measure_object_model(object_model_x, attr_maxlens)
+        _render_log.debug("attr_maxlens: %s", attr_maxlens)
 
         object_views = list()
-        for object_model_x in self.object_models:
+        if before:
+            object_views.append(make_more_view(before))
+        for object_model_x in object_models:
             if self.align:
                 #- dynamically align attribute lengths
                 #- TODO: if each attribute has a defined length, skip this
-                for attribute_model_x in object_model_x.attribute_models:
-                    attribute_model_x.length = attr_maxlens[attribute_model_x.name]
-            object_views.append(object_model_x.render_view())
+                object_views.append(self.render_aligned(object_model_x, attr_maxlens))
+            else:
+                object_views.append(object_model_x.render_view())
+        if after != 0:
+            object_views.append(make_more_view(after))
+
+        if cache_misses:
+            self.cell_cache.store(cache_misses)
 
         groupView = GroupView(object_views=object_views)
-        log.debug("Returning groupView: {}".format(groupView))
+        _render_log.debug("Returning groupView: %s", groupView)
         return groupView
 
 
 
+    def make_table(self, objects, spec):
+        """
+        Description:
+            Render objects into a RenderTable, a column at a time, without making an
+            ObjectModel and AttributeModels for every object.
+            Formatters get the same batch stages as in render_view(): a column's
+            prefetch stage runs over the whole column and a batch formatter formats it
+            in one call.
+            With fetch_workers, the attribute values are read an object (row) at a time
+            in a thread pool first, like iter_fetched() does for object models.
+            format_processes and cell caches don't apply to tables.
+        Input:
+            objects: iterable of the source objects
+            spec: ObjectModelSpec to render them with
+        Output:
+            RenderTable
+        """
+        sources = [obj_x for obj_x in objects if self.test_method and\
+            self.test_method(obj_x)]
+        attributes = spec.attributes or list()
+        table = RenderTable([attribute_x.name for attribute_x in attributes],\
+            [attribute_x.length for attribute_x in attributes])
+
+        stats = current_stats()
+        #- resolves the formatters the same way a per object render does
+        column_models = [AttributeModel(None, attribute_x.name, attribute_x.length,\
+            attribute_x.formatter) for attribute_x in attributes]
+        rows = None
+        if self.fetch_workers and self.fetch_workers > 1 and sources:
+            start = time.perf_counter()
+            rows = self._fetch_rows(sources, [column_model_x.accessor for column_model_x\
+                in column_models])
+            if stats is not None:
+                stats.add_stage('attribute_fetch', time.perf_counter() - start)
+
+        for m, column_model in enumerate(column_models):
+            start = time.perf_counter()
+            if rows is None:
+                values = [column_model.accessor(source_x) for source_x in sources]
+            else:
+                values = [row_x[m] for row_x in rows]
+            fetched = time.perf_counter()
+            renderings, formatter_name = self._format_column(column_model, values, sources)
+            if stats is not None:
+                stats.add_column(column_model.name, formatter_name, fetched - start,\
+                    time.perf_counter() - fetched, len(values))
+            table.set_column(m, [normalize_view_data(column_model.name, rendering_x) for\
+                rendering_x in renderings])
+
+        #- group colors win; otherwise each row takes the next of the spec's colors
+        row_colors = list()
+        delimiter_colors = list()
+        for source_x in sources:
+            group_color = self.get_next_color()
+            row_colors.append(group_color or next(spec.colors))
+            delimiter_colors.append(group_color or next(spec.delimiter_colors))
+        table.set_row_colors(row_colors, delimiter_colors)
+        _table_log.debug("made %s", table)
+        return table
+
+
+
+    def _fetch_rows(self, sources, accessors):
+        """
+        Description:
+            read the attribute values of every object for make_table() in a thread pool
+            of fetch_workers threads
+        Output:
+            list of tuples of the attribute values of each object, in order
+        """
+        def read_row(source):
+            return tuple(accessor(source) for accessor in accessors)
+
+        with ThreadPoolExecutor(max_workers=self.fetch_workers,\
+            thread_name_prefix='kaleidoscope-fetch') as executor:
+            return list(executor.map(read_row, sources))
+
+
+
+    def _format_column(self, column_model, values, sources):
+        """
+        Description:
+            format every value of a column for make_table()
+        Output:
+            tuple of (list of renderings, formatter name for the stats)
+        """
+        formatter = column_model.formatter if column_model.uses_formatter() else None
+        extra_kwargs = dict()
+        if formatter is not None and formatter.prefetcher is not None and values:
+            try:
+                extra_kwargs['prefetched'] = formatter.prefetch(values, sources)
+            except Exception as err:
+                _prefetch_log.error("prefetch for %s failed: %s", formatter.name, err)
+
+        if formatter is not None and formatter.batcher is not None and values:
+            try:
+                return formatter.format_batch(values, sources, **extra_kwargs),\
+                    formatter.name
+            except Exception as err:
+                #- format them one at a time
+                _format_columns_log.error("batch formatter %s failed: %s",\
+                    formatter.name, err)
+
+        renderings = list()
+        render_method = column_model.render_method
+        for value_x, source_x in zip(values, sources):
+            if formatter is not None and (column_model.render_method is None or\
+                extra_kwargs):
+                render_method = formatter.bind(source_x, **extra_kwargs)
+            try:
+                renderings.append(render_method(value_x))
+            except TypeError as err:
+                _table_log.error('Error rendering attribute: %s: %s', column_model.name,\
+                    err)
+                renderings.append('_error_')
+        return renderings, callable_name(render_method)
+
+
+
+    def render_table_view(self, objects, spec, render_prologue=True):
+        """
+        Description:
+            Render objects into a TableView by way of a RenderTable (see make_table).
+            Rows are colored with the group colors, or the spec colors if the group has
+            none, one color per row. Only the objects in the group's window (offset,
+            limit, tail) go into the table.
+        Input:
+            objects: iterable of the source objects
+            spec: ObjectModelSpec to render them with
+            render_prologue: prefix each row with its index
+        Output:
+            TableView
+        """
+        objects, before, after = window(objects, offset=self.offset, limit=self.limit,\
+            tail=self.tail)
+        return TableView(self.make_table(objects, spec), delimiter=spec.delimiter,\
+            align=self.align, render_prologue=render_prologue,\
+            hidden=(before + self.hidden[0], add_counts(after, self.hidden[1])))
+
+
+
+    def iter_object_views(self, object_models=None, render_prologue=True,\
+        align_window=None, align_budget=None, header=False):
+        """
+        Description:
+            Lazily render ObjectModels into ObjectViews one at a time.
+            Nothing is held on to after a view is yielded, so this can be used with
+            unbounded iterables of ObjectModels.
+
+            Full alignment needs every object model up front, so streamed objects are
+            aligned from a bounded lookahead window instead: the first align_window
+            objects (or as many as arrive within align_budget seconds) are buffered to
+            measure the column widths before anything is yielded. After that, columns
+            only ever get wider; a later object that doesn't fit widens its column for
+            itself and every object after it.
+        Input:
+            object_models: iterable of ObjectModels [default: this group's object models]
+                These do not get added to the group.
+            render_prologue: whether or not to prefix each object with its group index
+            align_window: number of objects to look ahead at to size the columns
+            align_budget: max seconds to spend buffering the lookahead window
+            header: yield a header view of the attribute names before the first object
+                and again every time a column gets wider
+        Output:
+            generator of ObjectViews
+        """
+        if object_models is None:
+            object_models = self.object_models
+
+        try:
+            index_width = len(str(len(object_models)))
+        except TypeError:
+            #- unsized; we don't know how wide the largest index will be
+            index_width = 0
+
+        #- same membership test as append_object_model()
+        members = (object_model_x for object_model_x in object_models if\
+            self.test_method and self.test_method(object_model_x.get_source()))
+
+        view_stream = ViewStream(self, index_width=index_width,\
+            render_prologue=render_prologue, align_window=align_window,\
+            align_budget=align_budget, header=header)
+        for object_model_x in self.iter_fetched(members):
+            yield from view_stream.push(object_model_x)
+        yield from view_stream.close()
+
+
+
+    def _flush_aligned(self, object_models, attr_maxlens, header=False):
+        """yield aligned views of buffered object models, with an optional header"""
+        if header:
+            yield self.make_header_view(object_models[0], attr_maxlens)
+        for object_model_x in object_models:
+            yield self.render_aligned(object_model_x, attr_maxlens)
+
+
+
+    def measure_object_model(self, object_model, attr_maxlens):
+        """
+        Description:
+            Widen the running per-attribute max widths to fit an object model.
+        Input:
+            object_model: ObjectModel to measure
+            attr_maxlens: dict of attribute name --> max width; updated in place
+        Output:
+            True if any column got wider than it was before
+        """
+        widened = False
+        for attribute_model_x in object_model.attribute_models:
+            attr_name = attribute_model_x.name
+            attr_width = attribute_model_x.get_width()
+            if attr_width > attr_maxlens.get(attr_name, -1):
+                widened = attr_name in attr_maxlens or widened
+                attr_maxlens[attr_name] = attr_width
+        return widened
 
+
+
+    def render_aligned(self, object_model, attr_maxlens):
+        """Render an object model into an ObjectView with its attributes set to the widths"""
+        for attribute_model_x in object_model.attribute_models:
+            attribute_model_x.length = attr_maxlens[attribute_model_x.name]
+        return object_model.render_view()
+
+
+
+    def make_header_view(self, object_model, attr_maxlens):
+        """
+        Description:
+            Make an ObjectView of the attribute names of an object model, lined up with
+            the aligned object views.
+        """
+        attribute_views = list()
+        for attribute_model_x in object_model.attribute_models:
+            width = attr_maxlens[attribute_model_x.name]
+            name = str(attribute_model_x.name)[0:width]
+            attribute_views.append(AttributeView(name.ljust(width), width=width))
+
+        delimiters = [object_model.delimiter] * (len(attribute_views) - 1)
+        prologue_width = len(object_model.prologue.plain()) if object_model.prologue else 0
+        return ObjectView(attribute_views=attribute_views, delimiters=delimiters,\
+            prologue=ColoredText(' ' * prologue_width, None))
+
+
+
+    def stream_view(self, object_models=None, render_prologue=True, **align_kwargs):
+        """
+        Description:
+            Returns a GroupView whose ObjectViews are rendered on demand.
+            See iter_object_views() for the alignment keyword arguments.
+        """
+        return GroupView(object_views=self.iter_object_views(object_models,\
+            render_prologue=render_prologue, **align_kwargs))
+
+
+
+class ViewStream(object):
+    """
+    Description:
+        The per-object state of streaming a group: the running index, the column widths
+        and the alignment lookahead window. Object models are pushed in one at a time,
+        already fetched, and the ObjectViews that are ready come back out.
+        See GroupModel.iter_object_views for how objects are aligned.
+    """
+    def __init__(self, group_model, index_width=0, render_prologue=True,\
+        align_window=None, align_budget=None, header=False):
+        """
+        Input:
+            group_model: the GroupModel the object models are rendered for
+            index_width: width to pad the index prologues to
+            render_prologue: whether or not to prefix each object with its group index
+            align_window: number of objects to look ahead at to size the columns
+            align_budget: max seconds to spend buffering the lookahead window
+            header: make header views of the attribute names; see iter_object_views
+        """
+        self.group_model = group_model
+        self.index_width = index_width
+        self.render_prologue = render_prologue
+        self.align_window = align_window
+        self.header = header
+        self.align = align_window is not None or align_budget is not None
+        self.attr_maxlens = dict()
+        self.lookahead = list()
+        self.deadline = None
+        if align_budget is not None:
+            self.deadline = time.monotonic() + align_budget
+        self.count = 0
+
+
+
+    def push(self, object_model):
+        """
+        Description:
+            Add the next object model of the stream
+        Output:
+            list of the ObjectViews that are ready to be output (possibly empty)
+        """
+        group_model = self.group_model
+        group_model.prepare_object_model(self.count, object_model, self.index_width,\
+            render_prologue=self.render_prologue)
+        self.count += 1
+
+        if not self.align:
+            return [object_model.render_view()]
+
+        widened = group_model.measure_object_model(object_model, self.attr_maxlens)
+        if self.lookahead is not None:
+            self.lookahead.append(object_model)
+            if (self.align_window is None or len(self.lookahead) < self.align_window) and\
+                (self.deadline is None or time.monotonic() < self.deadline):
+                return list()
+
+            #- lookahead window is full; flush it with the widths it measured
+            _stream_log.debug("lookahead window closed after %d objects: %s",\
+                len(self.lookahead), self.attr_maxlens)
+            lookahead, self.lookahead = self.lookahead, None
+            return list(group_model._flush_aligned(lookahead, self.attr_maxlens,\
+                self.header))
+
+        views = list()
+        if widened:
+            _stream_log.debug("columns widened: %s", self.attr_maxlens)
+            if self.header:
+                views.append(group_model.make_header_view(object_model, self.attr_maxlens))
+        views.append(group_model.render_aligned(object_model, self.attr_maxlens))
+        return views
+
+
+
+    def close(self):
+        """
+        Description:
+            End of the stream
+        Output:
+            list of the ObjectViews still held in the lookahead window
+        """
+        lookahead, self.lookahead = self.lookahead, None
+        if not lookahead:
+            return list()
+        #- input ran out before the lookahead window closed
+        return list(self.group_model._flush_aligned(lookahead, self.attr_maxlens,\
+            self.header))
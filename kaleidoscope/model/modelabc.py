@@ -11,6 +11,8 @@ class ModelABC(ABC):
             will also have a render method and this method will automate the rendering of
             the model to a view and then the view to the screen
     """
+    #- let subclasses be slotted
+    __slots__ = ()
 
     @abstractmethod
     def get_source(self):
@@ -1,12 +1,17 @@
-from logging import getLogger, LoggerAdapter
+from logging import getLogger, LoggerAdapter, DEBUG
 logger = getLogger(__name__)
 
+#- render path loggers; see model/attribute.py
+_init_log = LoggerAdapter(logger, {'name_ext' : 'ObjectModel.__init__'})
+_render_log = LoggerAdapter(logger, {'name_ext' : 'ObjectModel.render_view'})
+
+import asyncio
 from itertools import cycle, repeat
 
 from .modelabc import ModelABC
 from kaleidoscope.view import ObjectView
 from kaleidoscope.color import Color, ColoredText
-from .attribute import AttributeModel
+from .attribute import AttributeModel, spec_columns
 
 
 class ObjectModel(ModelABC):
@@ -15,37 +20,38 @@ class ObjectModel(ModelABC):
     The Specification object lists what specific attributes of the object we are interested in modeling.
     """
 
+    #- the delimiter, attribute names, lengths and formatters come from the spec and its
+    #- shared AttributeColumns; only per object state is kept here
+    __slots__ = ('source_object', 'spec', 'attribute_models', 'colors',\
+        'delimiter_colors', 'prologue')
+
     #-TODO: epilogue attribute for stuff to display after object
-    def __init__(self, source_object, spec, colors=None, prologue=None):
+    def __init__(self, source_object, spec, colors=None, prologue=None, columns=None):
         """source_object: the object that is being modeled
         spec: the ObjectModelSpec object that is used to build this model
         colors: list of colors to use for attributes
         prologue: ColoredText type for things to place in output stream before the object
             rendering output
+        columns: spec_columns(spec), when making the models of many objects with the
+            same spec [default: get them from the spec]
         """
-        log = LoggerAdapter(logger, {'name_ext' : 'ObjectModel.__init__'})
-        log.debug("Entering")
-
         self.source_object = source_object
-        self.attribute_models = self.make_attribute_models_from_spec(spec)
+        self.spec = spec
+        self.attribute_models = self.make_attribute_models_from_spec(spec, columns)
         _colors = self.get_colors_from_spec(spec)
         self.set_colors(_colors)
         if colors:
-            log.debug("Overriding spec colors with parameter colors")
+            _init_log.debug("Overriding spec colors with parameter colors")
             self.set_colors(colors)
 
-        self.delimiter = self.get_delimiter_from_spec(spec)
         self.delimiter_colors = self.get_delimiter_colors_from_spec(spec)
 
         #- stuff that displays prepended to the object display
-        log.debug("setting prologue: '{}'".format(prologue))
         self.prologue = prologue
-        log.debug("Exiting")
 
 
 
     def set_colors(self, colors, match_delimiter=False):
-        log = LoggerAdapter(logger, {'name_ext' : 'ObjectModel.set_colors'})
         try:
             self.colors = cycle(colors)
         except TypeError:
@@ -76,6 +82,12 @@ class ObjectModel(ModelABC):
         return spec.delimiter
 
 
+    @property
+    def delimiter(self):
+        """string placed between the attributes; from the spec"""
+        return self.get_delimiter_from_spec(self.spec)
+
+
     def dynamically_color(self, text=None):
         """
         Description:
@@ -112,44 +124,50 @@ class ObjectModel(ModelABC):
         return spec.delimiter_colors
 
 
-    def make_attribute_models_from_spec(self, spec):
+    def make_attribute_models_from_spec(self, spec, columns=None):
         """create a list of AttributeModel objects from the ObjectModelSpec"""
-        log = LoggerAdapter(logger, {'name_ext' :\
-            'ObjectModel.make_attribute_models_from_spec'})
-        log.debug("Entering")
-        log.debug("enumerating attributes from spec: {}".format(spec.attributes))
+        if columns is None:
+            columns = spec_columns(spec)
         attribute_models = list()
-        if spec.attributes:
-            for attribute in spec.attributes:
-                _am = AttributeModel(self.source_object, *attribute, color=next(spec.colors))
-                attribute_models.append(_am)
-                
-        log.debug("Exiting: attribute_models: {}".format(attribute_models))
+        for column in columns:
+            _am = AttributeModel(self.source_object, column.name, column=column,\
+                color=next(spec.colors))
+            attribute_models.append(_am)
         return attribute_models
 
 
+    async def format_async(self):
+        """
+        Description:
+            Fetch and format all the attributes of the object concurrently, awaiting any
+            awaitable attribute values and formatter results.
+            See AttributeModel.format_value_async
+        Output:
+            this ObjectModel, ready to render_view() without blocking
+        """
+        await asyncio.gather(*[attribute_model_x.format_value_async() for\
+            attribute_model_x in self.attribute_models])
+        return self
+
+
     def render_view(self):
         """Return an ObjectView"""
-        log = LoggerAdapter(logger, {'name_ext' : 'ObjectModel.render_view'})
+        debug = logger.isEnabledFor(DEBUG)
         attribute_views = list()
-        delimiters = list()
         for n,attribute_model_x in enumerate(self.attribute_models):
             if self.colors:
                 #- override AttributeModel color with ObjectModel color
                 color = self.get_next_color()
                 attribute_model_x.set_color(color)
-                log.debug("set AttributeModel color: {}: {}".format(color,\
-                    attribute_model_x))
+                if debug:
+                    _render_log.debug("set AttributeModel color: %s: %s", color,\
+                        attribute_model_x)
 
             attribute_views.append(attribute_model_x.render_view())
 
-        num_delims = 0
         delimiters = list()
-
         for attr in range(len(self.attribute_models) - 1):
             delimiters.append(ColoredText(self.delimiter, next(self.delimiter_colors)))
-
-        log.debug("Created {} delimiters".format(len(delimiters)))
         return ObjectView(attribute_views=attribute_views,\
             delimiters=delimiters, prologue=self.prologue)
 
@@ -0,0 +1,115 @@
+from logging import getLogger, LoggerAdapter
+logger = getLogger(__name__)
+
+from array import array
+from itertools import repeat
+
+
+class RenderTable(object):
+    """
+    Description:
+        Columnar intermediate form of a rendered group.
+        Instead of an ObjectModel with an AttributeModel per attribute for every object,
+        a RenderTable keeps one list of formatted texts per attribute along with
+        parallel arrays of the display width and number of lines of each text, plus the
+        color of each row. Aligning a column is a max() over its widths, and a
+        TableView lays the rows out straight from the columns.
+
+        Tables are filled by GroupModel.make_table()
+    """
+    __slots__ = ('names', 'lengths', 'texts', 'widths', 'line_counts', 'row_colors',\
+        'delimiter_colors')
+
+    def __init__(self, names, lengths=None):
+        """
+        Input:
+            names: attribute name of each column
+            lengths: display length of each column; None for the natural width
+        """
+        self.names = list(names)
+        self.lengths = list(lengths) if lengths else [None] * len(self.names)
+        #- per column: formatted text ('\n' separated lines), width, number of lines
+        self.texts = [list() for name_x in self.names]
+        self.widths = [array('L') for name_x in self.names]
+        self.line_counts = [array('L') for name_x in self.names]
+        #- per row: Color of the attributes, Color of the delimiters
+        self.row_colors = list()
+        self.delimiter_colors = list()
+
+
+
+    def __len__(self):
+        """number of rows"""
+        return len(self.row_colors)
+
+
+
+    def set_row_colors(self, colors, delimiter_colors=None):
+        """
+        Description:
+            Set the color of each row and of the delimiters of each row
+        Input:
+            colors: Color (or None) per row
+            delimiter_colors: Color (or None) per row [default: the row colors]
+        """
+        self.row_colors = list(colors)
+        if delimiter_colors is None:
+            self.delimiter_colors = self.row_colors
+        else:
+            self.delimiter_colors = list(delimiter_colors)
+
+
+
+    def set_column(self, column, renderings):
+        """
+        Description:
+            Fill in a column
+        Input:
+            column: index of the column
+            renderings: (list of lines, width of the longest line) per row; see
+                model.attribute.normalize_view_data
+        """
+        texts = self.texts[column]
+        widths = self.widths[column]
+        line_counts = self.line_counts[column]
+        for lines, width in renderings:
+            texts.append(lines[0] if len(lines) == 1 else '\n'.join(lines))
+            widths.append(width)
+            line_counts.append(len(lines))
+
+
+
+    def get_lines(self, column, row):
+        """the lines of text of a cell"""
+        if self.line_counts[column][row] == 1:
+            return [self.texts[column][row]]
+        return self.texts[column][row].split('\n')
+
+
+
+    def column_width(self, column):
+        """display width of an aligned column: its length if set, else its widest cell"""
+        if self.lengths[column]:
+            return self.lengths[column]
+        return max(self.widths[column], default=0)
+
+
+
+    def cell_widths(self, column, align=True):
+        """
+        Description:
+            The display width of each cell of a column
+        Input:
+            align: every cell is the width of the column; otherwise each cell is its own
+                width (or the column length, if set)
+        Output:
+            iterable of widths, one per row
+        """
+        if align or self.lengths[column]:
+            return repeat(self.column_width(column), len(self))
+        return self.widths[column]
+
+
+
+    def __repr__(self):
+        return "{}(names={}, rows={})".format(self.__class__.__name__, self.names, len(self))
@@ -11,7 +11,7 @@ from kaleidoscope.spec import AttributeSpec, FormatterSpec
 
 
 class ObjectSpecConfigParser(NamespaceConfigParser):
-    object_spec_keys = ['colors', 'description', 'attributes']
+    object_spec_keys = ['colors', 'description', 'attributes', 'key']
 
     def __init__(self, nsroot=None):
         super().__init__(nsroot=nsroot)
@@ -0,0 +1,252 @@
+"""
+Description:
+    Formatting attributes in a pool of processes.
+
+    Rendering a big group with slow pure-python formatters is CPU bound and only ever
+    uses one core. With GroupModel(format_processes=N) the attribute values are read in
+    the parent (source objects usually can't be pickled, e.g. boto3 resources), sent to
+    N worker processes in chunks of plain row tuples, formatted there, and sent back as
+    lines of text along with the widest line of each column in the chunk. The parent
+    merges the chunk widths and lays the views out as usual.
+
+    Each worker gets the column formatters once, as a CompiledSpec, when it starts.
+    Only attributes whose formatter can be called without the source object are
+    formatted in the workers: plain callables that can be pickled. Formatters that take
+    the source object keep being run in the parent, and so does the default, str, which
+    is cheaper to run than to send to a worker and back.
+    The pool is only started for groups of at least defaults.format_processes_min_rows
+    rows; it takes a while to start and pays off only when there is plenty to format.
+"""
+from logging import getLogger, LoggerAdapter
+logger = getLogger(__name__)
+
+_pool_log = LoggerAdapter(logger, {'name_ext' : 'format_in_processes'})
+
+import pickle
+import time
+
+from kaleidoscope import defaults
+from kaleidoscope.instrument import current_stats
+from kaleidoscope.model.attribute import normalize_view_data
+
+#- split the rows into about this many chunks per process, so a slow chunk doesn't
+#- hold up the whole group
+CHUNKS_PER_PROCESS = 4
+
+#- the CompiledSpec of a worker process; see _init_worker()
+_worker_spec = None
+
+#- formatters that are cheaper to run in the parent than to send values to a worker for
+_parent_formatters = (str,)
+
+
+
+class CompiledSpec(object):
+    """
+    Description:
+        The part of an ObjectModelSpec the worker processes need: the name and
+        formatter callable of each attribute formatted in the pool.
+    """
+    __slots__ = ('names', 'formatters')
+
+    def __init__(self, names, formatters):
+        self.names = tuple(names)
+        self.formatters = tuple(formatters)
+
+
+    def __repr__(self):
+        return "CompiledSpec(names={})".format(self.names)
+
+
+
+def pool_formatter(attribute_model):
+    """
+    Description:
+        Get the formatter callable of an attribute model if it can be run in a worker
+        process: it doesn't need the source object or anything from a prefetch stage,
+        and is worth sending the value to a worker for
+    Output:
+        the formatter callable or None
+    """
+    func = None
+    if attribute_model.render_method is not None:
+        func = attribute_model.render_method
+    else:
+        formatter = attribute_model.formatter
+        if formatter is not None and not formatter.takes_source and\
+            attribute_model.prefetched is None:
+            func = formatter.func
+    if func in _parent_formatters:
+        return None
+    return func
+
+
+
+def compile_spec(object_model):
+    """
+    Description:
+        Pick out the attributes of an object model that can be formatted in the pool
+    Output:
+        tuple of (CompiledSpec, list of the attribute model indexes it covers)
+    """
+    names = list()
+    formatters = list()
+    indexes = list()
+    for n, attribute_model_x in enumerate(object_model.attribute_models):
+        func = pool_formatter(attribute_model_x)
+        if func is None:
+            continue
+        try:
+            pickle.dumps(func)
+        except Exception as err:
+            _pool_log.debug("formatting %s in the parent: %s", attribute_model_x.name, err)
+            continue
+        names.append(attribute_model_x.name)
+        formatters.append(func)
+        indexes.append(n)
+    return CompiledSpec(names, formatters), indexes
+
+
+
+def _init_worker(spec):
+    """process pool initializer: keep the CompiledSpec for every chunk"""
+    global _worker_spec
+    _worker_spec = spec
+
+
+
+def format_rows(spec, rows):
+    """
+    Description:
+        Format rows of attribute values with the formatters of a CompiledSpec, the way
+        AttributeModel.format_value() would
+    Input:
+        spec: CompiledSpec
+        rows: list of tuples of attribute values, in the order of spec.names
+    Output:
+        tuple of:
+            list of the formatted rows; a (lines, width) tuple per attribute
+            list of the widest line of each attribute over the rows
+    """
+    widths = [0] * len(spec.names)
+    formatted = list()
+    for row in rows:
+        cells = list()
+        for n, (name, func, value) in enumerate(zip(spec.names, spec.formatters, row)):
+            try:
+                view_data = func(value)
+            except TypeError as err:
+                _pool_log.error('Error rendering AttributeView: %s: %s', name, err)
+                view_data = '_error_'
+            lines, width = normalize_view_data(name, view_data)
+            if width > widths[n]:
+                widths[n] = width
+            cells.append((lines, width))
+        formatted.append(cells)
+    return formatted, widths
+
+
+
+def _format_chunk(rows):
+    """process pool task: format a chunk of rows with the worker's CompiledSpec"""
+    return format_rows(_worker_spec, rows)
+
+
+
+def format_in_processes(object_models, processes, chunk_size=None, min_rows=None):
+    """
+    Description:
+        Format the attributes of object models that can be formatted without their
+        source object in a pool of processes (see the module description).
+        Object models that don't share the spec of the first one, already formatted
+        attributes, and rows whose values can't be read or pickled are left alone to be
+        formatted in the parent as usual. So are the rows of chunks that fail in the
+        pool (e.g. a formatter raised); a formatter error then comes up in the parent
+        the same way it does without the pool.
+    Input:
+        object_models: list of ObjectModels
+        processes: number of worker processes
+        chunk_size: rows per task [default: spread over CHUNKS_PER_PROCESS tasks per
+            process]
+        min_rows: don't start the pool for fewer rows than this
+            [default: defaults.format_processes_min_rows]
+    Output:
+        dict of attribute name --> widest formatted line, merged over every chunk,
+        for the attributes formatted in the pool that don't have a fixed length
+    """
+    if not object_models:
+        return dict()
+
+    spec, indexes = compile_spec(object_models[0])
+    if not indexes:
+        _pool_log.debug("no attributes can be formatted in the pool")
+        return dict()
+
+    #- read the values in the parent, in order
+    model_spec = object_models[0].get_spec()
+    rows = list()
+    targets = list()
+    for object_model_x in object_models:
+        if object_model_x.get_spec() is not model_spec:
+            continue
+        attribute_models = [object_model_x.attribute_models[n] for n in indexes]
+        if all(attribute_model_x._formatted is not None for attribute_model_x in\
+            attribute_models):
+            continue
+        try:
+            rows.append(tuple(attribute_model_x.fetch_value() for attribute_model_x in\
+                attribute_models))
+        except Exception:
+            #- formatting reads it again and handles the error in order
+            continue
+        targets.append(attribute_models)
+
+    if min_rows is None:
+        min_rows = defaults.format_processes_min_rows
+    if not rows or len(rows) < min_rows:
+        _pool_log.debug("formatting %d rows without the pool", len(rows))
+        return dict()
+
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(rows) // (processes * CHUNKS_PER_PROCESS)))
+
+    #- multiprocessing is slow to import; only pay for it when it's used
+    from concurrent.futures import ProcessPoolExecutor
+
+    stats = current_stats()
+    start = time.perf_counter()
+    widths = [0] * len(spec.names)
+    failed_rows = 0
+    first_error = None
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,\
+        initargs=(spec,)) as executor:
+        futures = [(n, executor.submit(_format_chunk, rows[n:n + chunk_size])) for n in\
+            range(0, len(rows), chunk_size)]
+        for n, future in futures:
+            try:
+                formatted, chunk_widths = future.result()
+            except Exception as err:
+                #- leave the chunk to be formatted in the parent
+                failed_rows += len(targets[n:n + chunk_size])
+                if first_error is None:
+                    first_error = err
+                continue
+
+            widths = [max(width, chunk_width) for width, chunk_width in\
+                zip(widths, chunk_widths)]
+            for attribute_models, cells in zip(targets[n:n + chunk_size], formatted):
+                for attribute_model_x, (lines, width) in zip(attribute_models, cells):
+                    if attribute_model_x._formatted is None:
+                        attribute_model_x.set_formatted(lines, width)
+
+    if stats is not None:
+        stats.add_stage('formatting', time.perf_counter() - start)
+    if failed_rows:
+        _pool_log.error("formatting %d of %d rows in the pool failed (first error: %s);"\
+            " formatting them again in this process", failed_rows, len(rows), first_error)
+    _pool_log.debug("formatted %d rows of %s in %d processes", len(rows), spec,\
+        processes)
+
+    first = object_models[0].attribute_models
+    return { name : width for name, width, n in zip(spec.names, widths, indexes)\
+        if not first[n].length }
@@ -5,25 +5,56 @@ Render class is the rendering engine
 #- TODO: when do the attributes get turned into their text?
 #-    AttributeModel, ObjectModel, View, Render?
 
-from logging import getLogger, LoggerAdapter
+from logging import getLogger, LoggerAdapter, DEBUG
 logger = getLogger(__name__)
 
+#- render path loggers are made once; messages use lazy %-style arguments so nothing
+#- (e.g. the repr of every object being rendered) is formatted unless DEBUG is on
+_unwrap_log = LoggerAdapter(logger, {'name_ext' : 'unwraps_renderable decorator'})
+_render_object_log = LoggerAdapter(logger, {'name_ext' : 'Render.render_object'})
+_render_attributes_log = LoggerAdapter(logger,\
+    {'name_ext' : 'Render.render_object_from_attributes'})
+_render_spec_log = LoggerAdapter(logger, {'name_ext' : 'Render.render_object_from_spec'})
+_render_specname_log = LoggerAdapter(logger,\
+    {'name_ext' : 'Render.render_object_from_specname'})
+_render_stream_log = LoggerAdapter(logger, {'name_ext' : 'Render.render_stream'})
+_render_async_log = LoggerAdapter(logger, {'name_ext' : 'Render.render_async'})
+_watch_log = LoggerAdapter(logger, {'name_ext' : 'Render.watch'})
+_collection_log = LoggerAdapter(logger, {'name_ext' : 'Render.make_collection_model'})
+_lookup_log = LoggerAdapter(logger, {'name_ext' : 'Render.lookup_object_spec'})
+_resolve_log = LoggerAdapter(logger, {'name_ext' : 'Render.resolve_object_specname'})
+_lookup_model_log = LoggerAdapter(logger, {'name_ext' : 'Render.lookup_model_spec'})
+
 import collections
+import contextlib
 from collections import ChainMap
-from collections.abc import Mapping, Iterable
+from collections.abc import Mapping, Iterable, Sequence
 import copy
 import types
 
 from kaleidoscope.color import get_default_color_scheme
 from kaleidoscope.spec import ObjectModelSpec
 from kaleidoscope.model import ObjectModel, GroupModel, CollectionModel
+from kaleidoscope.model.group import ViewStream
+from kaleidoscope.model.attribute import spec_columns
+from kaleidoscope.view import GroupView
 from kaleidoscope.color import Color, ColoredText
 import kaleidoscope.defaults as defaults
-from kaleidoscope.util import load_yaml_file
+from kaleidoscope.util import load_yaml_file, peek, apeek, as_async_iterable, window
 from kaleidoscope.namespace.configparser.spec.object import ObjectSpecConfigParser
 from thewired import NamespaceNode, NamespaceLookupError
 from kaleidoscope.renderable import Renderable
+from kaleidoscope.instrument import RenderStats, current_stats, collecting
+from kaleidoscope.formatter import render_scope
+from kaleidoscope.watch import Watcher, TerminalWriter
 from functools import wraps
+import time
+from time import perf_counter
+
+
+#- sentinel for empty iterables
+_empty = object()
+
 
 
 def unwraps_renderable(func):
@@ -39,20 +70,49 @@ def unwraps_renderable(func):
     """
     @wraps(func)
     def closure(self, obj, *args, **kwargs):
-        log = LoggerAdapter(logger, {'name_ext' : 'unwraps_renderable decorator'})
-        log.debug("obj: {} | args: {} | kwargs: {}".format(obj, args, kwargs))
-
         if isinstance(obj, Renderable):
-            log.debug("obj is a Renderable")
+            _unwrap_log.debug("obj is a Renderable")
             obj = obj.wrapped
-        else:
-            log.debug("obj is Not a Renderable")
 
         return func(self, obj, *args, **kwargs)
     return closure
 
 
 
+def instrumented(func):
+    """
+    Description:
+        Decorator for the Render entry points.
+        If the Render has instrumentation turned on (see Render.instrument) and no stats
+        are being collected yet, collect the stats of this call.
+    """
+    @wraps(func)
+    def closure(self, *args, **kwargs):
+        if self.stats is None or current_stats() is not None:
+            return func(self, *args, **kwargs)
+
+        with collecting(callback=self._collected):
+            return func(self, *args, **kwargs)
+    return closure
+
+
+
+def render_scoped(func):
+    """
+    Description:
+        Decorator for the Render entry points.
+        Everything rendered by the call shares one formatter render scope, so formatter
+        keyword arguments with the 'render' scope are evaluated once per call instead of
+        once per object. See formatter.render_scope()
+    """
+    @wraps(func)
+    def closure(self, *args, **kwargs):
+        with render_scope():
+            return func(self, *args, **kwargs)
+    return closure
+
+
+
 class Render(object):
     """
     Description:
@@ -62,6 +122,10 @@ class Render(object):
         Rendering, basically, will take a passed object, combine it with an
         ObjectModelSpec to create a scratch space Model object which will then be altered
         and eventualy rendered into its final form as a View.
+    Notes:
+        Specs looked up from the spec.object namespace are resolved once per specname
+        and cached (see lookup_object_spec). init_object_spec_ns() clears the cache;
+        after changing the spec.object namespace directly, call clear_spec_cache().
     """
 
     @classmethod
@@ -77,16 +141,52 @@ class Render(object):
             isinstance(obj, str) and not isinstance(obj, Mapping)
 
 
-    def __init__(self, collection_specs=None, group_specs=None, object_specs=None):
+    def __init__(self, collection_specs=None, group_specs=None, object_specs=None,\
+        fetch_workers=None, format_processes=None, columnar=False, cell_cache=None):
         """
         Input:
             collection_specs: mapping to lookup collection model specs (unimplemented)
             group_specs: mapping to lookup group model specifications (unimplemented)
             object_specs: name to object spec mapping to look up the object model specifications
+            fetch_workers: number of threads to read attribute values with, for objects
+                whose attributes are slow to read (see GroupModel.iter_fetched)
+                [default: read them one object at a time]
+            format_processes: number of processes to format attributes with, for big
+                groups of objects with CPU heavy formatters (see kaleidoscope.parallel)
+                [default: format them in this process]
+            columnar: render groups of objects through a columnar RenderTable instead
+                of a model per object and attribute; less memory and time per cell for
+                big groups. Rows get a single color each. fetch_workers applies to
+                tables too, but format_processes and cell_cache don't; combining
+                either of them with columnar raises a ValueError.
+                (see GroupModel.make_table)
+            cell_cache: CellCache that keeps formatted attributes across renders, so
+                objects rendered again aren't fetched and formatted again
+                (see kaleidoscope.cellcache) [default: no cache]
+        Raises:
+            ValueError if columnar is combined with format_processes or cell_cache
         """
         log = LoggerAdapter(logger, {'name_ext' : 'Render.__init__'})
         log.debug("Entering")
+        if columnar and (format_processes or cell_cache is not None):
+            raise ValueError("columnar rendering doesn't support format_processes or"\
+                " cell_cache")
         self._object_spec_map = object_specs
+        self.fetch_workers = fetch_workers
+        self.format_processes = format_processes
+        self.columnar = columnar
+        self.cell_cache = cell_cache
+
+        #- specname --> resolved ObjectModelSpec; see lookup_object_spec()
+        self._object_spec_cache = dict()
+        #- class --> specname (None if it has none) and specnames known not to exist;
+        #- see resolve_object_spec()
+        self._type_spec_cache = dict()
+        self._missing_specnames = set()
+
+        #- see instrument()
+        self.stats = None
+        self._stats_callback = None
 
         #- set up Namespace for specs
         self.nsroot = NamespaceNode('.', is_nsroot=True)
@@ -96,32 +196,52 @@ class Render(object):
         self._collection_spec_map = collection_specs
         self._group_spec_map = group_specs
 
-        object_spec_config = load_yaml_file(filename=defaults.object_spec_file)
-        object_specs_parser = ObjectSpecConfigParser(nsroot=self.nsroot)
-        self.object_spec_map = object_specs_parser.parse(object_spec_config)
-        log.debug('list(self.spec._all(nsids=True)):{}'.format(\
-            list(self.spec._all(nsids=True))))
-        self.init_object_spec_ns()
+        #- the object spec file is read and parsed once, straight into spec.object
+        self.object_spec_map = self.init_object_spec_ns()
+        if logger.isEnabledFor(DEBUG):
+            log.debug('list(self.spec._all(nsids=True)): %s',\
+                list(self.spec._all(nsids=True)))
 
 
     def init_object_spec_ns(self,  file=defaults.object_spec_file, root=None):
         """
         Parse the object spec config file into self.spec.object namespace
+
+        Output:
+            the namespace roots parsed from the file
         """
 
         log = LoggerAdapter(logger, {'name_ext': 'Render.init_object_spec_ns'})
         root = self.spec.object if root is None else root
-        dictConfig = load_yaml_file(filename=file)
+        dictConfig = load_yaml_file(filename=file, cache_dir=defaults.cache_dir)
         parser = ObjectSpecConfigParser(nsroot=self.spec)
         ns_roots = parser.parse(dictConfig)
-        log.debug(f"object spec ns roots: {ns_roots}")
+        log.debug("object spec ns roots: %s", ns_roots)
         for ns_x in ns_roots:
             root._add_ns(ns_x)
+        self.clear_spec_cache()
+        return ns_roots
 
 
 
+    def clear_spec_cache(self):
+        """
+        Description:
+            Forget the resolved ObjectModelSpecs and which spec each class resolved to.
+            Needs to be called after changing the spec.object namespace directly;
+            init_object_spec_ns() does this on its own.
+        """
+        self._object_spec_cache.clear()
+        self._type_spec_cache.clear()
+        self._missing_specnames.clear()
+
+
+
+    @instrumented
+    @render_scoped
     @unwraps_renderable
-    def render_object(self, obj, spec=None, specname=None, attributes=None, align=True):
+    def render_object(self, obj, spec=None, specname=None, attributes=None, align=True,\
+        offset=0, limit=None, head=None, tail=None):
         """
         Description:
             Top-level object rendering method.
@@ -131,30 +251,60 @@ class Render(object):
             attributes: list of attributes to render (w/out an existing spec)
             align: whether or not to try and align the attributes if the object is a
                 collection of objects to render
+            offset: render the objects from this index on
+            limit: max number of objects to render [default: all of them]
+            head: render the first this many objects (same as limit)
+            tail: render the last this many objects (instead of offset / limit)
+        Notes:
+            Objects outside of the offset / limit / tail window are never modeled,
+            fetched or formatted, and the alignment only takes the window into account.
+            A "... N more" line stands in for the objects left out on either side, and
+            rows keep their index in the whole iterable.
+            For sequences (e.g. lists) only the window is looked at. Other iterables
+            are read up to one object past the window, so an endless generator or a
+            lazy collection only produces what is shown; unless the iterable is sized
+            the line after the window just says "... more". A tail has to read to the
+            end of an iterable that isn't a sequence (see util.window).
         """
-        log = LoggerAdapter(logger, 
-            {'name_ext' : f'{self.__class__.__name__}.render_object'})
-
-        log.debug("Entering: spec: {} | specname: {} | attributes: {} | align: {}".format(\
-                spec, specname, attributes, align))
+        log = _render_object_log
+        log.debug("Entering: spec: %s | specname: %s | attributes: %s | align: %s",\
+                spec, specname, attributes, align)
+        if head is not None:
+            limit = head
+        window_kwargs = dict(offset=offset, limit=limit, tail=tail)
         if spec:
-            return self.render_object_from_spec(obj, spec, align=align)
+            return self.render_object_from_spec(obj, spec, align=align, **window_kwargs)
         elif specname:
-            return self.render_object_from_specname(obj, specname, align=align)
+            return self.render_object_from_specname(obj, specname, align=align,\
+                **window_kwargs)
         elif attributes:
-            return self.render_object_from_attributes(obj, attributes, align=align)
+            return self.render_object_from_attributes(obj, attributes, align=align,\
+                **window_kwargs)
         else:
-            specname = self.make_default_specname_from_object(obj)
-            log.debug("made specname: {}".format(specname))
-            try:
-                return self.render_object_from_specname(obj, specname, align=align)
-            except NamespaceLookupError:
-                log.warning(f"kaleidoscope can't find specname {specname}")
+            if self.is_render_iterable(obj):
+                hidden = (0, 0)
+                if offset or limit is not None or tail is not None:
+                    obj, before, after = window(obj, **window_kwargs)
+                    hidden = (before, after)
+                #- the objects may be of mixed types; each type gets its own group
+                collection_model = self.make_collection_model(obj, align=align,\
+                    hidden=hidden)
+                if not collection_model.group_models and hidden == (0, 0):
+                    return obj
+                return collection_model.render()
+
+            spec = self.resolve_object_spec(obj)
+            if spec is None:
+                log.warning("kaleidoscope can't find a spec for %s", obj.__class__)
                 return obj
+            return self.render_object_from_spec(obj, spec, align=align, **window_kwargs)
 
 
+    @instrumented
+    @render_scoped
     @unwraps_renderable
-    def render_object_from_attributes(self, obj, attributes, align=True):
+    def render_object_from_attributes(self, obj, attributes, align=True, offset=0,\
+        limit=None, tail=None):
         """
         Description:
             short cut to just pass an object and a list of attribtues and render
@@ -162,59 +312,176 @@ class Render(object):
         Input:
             obj: object to render
             attributes: list of attribute names to include in rendering
+            offset, limit, tail: window of the objects to render; see render_object
         Notes:
             creates an ObjectModelSpec on the fly and calls render_object_from_spec
         """
-        log = LoggerAdapter(logger, {'name_ext' : 'Render.render_obj'})
-        log.debug("Entering: obj: {} | attributes: {} | align: {}".format(\
-                obj, attributes, align))
+        _render_attributes_log.debug("Entering: attributes: %s | align: %s", attributes, align)
         default_colors = get_default_color_scheme()
-        log.debug("creating spec with attributes: {}".format(attributes))
         spec = ObjectModelSpec(colors=None, attributes=attributes,
             delimiter_colors=None)
 
-        return self.render_object_from_spec(obj, spec=spec, colors=default_colors, align=align)
+        return self.render_object_from_spec(obj, spec=spec, colors=default_colors, align=align,\
+            offset=offset, limit=limit, tail=tail)
 
 
 
+    @instrumented
+    @render_scoped
     @unwraps_renderable
-    def render_object_from_spec(self, obj, spec, colors='_follow_object_spec_', align=True):
+    def render_object_from_spec(self, obj, spec, colors='_follow_object_spec_', align=True,\
+        offset=0, limit=None, tail=None):
         """
         Description:
             render an object by using an ObjectModelSpec to get the rendering specs
         Input:
             obj: the object to be rendered
             spec: the ObjectModelSpec to use
+            offset, limit, tail: window of the objects to render; see render_object
         Notes:
             Creates a GroupModel and renders that
             All the other render_object* methods end up calling this one
         """
-        log = LoggerAdapter(logger, {'name_ext':'{}.render_object_from_spec'.format(\
-                self.__class__.__name__)})
-        log.debug("Entering: obj: {} | spec: {} | colors: {} | align: {}".format(\
-                obj, spec, colors, align))
+        _render_spec_log.debug("Entering: spec: %s | colors: %s | align: %s", spec,\
+                colors, align)
+        if not self.is_render_iterable(obj):
+            obj = [obj]
+
+        #- objects outside of the window don't even get models
+        hidden = (0, 0)
+        if offset or limit is not None or tail is not None:
+            obj, before, after = window(obj, offset=offset, limit=limit, tail=tail)
+            hidden = (before, after)
+
+        if self.columnar:
+            if colors == '_follow_object_spec_':
+                colors = copy.copy(spec.colors)
+            group_model = GroupModel(colors=colors, align=align,\
+                fetch_workers=self.fetch_workers, hidden=hidden)
+            return group_model.render_table_view(obj, spec).render()
+
         #- go through and first create the ObjectModels
-        obj_models = list()
-        if self.is_render_iterable(obj) :
-            for i,obj_x in enumerate(obj):
-                obj_models.append(ObjectModel(obj_x, spec, colors=next(spec.colors)))
-        else:
-            prologue = ColoredText('')
-            obj_models = [ObjectModel(obj, spec, colors=next(spec.colors))]
+        obj_models = list(self.make_object_models(obj, spec))
 
         if colors == '_follow_object_spec_':
             colors = copy.copy(spec.colors)
 
         #- collect the ObjectModels in a GroupModel
-        group_model = GroupModel(object_models=obj_models, colors=colors, align=align)
+        group_model = GroupModel(object_models=obj_models, colors=colors, align=align,\
+            fetch_workers=self.fetch_workers, format_processes=self.format_processes,\
+            cell_cache=self.cell_cache, hidden=hidden)
         #-TODO: wrap GroupModel in CollectionModel here
 
         return group_model.render()
 
 
 
+    def partition_by_type(self, objects, key=None):
+        """
+        Description:
+            Split up the objects by class in a single pass
+        Input:
+            objects: iterable of objects
+            key: callable that returns the partition of an object [default: its class]
+        Output:
+            dict mapping class (or key) --> list of objects of that class; the classes
+            are in order of their first appearance and the objects keep their relative
+            order
+        """
+        partitions = dict()
+        for obj_x in objects:
+            partition = obj_x.__class__ if key is None else key(obj_x)
+            try:
+                partitions[partition].append(obj_x)
+            except KeyError:
+                partitions[partition] = [obj_x]
+        return partitions
+
+
+
+    @staticmethod
+    def _style_partition(obj):
+        """partition key of objects that resolve to the same spec: class and .style"""
+        style = getattr(obj, 'style', None)
+        return (obj.__class__, style if isinstance(style, str) else None)
+
+
+
+    def make_collection_model(self, objects, align=True, hidden=(0, 0)):
+        """
+        Description:
+            Model an iterable of objects of mixed types as a CollectionModel with one
+            GroupModel per spec.
+            Objects are partitioned by class and .style, and each partition is resolved
+            to a specname once (using its first object; see resolve_object_specname).
+            Partitions that resolve to the same specname share a group, named after
+            the specname.
+        Input:
+            objects: iterable of objects to model
+            align: whether or not to align the attributes within each group
+            hidden: numbers of objects left out before and after the objects; see
+                CollectionModel
+        Output:
+            CollectionModel; objects without a spec are left out of it
+        """
+        log = _collection_log
+        #- specname --> objects
+        spec_groups = dict()
+        for (cls, style), objects_x in self.partition_by_type(objects,\
+            key=self._style_partition).items():
+            specname = self.resolve_object_specname(objects_x[0])
+            if specname is None:
+                log.warning("kaleidoscope can't find a spec for %s", cls)
+                continue
+            try:
+                spec_groups[specname].extend(objects_x)
+            except KeyError:
+                spec_groups[specname] = objects_x
+
+        collection_model = CollectionModel(hidden=hidden)
+        for specname, objects_x in spec_groups.items():
+            spec = self.lookup_object_spec(specname)
+            object_models = list(self.make_object_models(objects_x, spec))
+            collection_model.append_group(GroupModel(name=specname,\
+                object_models=object_models, colors=copy.copy(spec.colors), align=align,\
+                fetch_workers=self.fetch_workers, format_processes=self.format_processes,\
+                cell_cache=self.cell_cache))
+        log.debug("made %d group(s)", len(collection_model.group_models))
+        return collection_model
+
+
+
+    def make_object_models(self, objects, spec):
+        """
+        Description:
+            Lazily create an ObjectModel for each object, each with the next of the
+            spec's colors
+        Input:
+            objects: iterable of objects to model
+            spec: ObjectModelSpec to model them with
+        Output:
+            generator of ObjectModels
+        """
+        stats = current_stats()
+        #- checked against the spec's attributes once, not once per object
+        columns = spec_columns(spec)
+        for obj_x in objects:
+            if stats is None:
+                yield ObjectModel(obj_x, spec, colors=next(spec.colors), columns=columns)
+            else:
+                start = perf_counter()
+                object_model = ObjectModel(obj_x, spec, colors=next(spec.colors),\
+                    columns=columns)
+                stats.add_stage('model_construction', perf_counter() - start)
+                yield object_model
+
+
+
+    @instrumented
+    @render_scoped
     @unwraps_renderable
-    def render_object_from_specname(self, obj, specname, align=True):
+    def render_object_from_specname(self, obj, specname, align=True, offset=0, limit=None,\
+        tail=None):
         
         """
         Description:
@@ -223,12 +490,55 @@ class Render(object):
             obj: object to be rendered
             spec_name: spec_name to lookup and use to render object
             colors: group colors (per-object colors)
+            offset, limit, tail: window of the objects to render; see render_object
         Notes:
             grabs the ObjectModelSpec and calls render_object_from_spec
         """
-        log = LoggerAdapter(logger, {'name_ext' : 'Render.render_obj_from_specname'})
-        log.debug("Entering")
+        _render_specname_log.debug("Entering: specname: %s", specname)
+        spec = self.lookup_object_spec(specname)
+        return self.render_object_from_spec(obj, spec, align=align, offset=offset,\
+            limit=limit, tail=tail)
+
+
 
+    def lookup_object_spec(self, specname):
+        """
+        Description:
+            Build an ObjectModelSpec from the spec.object namespace.
+            Every node along the specname's nsid contributes its specmap; more specific
+            nodes override the values of their parents.
+            The resolved spec is cached per specname until init_object_spec_ns() reloads
+            the namespace. Changes made to the spec.object namespace directly are not
+            noticed; call clear_spec_cache() after making them.
+            Every call returns a copy of the cached spec with its own color cycles (see
+            ObjectModelSpec.copy), so concurrent renders don't share them.
+        Input:
+            specname: nsid of the spec in the spec.object namespace
+        Output:
+            ObjectModelSpec
+        Raises:
+            NamespaceLookupError if there is no such spec
+        """
+        stats = current_stats()
+        if stats is not None:
+            start = perf_counter()
+
+        try:
+            spec = self._object_spec_cache[specname]
+        except KeyError:
+            spec = self._object_spec_cache[specname] = self._resolve_object_spec(specname)
+            #- made before copying, so every copy shares the same AttributeColumns
+            spec_columns(spec)
+        spec = spec.copy()
+
+        if stats is not None:
+            stats.add_stage('spec_resolution', perf_counter() - start)
+        return spec
+
+
+
+    def _resolve_object_spec(self, specname):
+        """walk the specname's nsid and build a new ObjectModelSpec from its specmaps"""
         #- create a chain map from all the spec nodes in the namespace
         specmaps = list()
         nsid = specname
@@ -236,11 +546,261 @@ class Render(object):
             specmaps.append(self.spec.object._lookup(nsid).specmap)
             nsid = '.'.join(nsid.split('.')[0:-1])
         spec_chain = collections.ChainMap(*specmaps)
-        log.debug("Creating ObjectModelSpec from spec.object namespace with ChainMap")
-        log.debug("  ChainMap keys: {}".format(spec_chain.keys()))
+        _lookup_log.debug("Creating ObjectModelSpec from spec.object namespace with"\
+            " ChainMap keys: %s", spec_chain.keys())
+
+        return ObjectModelSpec(**spec_chain)
+
+
+
+    def instrument(self, enable=True, callback=None):
+        """
+        Description:
+            Turn on (or off) collection of render stats for every render call made
+            through this Render.
+            The stats of each call are added to Render.stats. Rendering inside of an
+            instrument.collecting() block records into that block's stats instead.
+        Input:
+            enable: True to start collecting stats, False to stop
+            callback: called with the RenderStats of each render call
+        Output:
+            Render.stats; the cumulative RenderStats (None if disabled)
+        """
+        if enable:
+            if self.stats is None:
+                self.stats = RenderStats()
+            self._stats_callback = callback
+        else:
+            self.stats = None
+            self._stats_callback = None
+        return self.stats
+
 
-        spec = ObjectModelSpec(**spec_chain)
-        return self.render_object_from_spec(obj, spec, align=align)
+
+    def _collected(self, stats):
+        """add the stats collected from one render call to the cumulative stats"""
+        if self.stats is not None:
+            self.stats.merge(stats)
+        if self._stats_callback:
+            self._stats_callback(stats)
+
+
+
+    @instrumented
+    @render_scoped
+    @unwraps_renderable
+    def render_stream(self, obj, spec=None, specname=None, attributes=None, file=None,\
+        align_window=None, align_budget=None, header=False):
+        """
+        Description:
+            Render each object of an iterable as soon as it is produced.
+            Works with generators and other unbounded iterables: the spec is inferred
+            from the first element and only one object (or the alignment window) is
+            held in memory at a time.
+        Input:
+            obj: iterable of objects to render (a single object is rendered on its own)
+            spec: ObjectModelSpec (overrides specname and attributes)
+            specname: name of an ObjectModelSpec to lookup (overrides attributes)
+            attributes: list of attributes to render (w/out an existing spec)
+            file: file-like object to write to [default: sys.stdout]
+            align_window: align attributes using the widths of the first N objects;
+                later objects only ever widen the columns
+            align_budget: max seconds to spend collecting the alignment window
+            header: print a header of attribute names when aligning, and print it again
+                whenever a column gets wider
+        Output:
+            number of views written (objects plus any headers)
+        """
+        log = _render_stream_log
+        log.debug("Entering: spec: %s | specname: %s | attributes: %s", spec, specname,\
+                attributes)
+
+        if not self.is_render_iterable(obj):
+            obj = [obj]
+
+        first, objects = peek(obj, default=_empty)
+        if first is _empty:
+            log.debug("nothing to render")
+            return 0
+
+        spec, colors = self.make_stream_spec(first, spec, specname, attributes)
+        object_models = self.make_object_models(objects, spec)
+        group_model = GroupModel(colors=colors, fetch_workers=self.fetch_workers)
+        group_view = group_model.stream_view(object_models, align_window=align_window,\
+            align_budget=align_budget, header=header)
+        return group_view.stream(file=file)
+
+
+
+    def make_stream_spec(self, first, spec=None, specname=None, attributes=None):
+        """
+        Description:
+            Pick the ObjectModelSpec and group colors for rendering a stream of objects
+            whose first element is `first`. See render_stream() for the arguments.
+        Output:
+            tuple of (ObjectModelSpec, group colors)
+        """
+        colors = '_follow_object_spec_'
+        if spec is None:
+            if specname:
+                spec = self.lookup_object_spec(specname)
+            elif attributes:
+                spec = ObjectModelSpec(colors=None, attributes=attributes,
+                    delimiter_colors=None)
+                colors = get_default_color_scheme()
+            else:
+                spec = self.resolve_object_spec(first)
+                if spec is None:
+                    raise NamespaceLookupError("no object spec for {}".format(\
+                        first.__class__))
+
+        if colors == '_follow_object_spec_':
+            colors = copy.copy(spec.colors)
+        return spec, colors
+
+
+
+    async def render_async(self, obj, spec=None, specname=None, attributes=None,\
+        file=None, concurrency=None, align_window=None, align_budget=None, header=False):
+        """
+        Description:
+            Render objects from asyncio code.
+            Like render_stream(), but obj may also be an async iterable, attribute
+            values may be awaitables (e.g. async properties) and formatters may be
+            coroutine functions. Objects are formatted concurrently, up to
+            `concurrency` at a time, and written out in order as soon as they are
+            ready.
+
+            Formatter batch stages (prefetch, batch formatters) don't apply; every
+            attribute is formatted on its own, like with render_stream().
+        Input:
+            obj: async iterable or iterable of objects to render (a single object is
+                rendered on its own)
+            concurrency: max number of objects being formatted at once
+                [default: defaults.async_concurrency]
+            see render_stream() for the rest
+        Output:
+            number of views written (objects plus any headers)
+        """
+        if isinstance(obj, Renderable):
+            _unwrap_log.debug("obj is a Renderable")
+            obj = obj.wrapped
+
+        #- the instrumented and render_scoped decorators exit before a coroutine runs,
+        #- so set up the same context here
+        with contextlib.ExitStack() as scopes:
+            if self.stats is not None and current_stats() is None:
+                scopes.enter_context(collecting(callback=self._collected))
+            scopes.enter_context(render_scope())
+            return await self._render_async(obj, spec, specname, attributes, file,\
+                concurrency, align_window, align_budget, header)
+
+
+
+    async def _render_async(self, obj, spec, specname, attributes, file, concurrency,\
+        align_window, align_budget, header):
+        """the body of render_async(), run inside of its render scope"""
+        log = _render_async_log
+        log.debug("Entering: spec: %s | specname: %s | attributes: %s", spec, specname,\
+                attributes)
+
+        if not hasattr(obj, '__aiter__') and not self.is_render_iterable(obj):
+            obj = [obj]
+
+        first, objects = await apeek(obj, default=_empty)
+        if first is _empty:
+            log.debug("nothing to render")
+            return 0
+
+        spec, colors = self.make_stream_spec(first, spec, specname, attributes)
+        group_model = GroupModel(colors=colors)
+        view_stream = ViewStream(group_model, align_window=align_window,\
+            align_budget=align_budget, header=header)
+        if concurrency is None:
+            concurrency = defaults.async_concurrency
+
+        count = 0
+        async for object_model_x in group_model.aiter_formatted(\
+            self.aiter_object_models(objects, spec), concurrency):
+            if group_model.test_method(object_model_x.get_source()):
+                count += GroupView(object_views=view_stream.push(object_model_x))\
+                    .stream(file=file)
+        count += GroupView(object_views=view_stream.close()).stream(file=file)
+        return count
+
+
+
+    async def aiter_object_models(self, objects, spec):
+        """make_object_models() for async iterables"""
+        stats = current_stats()
+        columns = spec_columns(spec)
+        async for obj_x in as_async_iterable(objects):
+            start = perf_counter()
+            object_model = ObjectModel(obj_x, spec, colors=next(spec.colors),\
+                columns=columns)
+            if stats is not None:
+                stats.add_stage('model_construction', perf_counter() - start)
+            yield object_model
+
+
+
+    def watch(self, source, spec=None, specname=None, attributes=None, key=None,\
+        interval=2.0, writer=None, file=None, count=None, sleep=time.sleep):
+        """
+        Description:
+            Keep a rendering of a changing set of objects up to date on a terminal,
+            polling the objects every `interval` seconds. Rows are matched up from poll
+            to poll by a key attribute, and only the rows that changed are formatted
+            and redrawn. See kaleidoscope.watch
+            Returns when interrupted (Ctrl-C) or after `count` polls.
+        Input:
+            source: callable returning the current objects (or an iterable to poll
+                again each time)
+            spec: ObjectModelSpec (overrides specname and attributes)
+            specname: name of an ObjectModelSpec to lookup (overrides attributes)
+            attributes: list of attributes to render (w/out an existing spec)
+            key: attribute that identifies an object [default: the spec's key]
+            interval: seconds between polls
+            writer: TerminalWriter (or compatible) to draw with
+            file: file-like terminal for the default writer [default: sys.stdout]
+            count: stop after this many polls [default: keep going]
+            sleep: function to wait between polls with
+        Output:
+            the Watcher (None if no objects were ever polled)
+        """
+        log = _watch_log
+        watcher = None
+        polls = 0
+        try:
+            while count is None or polls < count:
+                objects = list(source() if callable(source) else source)
+                if watcher is None and (objects or spec or specname or attributes):
+                    watch_spec, colors = self.make_stream_spec(\
+                        objects[0] if objects else None, spec, specname, attributes)
+                    watcher = Watcher(watch_spec, key=key, colors=colors,\
+                        writer=writer if writer is not None else TerminalWriter(file))
+                if watcher is not None:
+                    self.refresh_watch(watcher, objects)
+                polls += 1
+                if count is None or polls < count:
+                    sleep(interval)
+        except KeyboardInterrupt:
+            log.debug("interrupted after %d polls", polls)
+        return watcher
+
+
+
+    @instrumented
+    @render_scoped
+    def refresh_watch(self, watcher, objects):
+        """
+        Description:
+            One refresh of a Watcher, as its own render call (for the stats and the
+            formatter render scope)
+        Output:
+            number of rows that were drawn
+        """
+        return watcher.refresh(objects)
 
 
 
@@ -255,10 +815,103 @@ class Render(object):
         """
         if self.is_render_iterable(obj):
             #- XXX assume the collection is of a single type of object
-            obj = obj[0]
+            #- NB: this consumes the first element of an iterator; see util.peek()
+            obj = obj[0] if isinstance(obj, Sequence) else next(iter(obj))
+
+        return self.make_specname_from_class(obj.__class__)
+
+
+
+    @staticmethod
+    def make_specname_from_class(cls):
+        """the default specname of a class: <module>.<class name>"""
+        return '.'.join([cls.__module__, cls.__name__])
+
+
 
-        specname = '.'.join([obj.__class__.__module__, obj.__class__.__name__])
-        return specname
+    def resolve_object_spec(self, obj, runtime_key=None):
+        """
+        Description:
+            Find the best ObjectModelSpec in the spec.object namespace to render an
+            object with (see resolve_object_specname).
+        Input:
+            obj: object we are looking up a spec for
+            runtime_key: specname to use, overriding everything else
+        Output:
+            ObjectModelSpec or None if there is no spec for the object
+        """
+        specname = self.resolve_object_specname(obj, runtime_key=runtime_key)
+        if specname is None:
+            return None
+        return self.lookup_object_spec(specname)
+
+
+
+    def resolve_object_specname(self, obj, runtime_key=None):
+        """
+        Description:
+            Find the name of the best ObjectModelSpec in the spec.object namespace to
+            render an object with.
+            The specname found for a class is cached (misses included), so objects of a
+            class that has been seen before resolve with a single dict lookup.
+        Input:
+            obj: object we are looking up a spec for
+            runtime_key: specname to use, overriding everything else
+        Output:
+            specname or None if there is no spec for the object
+        Notes:
+            Order of Precedence:
+              the runtime key
+              the object's .style attribute
+              the specname of each class in the MRO of the object's class, most derived
+                first. obj.__class__ is used rather than type(obj) so that proxy objects
+                resolve like the objects they stand in for.
+        """
+        log = _resolve_log
+        if runtime_key:
+            if self._has_object_spec(runtime_key):
+                return runtime_key
+            log.debug("no spec for runtime key: %s", runtime_key)
+            return None
+
+        style = getattr(obj, 'style', None)
+        if isinstance(style, str):
+            if self._has_object_spec(style):
+                return style
+            log.debug("no spec for style: %s", style)
+
+        cls = obj.__class__
+        try:
+            return self._type_spec_cache[cls]
+        except KeyError:
+            specname = self._type_spec_cache[cls] = self._find_class_specname(cls)
+            log.debug("resolved class %s to specname: %s", cls, specname)
+            return specname
+
+
+
+    def _find_class_specname(self, cls):
+        """walk the MRO of cls and return the first specname that exists (or None)"""
+        for klass in getattr(cls, '__mro__', (cls,)):
+            specname = self.make_specname_from_class(klass)
+            if self._has_object_spec(specname):
+                return specname
+        return None
+
+
+
+    def _has_object_spec(self, specname):
+        """check if specname is in the spec.object namespace; misses are remembered"""
+        if specname in self._object_spec_cache:
+            return True
+        if specname in self._missing_specnames:
+            return False
+        try:
+            self.spec.object._lookup(specname)
+        except NamespaceLookupError:
+            self._missing_specnames.add(specname)
+            return False
+        return True
 
 
 
@@ -282,56 +935,51 @@ class Render(object):
             object.
 
         Input:
-            obj: object we are looking up a model spec for runtime_key : dynamic runtime
-            override of key to lookup spec_map: which dictionary to use to find the model
+            obj: object we are looking up a model spec for
+            runtime_key : dynamic runtime override of key to lookup
+            spec_map: which dictionary to use to find the model [default: look the spec
+                up in the spec.object namespace; see resolve_object_spec()]
+
+        Output:
+            the model spec or None if none is found
 
         Notes:
             Order of Precedence:
               check by run time key
               check for a .style attribute
-              check by objects class name
+              check by the class names in the object's MRO
               fail
         """
+        log = _lookup_model_log
+        if spec_map is None:
+            return self.resolve_object_spec(obj, runtime_key=runtime_key)
+
         #- try the runtime key
         if runtime_key:
             try:
-                render_spec_key = runtime_key
-                style_spec = spec_map[render_spec_key]
-            except KeyError as err:
-                msgs = list()
-                msgs.append("Failure looking up style spec by runtime key:")
-                msgs.append("{}".format(render_spec_key))
-                msgs.append(": no such style specification name in mapping.")
-                log.debug(''.join(msgs))
+                return spec_map[runtime_key]
+            except KeyError:
+                log.debug("Failure looking up style spec by runtime key: %s: no such"\
+                    " style specification name in mapping.", runtime_key)
                 return None
 
-        else:
-            #- try the .style attribute on the object
-            style_spec = None
+        #- try the .style attribute on the object
+        style = getattr(obj, 'style', None)
+        if style is not None:
+            try:
+                return spec_map[style]
+            except (KeyError, TypeError):
+                log.debug("Failure looking up style spec by style attribute: %s: no such"\
+                    " style specification name in mapping", style)
+
+        #- if we can't find a runtime key or a .style attribute, then try the class names
+        cls = obj.__class__
+        for klass in getattr(cls, '__mro__', (cls,)):
             try:
-                render_spec_key = obj.style
-                style_spec = spec_map[render_spec_key]
-            except AttributeError:
-                #- object has no 'style' attribute. That's fine.
+                return spec_map[klass.__name__]
+            except KeyError:
                 pass
-            except KeyError as err:
-                msgs = list()
-                msgs.append("Failure looking up style spec by class name: {}".format(render_spec_key))
-                msgs.append(": no such style specification name in mapping")
-                log.debug(''.join(msg))
-                return None
-
-
-            #- if we can't find a runtime key or a .style attribute, then try the object's class name
-            if not style_spec:
-                try:
-                    render_spec_key = obj.__class__.__name__
-                    style_spec = spec_map[render_spec_key]
-                except KeyError as err:
-                    msgs = list()
-                    msgs.append("Failure looking up style spec by class name: {}".format(render_spec_key))
-                    msgs.append(": no such style specification name in mapping")
-                    log.debug(''.join(msg))
-                    return None
 
-        return style_spec
+        log.debug("Failure looking up style spec by class name: %s: no such style"\
+            " specification name in mapping", cls.__name__)
+        return None
@@ -1,10 +1,101 @@
+import ast
+import sys
 from collections import namedtuple
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+
+
+@lru_cache(maxsize=None)
+def compile_accessor(expression):
+    """
+    Description:
+        Compile an attribute expression into a callable that takes the source object and
+        returns the value of the attribute expression for that object.
+
+        Simple names ('vpc_id'), dotted names ('meta.client.meta.region_name') and
+        subscripts with literal keys ("state['Name']") are turned into a chain of
+        attrgetter / itemgetter calls. Anything else is compiled once into a code object
+        that is evaluated against the source object.
+
+        Results are cached per expression, so every AttributeSpec / AttributeModel using
+        the same expression shares the same accessor.
+    Input:
+        expression: attribute name or expression relative to the source object
+    Output:
+        callable(source_object) -> attribute value
+    """
+    try:
+        tree = ast.parse(expression, mode='eval')
+    except SyntaxError:
+        #- not a python expression; can still be a valid (if odd) attribute name
+        return attrgetter(expression)
+
+    steps = _accessor_steps(tree.body)
+    if steps is None:
+        code = compile('__source__.{}'.format(expression), '<attribute:{}>'.format(\
+            expression), 'eval')
+        return lambda source: eval(code, {}, {'__source__': source})
+
+    getters = [attrgetter(arg) if kind == 'attr' else itemgetter(arg)\
+        for kind, arg in steps]
+    if len(getters) == 1:
+        return getters[0]
+
+    def accessor(source):
+        for getter in getters:
+            source = getter(source)
+        return source
+    return accessor
+
+
+
+def _accessor_steps(node):
+    """
+    Description:
+        Walk an attribute expression AST and build the list of lookup steps that
+        evaluate it, innermost first. Adjacent attribute lookups are merged into a single
+        dotted name.
+    Output:
+        list of ('attr', dotted_name) / ('item', key) tuples, or None if the expression
+        needs a full eval
+    """
+    if isinstance(node, ast.Name):
+        return [('attr', node.id)]
+
+    elif isinstance(node, ast.Attribute):
+        steps = _accessor_steps(node.value)
+        if steps is None:
+            return None
+        if steps[-1][0] == 'attr':
+            steps[-1] = ('attr', '{}.{}'.format(steps[-1][1], node.attr))
+        else:
+            steps.append(('attr', node.attr))
+        return steps
+
+    elif isinstance(node, ast.Subscript):
+        key = node.slice
+        #- python < 3.9 wraps subscript values in ast.Index
+        if sys.version_info < (3, 9) and isinstance(key, ast.Index):
+            key = key.value
+        if not isinstance(key, ast.Constant):
+            return None
+        steps = _accessor_steps(node.value)
+        if steps is None:
+            return None
+        steps.append(('item', key.value))
+        return steps
+
+    return None
+
+
+
 #AttributeSpec = namedtuple("AttributeSpec", ['name', 'length', 'formatter'])
 class AttributeSpec(object):
     def __init__(self, name, length=None, formatter=None):
         self.name = name
         self.length = length
         self.formatter = formatter
+        self.accessor = compile_accessor(name)
 
     def __iter__(self):
         for attribute in ['name', 'length', 'formatter']:
@@ -1,11 +1,15 @@
 from logging import getLogger, LoggerAdapter
 logger = getLogger(__name__)
 
+#- made once; specs get built on every render (see model/attribute.py)
+_init_log = LoggerAdapter(logger, {'name_ext' : 'ObjectModelSpec.__init__'})
+_parse_log = LoggerAdapter(logger, {'name_ext' : 'ObjectModelSpec.parse_attributes'})
+
 from kaleidoscope.color import Color
 from .attribute import AttributeSpec
 from itertools import repeat, cycle
-from  collections.abc import Iterable, Sequence
 import copy
+from  collections.abc import Iterable, Sequence
 
 class ObjectModelSpec(object):
     """
@@ -16,7 +20,7 @@ class ObjectModelSpec(object):
         well, if desired)
     """
     def __init__(self, colors=None, attributes=None, description=None,\
-        delimiter=' | ', delimiter_colors=None):
+        delimiter=' | ', delimiter_colors=None, key=None):
         """
         Input:
             colors: list of kaleidoscope color names to use in styling the object's attributes
@@ -29,45 +33,72 @@ class ObjectModelSpec(object):
             description: the description of this object model spec
             delimiter: string to place between attributes on a single line
             delimiter_color: color of delimiter string
+            key: name of the attribute that identifies an object across renders, e.g.
+                an id (see Render.watch)
 
         Notes:
             All parameters are optional, but you probably want to fill in the attributes before using this
         """
-        log = LoggerAdapter(logger, {'name_ext' : 'ObjectModelSpec.__init__'})
-        msg = "Entered: colors: {} | attributes: {}".format(colors, attributes)
-        msg += " | description: {} | delimiter: {}".format(description, delimiter)
-        msg += " | delimiter_colors: {}".format(delimiter_colors)
-        log.debug(msg)
+        _init_log.debug("Entered: colors: %s | attributes: %s | description: %s"\
+            " | delimiter: %s | delimiter_colors: %s", colors, attributes, description,\
+            delimiter, delimiter_colors)
         self.delimiter = str(delimiter)
         self.description = description
+        self.key = key
 
         if colors:
-            _colors = list()
-            for _color in colors:
-                _colors.append(Color(_color))
-            self.colors = cycle(_colors)
+            self._colors = [Color(_color) for _color in colors]
         else:
-            self.colors = repeat(None)
+            self._colors = None
 
         if delimiter_colors:
-            _delimiter_colors = list()
-            for _dcolor in delimiter_colors:
-                _delimiter_colors.append(Color(_dcolor))
-            self.delimiter_colors = cycle(_delimiter_colors)
+            self._delimiter_colors = [Color(_dcolor) for _dcolor in delimiter_colors]
         else:
-            self.delimiter_colors = copy.copy(self.colors)
+            self._delimiter_colors = None
+
+        self.reset_colors()
 
         #- locally store parsed attributes as AttributeSpec objects
         if attributes:
             if not isinstance(attributes, Iterable):
                 attributes = [attributes]
-            log.debug("parsing attributes: {}".format(attributes))
             self.attributes = self.parse_attributes(attributes)
         else:
-            log.info("spec has no attributes specified.")
+            _init_log.info("spec has no attributes specified.")
             self.attributes = None
 
-        log.debug("initialized: {}".format(self))
+        _init_log.debug("initialized: %s", self)
+
+
+    def reset_colors(self):
+        """
+        Description:
+            Restart the color cycles from the first color.
+            Rendering advances the colors and delimiter_colors iterators; a spec that is
+            reused for several renders is reset first so every render colors the same.
+        """
+        self.colors = cycle(self._colors) if self._colors else repeat(None)
+        if self._delimiter_colors:
+            self.delimiter_colors = cycle(self._delimiter_colors)
+        else:
+            self.delimiter_colors = cycle(self._colors) if self._colors else repeat(None)
+
+
+    def copy(self):
+        """
+        Description:
+            Make a shallow copy of the spec with its own list of attributes and its own
+            color cycles, starting from the first color. Long-lived specs (see
+            Render.lookup_object_spec) hand a copy to each render, so renders running
+            at the same time don't advance or reset each other's colors.
+        Output:
+            ObjectModelSpec
+        """
+        spec = copy.copy(self)
+        if self.attributes is not None:
+            spec.attributes = list(self.attributes)
+        spec.reset_colors()
+        return spec
 
 
     def parse_attributes(self, attributes):
@@ -91,8 +122,6 @@ class ObjectModelSpec(object):
         Ouput:
             list of AttributeSpec tuples
         """
-        log = LoggerAdapter(logger, {'name_ext' : 'ObjectModelSpec.parse_attributes'})
-        log.debug("Entered: attributes: {}".format(attributes))
         _attrs = list()
         #- go through and checkout all the different attrs
         for attribute in attributes:
@@ -106,7 +135,7 @@ class ObjectModelSpec(object):
             elif isinstance(attribute, Sequence):
                 if isinstance(attribute[0], str):
                     if len(attribute) == 1:
-                        _attrs.append(AttributeSpec(attribute, *repeat(None, 2)))
+                        _attrs.append(AttributeSpec(attribute[0], *repeat(None, 2)))
                         continue
                 else:
                     msg = list()
@@ -144,7 +173,7 @@ class ObjectModelSpec(object):
                     msg.append(" of a formatter, a callable object, or None")
                     msg.append(", not {}".format(attribute[2]))
                     raise ValueError(''.join(msg))
-        log.debug("returning: {}".format(_attrs))
+        _parse_log.debug("returning: %s", _attrs)
         return _attrs
 
 
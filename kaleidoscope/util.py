@@ -3,9 +3,13 @@ from logging import getLogger, LoggerAdapter
 logger = getLogger(__name__)
 
 import collections
+import collections.abc
+import hashlib
+import itertools
+import json
 import kaleidoscope.defaults as defaults
 import os
-import ruamel.yaml
+import tempfile
 
 
 def sequence_check_init(list_to_check, list_factory=list):
@@ -24,6 +28,128 @@ def sequence_check_init(list_to_check, list_factory=list):
 
 
 
+def peek(iterable, default=None):
+    """
+    Description:
+        Look at the first element of an iterable without losing it.
+    Input:
+        iterable: any iterable, including generators and other one-shot iterators
+        default: value returned as the first element if the iterable is empty
+    Output:
+        tuple of (first element, iterator that still yields every element)
+    """
+    iterator = iter(iterable)
+    try:
+        first = next(iterator)
+    except StopIteration:
+        return default, iterator
+    return first, itertools.chain([first], iterator)
+
+
+
+#- window(): marks the end of an iterator
+_no_more = object()
+
+
+
+def window(iterable, offset=0, limit=None, tail=None):
+    """
+    Description:
+        Take a window of consecutive elements out of an iterable and count how many
+        were left out on either side of it.
+        Sequences are indexed directly, so only the elements in the window are looked
+        at (a tail of a list doesn't go through the rest of it). Other iterables are
+        iterated up to the end of the window and then at most one element further, to
+        find out if there are more; how many more is only known if the iterable is
+        sized. This works for endless iterators and doesn't page through the rest of a
+        lazy collection, except for a tail, which has to go to the end of the
+        iterable to find it.
+    Input:
+        iterable: any iterable
+        offset: number of elements to skip
+        limit: max number of elements to take after the offset [default: all of them]
+        tail: take the last this many elements instead of offset / limit
+    Output:
+        tuple of (list of the elements in the window, number of elements before it,
+            number of elements after it or None if there are some but how many isn't
+            known)
+    Raises:
+        ValueError if tail is used along with offset or limit
+    """
+    if tail is not None and (offset or limit is not None):
+        raise ValueError("window: use either tail or offset / limit, not both")
+    offset = max(0, offset or 0)
+
+    if isinstance(iterable, collections.abc.Sequence):
+        size = len(iterable)
+        if tail is not None:
+            start = max(0, size - max(0, tail))
+        else:
+            start = min(offset, size)
+        stop = size if limit is None or tail is not None else min(size, start + limit)
+        return [iterable[n] for n in range(start, stop)], start, size - stop
+
+    if tail is not None:
+        if isinstance(iterable, collections.abc.Sized):
+            size = len(iterable)
+            start = max(0, size - max(0, tail))
+            return list(itertools.islice(iterable, start, None)), start, 0
+        if tail <= 0:
+            return list(), sum(1 for _ in iterable), 0
+        last = collections.deque(maxlen=tail)
+        size = 0
+        for item in iterable:
+            last.append(item)
+            size += 1
+        return list(last), size - len(last), 0
+
+    iterator = iter(iterable)
+    before = sum(1 for _ in itertools.islice(iterator, offset))
+    items = list(itertools.islice(iterator, None if limit is None else max(0, limit)))
+    if isinstance(iterable, collections.abc.Sized):
+        after = len(iterable) - before - len(items)
+    else:
+        #- don't go further than one element to see if there are more
+        after = None if next(iterator, _no_more) is not _no_more else 0
+    return items, before, after
+
+
+
+async def as_async_iterable(iterable):
+    """
+    Description:
+        Iterate over either an async iterable or a regular iterable with async for
+    """
+    if hasattr(iterable, '__aiter__'):
+        async for item in iterable:
+            yield item
+    else:
+        for item in iterable:
+            yield item
+
+
+
+async def apeek(iterable, default=None):
+    """
+    Description:
+        peek() for async iterables (regular iterables work too)
+    Output:
+        tuple of (first element, async iterator that still yields every element)
+    """
+    iterator = as_async_iterable(iterable)
+    try:
+        first = await iterator.__anext__()
+    except StopAsyncIteration:
+        return default, iterator
+
+    async def chained():
+        yield first
+        async for item in iterator:
+            yield item
+    return first, chained()
+
+
+
 def filename_to_fullpath(directory=None, filename=None):
     """simple utility to translate an unexpanded path and filename into
     something we can pass directly to open"""
@@ -42,22 +168,160 @@ def filename_to_fullpath(directory=None, filename=None):
     return path
 
 
-def load_yaml_file(filename=None, dir=defaults.config_dir):
-    """
-    load and parse YAML into a dict
+def load_yaml_file(filename=None, dir=defaults.config_dir, cache_dir=None):
     """
+    Description:
+        load and parse YAML into a dict
 
+        With a cache_dir, the parsed data is also stored as JSON in a cache file for the
+        YAML file and later loads use that instead of parsing the YAML again. The cache
+        is used without reading the YAML file as long as the file's mtime and size
+        haven't changed, like make does; a file that was touched but not changed is
+        recognized by the hash of its contents. JSON rather than pickle, so that a
+        writable cache directory can't be used to run code; data that doesn't survive
+        a round trip through JSON (e.g. non-string keys, dates) isn't cached.
+    Input:
+        filename: name of the YAML file
+        dir: directory of the YAML file
+        cache_dir: directory to keep the parse cache in [default: don't cache]
+    Output:
+        the parsed YAML as plain dicts and lists
+    """
     log = LoggerAdapter(logger, {'name_ext' : 'load_yaml_file'})
     if filename is None:
         raise ValueError("load_yaml_file: need a filename to load.")
 
     config_filepath = filename_to_fullpath(dir, filename)
 
-    yaml_dict = dict()
-    with open(config_filepath, 'rt') as fp:
-        try:
-            yaml_dict = ruamel.yaml.load(fp, ruamel.yaml.RoundTripLoader)
-        except ruamel.yaml.YAMLError as err:
-            log.error('load_yaml_file: Error loading {}: {}'.format(config_filepath, str(err)))
+    if cache_dir is None:
+        with open(config_filepath, 'rb') as fp:
+            return parse_yaml(fp.read(), config_filepath)
+
+    cache_filepath = yaml_cache_filepath(cache_dir, config_filepath)
+    cached = _read_yaml_cache(cache_filepath)
+    if cached and cached['path'] == config_filepath:
+        stat = os.stat(config_filepath)
+        if (cached['mtime_ns'], cached['size']) == (stat.st_mtime_ns, stat.st_size):
+            log.debug("cache hit: %s", cache_filepath)
+            return cached['data']
+
+    with open(config_filepath, 'rb') as fp:
+        raw_yaml = fp.read()
+        stat = os.fstat(fp.fileno())
+
+    sha256 = hashlib.sha256(raw_yaml).hexdigest()
+    if cached and cached['path'] == config_filepath and cached['sha256'] == sha256:
+        #- touched, but not changed
+        log.debug("cache hit (unchanged contents): %s", cache_filepath)
+        cached.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        _write_yaml_cache(cache_filepath, cached)
+        return cached['data']
+
+    yaml_dict = parse_yaml(raw_yaml, config_filepath)
+    if yaml_dict:
+        _write_yaml_cache(cache_filepath, {
+            'version' : _YAML_CACHE_VERSION,
+            'path' : config_filepath,
+            'mtime_ns' : stat.st_mtime_ns,
+            'size' : stat.st_size,
+            'sha256' : sha256,
+            'data' : yaml_dict })
     return yaml_dict
 
+
+
+def parse_yaml(raw_yaml, source='<string>'):
+    """
+    parse YAML into plain dicts and lists
+    source is only used for error messages
+    """
+    #- ruamel.yaml is one of the slower imports; only pay for it when a file is parsed
+    import ruamel.yaml
+
+    log = LoggerAdapter(logger, {'name_ext' : 'parse_yaml'})
+    yaml_dict = dict()
+    try:
+        yaml_dict = ruamel.yaml.load(raw_yaml, ruamel.yaml.RoundTripLoader)
+    except ruamel.yaml.YAMLError as err:
+        log.error('load_yaml_file: Error loading {}: {}'.format(source, str(err)))
+    return to_plain_data(yaml_dict)
+
+
+
+def to_plain_data(data):
+    """
+    Description:
+        Turn the round trip types that ruamel.yaml loads (CommentedMap, CommentedSeq,
+        ScalarFloat, etc.) into the builtin types they stand in for so that the data
+        can be cached as JSON and compared without ruamel.yaml.
+    """
+    if isinstance(data, collections.abc.Mapping):
+        return {to_plain_data(k) : to_plain_data(v) for k,v in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [to_plain_data(x) for x in data]
+    for plain_type in (bool, str, int, float):
+        if isinstance(data, plain_type):
+            return plain_type(data)
+    return data
+
+
+
+#- bump when the cache file format changes; old cache files are then ignored
+_YAML_CACHE_VERSION = 2
+_YAML_CACHE_KEYS = frozenset(('version', 'path', 'mtime_ns', 'size', 'sha256', 'data'))
+
+
+def yaml_cache_filepath(cache_dir, config_filepath):
+    """cache file path for a YAML file; named after a hash of the YAML file's path"""
+    cache_dir = filename_to_fullpath(cache_dir, '.')
+    name = hashlib.sha256(config_filepath.encode('utf-8')).hexdigest()[0:32]
+    return os.path.join(cache_dir, 'yaml-{}.json'.format(name))
+
+
+
+def _read_yaml_cache(cache_filepath):
+    """load a YAML cache file. Returns None if there is no usable cache"""
+    log = LoggerAdapter(logger, {'name_ext' : '_read_yaml_cache'})
+    try:
+        with open(cache_filepath, 'rt', encoding='utf-8') as fp:
+            cached = json.load(fp)
+    except FileNotFoundError:
+        return None
+    except Exception as err:
+        #- a broken cache is only ever a cache miss
+        log.debug("ignoring unreadable cache file: %s: %s", cache_filepath, err)
+        return None
+
+    if not isinstance(cached, dict) or cached.get('version') != _YAML_CACHE_VERSION or\
+        not _YAML_CACHE_KEYS.issubset(cached):
+        return None
+    return cached
+
+
+
+def _write_yaml_cache(cache_filepath, cached):
+    """atomically (re)write a YAML cache file; failing to write it is not an error"""
+    log = LoggerAdapter(logger, {'name_ext' : '_write_yaml_cache'})
+    try:
+        text = json.dumps(cached)
+    except (TypeError, ValueError) as err:
+        log.debug("not caching: %s: %s", cache_filepath, err)
+        return
+    if json.loads(text)['data'] != cached['data']:
+        #- e.g. int keys would come back as strings
+        log.debug("not caching: %s: the data doesn't survive JSON", cache_filepath)
+        return
+
+    cache_dir = os.path.dirname(cache_filepath)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_filepath = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wt', encoding='utf-8') as fp:
+                fp.write(text)
+            os.replace(tmp_filepath, cache_filepath)
+        except BaseException:
+            os.unlink(tmp_filepath)
+            raise
+    except OSError as err:
+        log.debug("not caching: %s: %s", cache_filepath, err)
@@ -14,3 +14,4 @@ from .attribute import AttributeView
 from .object import ObjectView
 from .group import GroupView
 from .collection import CollectionView
+from .table import TableView
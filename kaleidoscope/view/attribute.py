@@ -3,6 +3,7 @@ logger = getLogger(__name__)
 
 from .viewabc import ViewABC
 from kaleidoscope.color import ColoredText
+from kaleidoscope.color.coloredtext import no_text
 from collections import namedtuple
 AttributeRenderDatum = namedtuple("AttributeRenderDatum",\
     ["prologue", "attribute", "epilogue"])
@@ -14,24 +15,23 @@ class AttributeView(ViewABC):
         represents the value of an individual object's singular attribute wrapped in a
         ColoredText object.
     """
+    #- one of these is made per attribute per object; keep them small
+    __slots__ = ('text', 'width', 'color', 'prologue', 'epilogue')
+    render_method = print
 
-    def __init__(self, text, prologue=None, epilogue=None, color=None):
+    def __init__(self, text, prologue=None, epilogue=None, color=None, width=None):
         """
         text: the text that is the rendered attribute
         prologue: stuff you want to prepend to the rendered attribute
         epilogue: stuff you want to append to the rendered attribute
+        width: display width of text, if already measured by the model
         """
         self.text = text
-        self.render_method = print
+        self.width = width
         self.color = color
 
-        if prologue is None:
-            prologue = ''
-        self.prologue = ColoredText(prologue)
-
-        if epilogue is None:
-            epilogue = ''
-        self.epilogue = ColoredText(epilogue)
+        self.prologue = ColoredText(prologue) if prologue else no_text
+        self.epilogue = ColoredText(epilogue) if epilogue else no_text
 
 
 
@@ -54,14 +54,11 @@ class AttributeView(ViewABC):
         Description:
             return self as a collection of ColoredText instances
         """
-        log = LoggerAdapter(logger, {'name_ext' : '{}.get_render_data'.format(\
-                self.__class__.__name__)})
         outputs = list()
         outputs.append(self.prologue)
         outputs.append(ColoredText(self.text, self.color))
         outputs.append(self.epilogue)
         ard = AttributeRenderDatum(*outputs)
-        log.debug("returning: {}".format(ard))
         return ard
 
 
@@ -71,6 +68,9 @@ class AttributeView(ViewABC):
             text can be a newline-seperated stanza or a single string.
             the width of this attribute view is the length of the longest line in the text
         """
+        if self.width is not None:
+            return self.width
+
         lines = self.text.split('\n')
         if len(lines) > 1:
             return len( max(*lines, key=len) )
@@ -2,6 +2,7 @@ from logging import getLogger, LoggerAdapter
 logger = getLogger(__name__)
 
 from .viewabc import ViewABC
+from kaleidoscope.instrument import current_stats
 
 class CollectionView(ViewABC):
     """
@@ -10,17 +11,22 @@ class CollectionView(ViewABC):
     """
 
     def __init__(self, group_views=None, render_prologue=True):
-        super().__init__(render_prologue=render_prologue)
-        self.delimiter = ''
-        self.group_views = group_views
+        super().__init__()
+        self.render_prologue = render_prologue
+        self.delimiter = '\n'
+        self.group_views = group_views if group_views else list()
 
     def get_render_output(self):
-        output = ''
-        for n, group_view_x in enumerate(self.group_views):
-            output += group_view_x.get_render_output() + self.delimiter
-        return output
+        return self.delimiter.join([group_view_x.get_render_output()\
+            for group_view_x in self.group_views])
 
     def render(self):
-        return self.render_method(self.get_render_output())
-
+        output = self.get_render_output()
+        stats = current_stats()
+        if stats is None:
+            return self.render_method(output)
 
+        with stats.stage('emission'):
+            self.render_method(output)
+        stats.add_emitted(output, rows=sum([len(group_view_x.object_views)\
+            for group_view_x in self.group_views]))
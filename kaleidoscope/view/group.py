@@ -1,7 +1,29 @@
 from logging import getLogger, LoggerAdapter
 logger = getLogger(__name__)
 
+import sys
 from .viewabc import ViewABC
+from kaleidoscope.instrument import current_stats
+
+
+def more_text(count):
+    """
+    the "... N more" line that stands in for objects left out of a rendering; just
+    "... more" if the count is None (not known)
+    """
+    if count is None:
+        return '... more'
+    return '... {} more'.format(count)
+
+
+
+def add_counts(count, other):
+    """add up numbers of left out objects, either of which may be None (not known)"""
+    if count is None or other is None:
+        return None
+    return count + other
+
+
 
 class GroupView(ViewABC):
     """
@@ -20,6 +42,19 @@ class GroupView(ViewABC):
             
 
 
+    def iter_render_output(self):
+        """
+        Description:
+            Get the output of each ObjectView as it is rendered.
+            Works with lazily generated ObjectViews (see GroupModel.stream_view)
+        Output:
+            generator of the rendered text of each object
+        """
+        for object_view_x in self.object_views:
+            yield object_view_x.get_render_output()
+
+
+
     def get_render_output(self):
         """
         Description:
@@ -27,11 +62,7 @@ class GroupView(ViewABC):
         Output:
             the rendered object as text
         """
-        output = ''
-        for n,object_view_x in enumerate(self.object_views[0:-1]):
-            output += object_view_x.get_render_output() + self.delimiter
-        output += self.object_views[-1].get_render_output()
-        return output
+        return self.delimiter.join(self.iter_render_output())
 
 
 
@@ -42,7 +73,43 @@ class GroupView(ViewABC):
         Output:
             None; writes directly to the screen
         """
-        self.render_method(self.get_render_output())
+        #- counted as they are rendered; streamed object views aren't sized
+        outputs = list(self.iter_render_output())
+        output = self.delimiter.join(outputs)
+        stats = current_stats()
+        if stats is None:
+            self.render_method(output)
+        else:
+            with stats.stage('emission'):
+                self.render_method(output)
+            stats.add_emitted(output, rows=len(outputs))
+
 
 
+    def stream(self, file=None):
+        """
+        Description:
+            Write each ObjectView to the output as soon as it has been rendered instead
+            of building the output for the whole group first.
+        Input:
+            file: file-like object to write to [default: sys.stdout]
+        Output:
+            number of views written (including any header views)
+        """
+        if file is None:
+            file = sys.stdout
 
+        stats = current_stats()
+        count = 0
+        for output in self.iter_render_output():
+            output += self.delimiter
+            if stats is None:
+                file.write(output)
+                file.flush()
+            else:
+                with stats.stage('emission'):
+                    file.write(output)
+                    file.flush()
+                stats.add_emitted(output, rows=1)
+            count += 1
+        return count
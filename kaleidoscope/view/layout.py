@@ -0,0 +1,78 @@
+"""
+Description:
+    Line layout for object views.
+    An object is laid out as a row of attribute cells separated by delimiters. Cells can
+    be multi-line stanzas; the row then takes up as many lines as its tallest cell and
+    the shorter cells are padded out with blank lines so the columns stay lined up.
+
+    Each cell is measured once up front, every line is collected as a list of segments
+    and joined a single time, so laying out an object is linear in the size of its
+    output.
+"""
+from kaleidoscope.color import Color
+
+
+def layout_object_lines(cells, prologue=None, delimiters=None, max_width=None):
+    """
+    Description:
+        Lay out a row of attribute cells into rendered (color coded) lines of text.
+    Input:
+        cells: sequence of (lines, width, color) tuples, one per attribute
+            lines: list of the plain text lines of the cell
+            width: display width of the cell (length of its longest line)
+            color: Color (or color name) of the cell; None for no color
+        prologue: ColoredText placed before the first line of the first cell. It is
+            rendered in the color of the first cell, which is widened to fit it.
+        delimiters: iterator of ColoredText placed between cells
+        max_width: cut every line off at this many visible characters (None: no limit)
+    Output:
+        list of rendered lines
+    """
+    prologue_text = prologue.plain() if prologue else ''
+    num_cells = len(cells)
+    if num_cells == 0:
+        return list()
+
+    colors = [Color(color) for _, _, color in cells]
+    widths = [width for _, width, _ in cells]
+    widths[0] += len(prologue_text)
+    num_lines = max(len(lines) for lines, _, _ in cells)
+
+    rendered_lines = list()
+    for line_num in range(num_lines):
+        #- (plain text, Color) segments of this line
+        segments = list()
+        for m, (lines, _, _) in enumerate(cells):
+            if line_num < len(lines):
+                text = lines[line_num]
+                if m == 0 and line_num == 0:
+                    text = prologue_text + text
+                segments.append((text + ' ' * (widths[m] - len(text)), colors[m]))
+            else:
+                #- this cell has fewer lines than the tallest one; pad out the stanza
+                segments.append((' ' * widths[m], colors[m]))
+
+            if m < num_cells - 1:
+                delim = next(delimiters)
+                segments.append((delim.text, delim.color))
+
+        if max_width is not None:
+            segments = _trim_segments(segments, max_width)
+
+        rendered_lines.append(''.join([color.text(text) for text, color in segments]))
+
+    return rendered_lines
+
+
+
+def _trim_segments(segments, max_width):
+    """cut a line of (text, color) segments off after max_width visible characters"""
+    trimmed = list()
+    remaining = max_width
+    for text, color in segments:
+        if len(text) > remaining:
+            trimmed.append((text[0:remaining], color))
+            break
+        trimmed.append((text, color))
+        remaining -= len(text)
+    return trimmed
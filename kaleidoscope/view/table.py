@@ -0,0 +1,107 @@
+from logging import getLogger, LoggerAdapter
+logger = getLogger(__name__)
+
+import shutil
+from itertools import repeat
+from time import perf_counter
+
+from .group import GroupView, more_text
+from .layout import layout_object_lines
+from kaleidoscope.color import ColoredText
+from kaleidoscope.instrument import current_stats
+
+
+class TableView(GroupView):
+    """
+    Description:
+        GroupView that lays its rows out straight from a RenderTable instead of from
+        ObjectViews. See model.table.RenderTable
+    """
+
+    def __init__(self, table, delimiter=' | ', align=True, render_prologue=True,\
+        hidden=(0, 0)):
+        """
+        Input:
+            table: the filled in RenderTable
+            delimiter: string placed between the attributes of a row
+            align: line the columns up across rows
+            render_prologue: prefix each row with its index
+            hidden: numbers of rows left out before and after the table; shown as
+                "... N more" lines and counted in the row indexes. The number after
+                can be None if it isn't known
+        """
+        super().__init__(object_views=None)
+        self.table = table
+        self.delimiter_text = delimiter
+        self.align = align
+        self.render_prologue = render_prologue
+        self.hidden = hidden
+        self.term_size = shutil.get_terminal_size()
+
+
+
+    def iter_render_output(self, limit_to_screen=True):
+        """
+        Description:
+            Lay each row of the table out into text
+        Input:
+            limit_to_screen: cut lines off at the width of the terminal
+        Output:
+            generator of the rendered text of each row
+        """
+        table = self.table
+        num_columns = len(table.names)
+        before, after = self.hidden
+        index_width = len(str(before + len(table)))
+        max_width = self.term_size.columns if limit_to_screen else None
+        #- an iterator of widths per column; aligned columns are measured once
+        cell_widths = [iter(table.cell_widths(m, align=self.align)) for m in\
+            range(num_columns)]
+        lengths = table.lengths
+
+        if before:
+            yield more_text(before)
+
+        stats = current_stats()
+        for n in range(len(table)):
+            if stats is not None:
+                start = perf_counter()
+
+            color = table.row_colors[n]
+            cells = list()
+            for m in range(num_columns):
+                lines = table.get_lines(m, n)
+                width = next(cell_widths[m])
+                if lengths[m] and table.widths[m][n] > width:
+                    lines = [line[0:width] for line in lines]
+                cells.append((lines, width, color))
+
+            prologue = None
+            if self.render_prologue:
+                prologue = ColoredText('{: <{}}: '.format(before + n, index_width), color)
+            delimiters = repeat(ColoredText(self.delimiter_text, table.delimiter_colors[n]))
+            output = '\n'.join(layout_object_lines(cells, prologue=prologue,\
+                delimiters=delimiters, max_width=max_width))
+
+            if stats is not None:
+                stats.add_stage('layout', perf_counter() - start)
+            yield output
+
+        if after != 0:
+            yield more_text(after)
+
+
+
+    def render(self):
+        """
+        Description:
+            Render the TableView to the screen.
+        """
+        output = self.get_render_output()
+        stats = current_stats()
+        if stats is None:
+            self.render_method(output)
+        else:
+            with stats.stage('emission'):
+                self.render_method(output)
+            stats.add_emitted(output, rows=len(self.table))
@@ -10,6 +10,8 @@ class ViewABC(ABC):
     Description:
         Abstract Base Class of all Views to ensure that all views have the same operation
     """
+    #- let subclasses be slotted
+    __slots__ = ()
 
     def __init__(self, render_method=print):
         self.render_method = render_method
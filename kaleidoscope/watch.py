@@ -0,0 +1,269 @@
+"""
+Description:
+    Watch mode: keep a rendering of a changing set of objects up to date on a terminal.
+
+    Each refresh the objects are polled again and matched up with the rows already on
+    the screen by a key attribute (the spec's key, e.g. an instance id). Rows whose
+    attribute values are the same as last time keep their formatted output; only the
+    rows that changed are formatted again and only their lines are rewritten, by moving
+    the cursor to them. Everything is laid out and drawn again only when that can't be
+    avoided: the rows were added, removed or reordered, a column changed width, a
+    changed row now takes up a different number of lines or the terminal was resized.
+
+    Rows are addressed by their line on the screen, so the screen must never scroll:
+    only the rows that fit in the height of the terminal are drawn, and a "... N more"
+    line stands in for the rest.
+
+    See Render.watch()
+"""
+from logging import getLogger, LoggerAdapter
+logger = getLogger(__name__)
+
+_refresh_log = LoggerAdapter(logger, {'name_ext' : 'Watcher.refresh'})
+
+import shutil
+import sys
+
+from kaleidoscope.model import ObjectModel, GroupModel
+from kaleidoscope.model.attribute import spec_columns
+from kaleidoscope.spec.attribute import compile_accessor
+from kaleidoscope.view.group import more_text
+
+#- ANSI control sequence introducer
+CSI = '\x1b['
+
+
+
+class TerminalWriter(object):
+    """
+    Description:
+        The terminal operations a Watcher draws with, as ANSI escape sequences.
+        Anything with the same methods can be used instead (e.g. to test with).
+    """
+    def __init__(self, file=None):
+        """
+        Input:
+            file: file-like object of the terminal [default: sys.stdout]
+        """
+        self.file = file if file is not None else sys.stdout
+
+
+    def clear(self):
+        """clear the screen and move the cursor to the top left"""
+        self.file.write(CSI + '2J' + CSI + 'H')
+
+
+    def move_to(self, line):
+        """move the cursor to the start of a line; the first line is 0"""
+        self.file.write('{}{};1H'.format(CSI, line + 1))
+
+
+    def write_line(self, text):
+        """replace the line the cursor is on with text"""
+        self.file.write(CSI + '2K' + text)
+
+
+    def flush(self):
+        self.file.flush()
+
+
+    def get_height(self):
+        """number of lines of the terminal"""
+        return shutil.get_terminal_size().lines
+
+
+
+class _WatchedRow(object):
+    """what a Watcher keeps about a row: its model, values and lines on the screen"""
+    __slots__ = ('object_model', 'values', 'lines', 'line_number')
+
+    def __init__(self, object_model, values):
+        self.object_model = object_model
+        self.values = values
+        #- rendered lines and where the first one is on the screen (None when the row
+        #- didn't fit on the screen)
+        self.lines = None
+        self.line_number = None
+
+
+
+class Watcher(object):
+    """
+    Description:
+        Keeps a rendering of polled objects up to date. See the module description.
+    """
+    def __init__(self, spec, key=None, colors=None, writer=None, render_prologue=True):
+        """
+        Input:
+            spec: ObjectModelSpec to render the objects with
+            key: name of the attribute that identifies an object [default: spec.key]
+            colors: iterable of the colors of the rows [default: the object colors]
+            writer: TerminalWriter (or compatible) to draw with [default: on stdout]
+            render_prologue: prefix each row with its index
+        Raises:
+            ValueError if there is no key attribute
+        """
+        self.spec = spec
+        self.key = key if key else getattr(spec, 'key', None)
+        if not self.key:
+            raise ValueError("watching needs a key attribute to match objects up with"\
+                " their rows; set the spec's key or pass one")
+        self.key_accessor = compile_accessor(self.key)
+        self.writer = writer if writer is not None else TerminalWriter()
+        self.render_prologue = render_prologue
+
+        self.group_model = GroupModel(colors=colors)
+        #- color of the row at each index; stays the same from refresh to refresh
+        self.row_colors = list()
+
+        #- key --> _WatchedRow, and the keys in the order they are drawn in
+        self.rows = dict()
+        self.order = list()
+        self.attr_maxlens = dict()
+        self.index_width = 0
+        self.num_lines = 0
+        self.height = None
+
+
+
+    def row_color(self, index):
+        """the color of the row at an index"""
+        while len(self.row_colors) <= index:
+            self.row_colors.append(self.group_model.get_next_color())
+        return self.row_colors[index]
+
+
+
+    def refresh(self, objects):
+        """
+        Description:
+            Bring the screen up to date with the objects
+        Input:
+            objects: iterable of the current objects
+        Output:
+            number of rows that were drawn
+        Raises:
+            ValueError if two of the objects have the same key; nothing is drawn
+        """
+        columns = spec_columns(self.spec)
+        previous_rows = self.rows
+        rows = dict()
+        order = list()
+        changed = list()
+        for obj_x in objects:
+            key = self.key_accessor(obj_x)
+            if key in rows:
+                raise ValueError("watch key '{}' is not unique: more than one object"\
+                    " has the value {!r}".format(self.key, key))
+            values = tuple(column_x.accessor(obj_x) for column_x in columns)
+            row = previous_rows.get(key)
+            if row is None or row.values != values:
+                object_model = ObjectModel(obj_x, self.spec, columns=columns)
+                for attribute_model_x, value_x in zip(object_model.attribute_models,\
+                    values):
+                    attribute_model_x.set_value(value_x)
+                row = _WatchedRow(object_model, values)
+                changed.append(key)
+            rows[key] = row
+            order.append(key)
+
+        #- widths the columns need now; measured with the spec lengths, not the
+        #- widths the rows were last drawn with
+        attr_maxlens = dict()
+        for row in rows.values():
+            for attribute_model_x in row.object_model.attribute_models:
+                attribute_model_x.length = attribute_model_x.column.length
+            self.group_model.measure_object_model(row.object_model, attr_maxlens)
+
+        index_width = len(str(len(order)))
+        height = self.writer.get_height()
+        relayout = order != self.order or attr_maxlens != self.attr_maxlens or\
+            index_width != self.index_width or height != self.height
+        self.rows = rows
+        self.order = order
+        self.attr_maxlens = attr_maxlens
+        self.index_width = index_width
+        self.height = height
+
+        if not relayout:
+            #- same rows in the same places; lay out just the changed ones that are
+            #- on the screen
+            indexes = { key : n for n, key in enumerate(order) }
+            changed = [key for key in changed if\
+                previous_rows[key].line_number is not None]
+            for key in changed:
+                row = rows[key]
+                row.lines = self.layout_row(indexes[key], row)
+                row.line_number = previous_rows[key].line_number
+                if len(row.lines) != len(previous_rows[key].lines):
+                    relayout = True
+                    break
+
+        if relayout:
+            drawn = self.redraw()
+        else:
+            for key in changed:
+                self.draw_row(rows[key])
+            drawn = len(changed)
+
+        _refresh_log.debug("%d objects | %d changed | relayout: %s", len(order),\
+            len(changed), relayout)
+        #- park the cursor below the rows
+        self.writer.move_to(self.num_lines)
+        self.writer.flush()
+        return drawn
+
+
+
+    def layout_row(self, index, row):
+        """lay a row out with the current column widths; returns its lines"""
+        object_model = row.object_model
+        self.group_model.prepare_object_model(index, object_model, self.index_width,\
+            render_prologue=self.render_prologue, color=self.row_color(index))
+        view = self.group_model.render_aligned(object_model, self.attr_maxlens)
+        return view.get_render_output().split('\n')
+
+
+
+    def draw_row(self, row):
+        """write the lines of a row over its lines on the screen"""
+        for n, line in enumerate(row.lines):
+            self.writer.move_to(row.line_number + n)
+            self.writer.write_line(line)
+
+
+
+    def redraw(self):
+        """
+        Description:
+            Lay out the rows and draw the whole screen again, as many rows as fit on
+            the screen followed by a "... N more" line for the rest. Rows that haven't
+            changed keep their formatted values.
+        Output:
+            number of rows drawn
+        """
+        self.writer.clear()
+        #- the last line is kept free for the cursor, so the screen never scrolls
+        max_lines = max(1, (self.height or self.writer.get_height()) - 1)
+        line_number = 0
+        drawn = 0
+        for index, key in enumerate(self.order):
+            row = self.rows[key]
+            row.lines = self.layout_row(index, row)
+            #- leave room for the "... N more" line unless this is the last row
+            reserve = 1 if index < len(self.order) - 1 else 0
+            if line_number + len(row.lines) + reserve > max_lines:
+                break
+            row.line_number = line_number
+            self.draw_row(row)
+            line_number += len(row.lines)
+            drawn += 1
+
+        for key in self.order[drawn:]:
+            self.rows[key].line_number = None
+        if drawn < len(self.order):
+            self.writer.move_to(line_number)
+            self.writer.write_line(more_text(len(self.order) - drawn))
+            line_number += 1
+        self.num_lines = line_number
+        return drawn
@@ -1,5 +1,38 @@
+import os
+import subprocess
+import sys
+
 from kaleidoscope import __version__
 
+#- generous; importing kaleidoscope should not do any real work
+IMPORT_BUDGET_SECONDS = 0.5
+
+
+def run_python(*args):
+    """run a fresh interpreter from the repo root and return its stdout + stderr"""
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, *args], cwd=repo_root, check=True,\
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    return result.stdout + result.stderr
+
 
 def test_version():
     assert __version__ == '0.0.1'
+
+
+def test_import_is_lazy():
+    output = run_python('-c', '; '.join([
+        'import sys, kaleidoscope',
+        'print(kaleidoscope._renderer is None)',
+        'print(any(m.startswith("kaleidoscope.formatter.") for m in sys.modules))',
+        'print("ruamel.yaml" in sys.modules)']))
+    assert output.split() == ['True', 'False', 'False']
+
+
+def test_import_time_budget():
+    output = run_python('-X', 'importtime', '-c', 'import kaleidoscope')
+    #- import time: self [us] | cumulative | imported package
+    cumulative = [int(line.split('|')[1]) for line in output.splitlines()\
+        if line.split('|')[-1].strip() == 'kaleidoscope']
+    assert cumulative
+    assert cumulative[0] / 1e6 < IMPORT_BUDGET_SECONDS
@@ -44,6 +44,20 @@ class TestColorClass(unittest.TestCase):
         color = Color('magenta')
         self.assertEqual('normal magenta on black', color.get_color_name())
 
+    def test_interned(self):
+        color = Color('bright yellow on blue')
+        self.assertIs(color, Color('bright yellow on blue'))
+        self.assertIs(color, Color(color))
+        self.assertIsNot(color, Color('yellow on blue'))
+
+    def test_invalid_color_not_interned(self):
+        self.assertRaises(ValueError, Color, 'bright purple')
+        self.assertRaises(ValueError, Color, 'bright purple')
+
+    def test_no_color(self):
+        self.assertEqual(Color(None).text('plain'), 'plain')
+        self.assertEqual(Color(Color(None)).text('plain'), 'plain')
+
 
 
 
@@ -52,6 +66,18 @@ class TestColoredText(unittest.TestCase):
         ct = ColoredText(text='Hello World!', color='bright white on green')
         self.assertEqual(ct.to_str(), '\x1b[37m\x1b[42m\x1b[1mHello World!\x1b[0m')
 
+    def test_shares_interned_color(self):
+        ct1 = ColoredText('one', 'dim cyan')
+        ct2 = ColoredText('two', Color('dim cyan'))
+        self.assertIs(ct1.color, ct2.color)
+        self.assertFalse(hasattr(ct1, '__dict__'))
+
+    def test_copy(self):
+        ct = ColoredText(ColoredText('copied', 'red'))
+        self.assertEqual(ct.text, 'copied')
+        self.assertIs(ct.color, Color('red'))
+        self.assertEqual(ct.get_color_name(), 'normal red on black')
+
 
 if __name__ == '__main__':
     unittest.main()
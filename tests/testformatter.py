@@ -0,0 +1,319 @@
+"""Test the formatter registry"""
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+from kaleidoscope.formatter import FormatterRegistry, Formatter, ScopedKwarg, render_scope
+from kaleidoscope.model import ObjectModel, GroupModel
+from kaleidoscope.spec import ObjectModelSpec, AttributeSpec
+from kaleidoscope.model import AttributeModel
+from kaleidoscope.spec import FormatterSpec
+
+class SimpleClass(object):
+    def __init__(self, name):
+        self.name = name
+
+def tagged(value, source, tag='-', sep=' '):
+    return sep.join([tag, value, source.name])
+
+#- counts the evaluations of scoped kwargs
+evaluations = list()
+def expensive_setup():
+    evaluations.append(None)
+    return str(len(evaluations))
+
+def slow_setup():
+    time.sleep(0.05)
+    return expensive_setup()
+
+
+class TestFormatterRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = FormatterRegistry()
+        self.registry.register('tagged', tagged)
+
+    def test_lookup(self):
+        self.assertIs(self.registry.lookup('tagged'), tagged)
+        self.assertIs(self.registry.lookup('nsid://tagged'), tagged)
+        self.assertIs(self.registry.lookup('os.path.join'), os.path.join)
+        self.assertIs(self.registry.lookup('str'), str)
+        #- relative to kaleidoscope.formatter
+        self.assertTrue(callable(self.registry.lookup('boto3.resources.factory.ec2'\
+            '.SecurityGroup.ip_permissions.format_ip_permissions')))
+        with self.assertRaises(ValueError):
+            self.registry.lookup('no_such_module.no_such_formatter')
+
+    def test_lookup_once(self):
+        with mock.patch.object(self.registry, 'resolve_name',\
+            wraps=self.registry.resolve_name) as resolve_name:
+            for n in range(3):
+                self.registry.lookup('os.path.join')
+                with self.assertRaises(ValueError):
+                    self.registry.lookup('no_such_module.no_such_formatter')
+        #- one hit for os.path.join, two candidates for the missing one
+        self.assertEqual(resolve_name.call_count, 3)
+
+    def test_resolve_spec(self):
+        spec = FormatterSpec('tagged', {'tag' : "'T'", 'sep' : 'os.sep'})
+        formatter = self.registry.resolve(spec)
+        self.assertIs(self.registry.resolve(spec), formatter)
+        self.assertEqual(formatter.kwargs, {'tag' : 'T', 'sep' : os.sep})
+        self.assertEqual(formatter.bind(SimpleClass('src'))('v'),\
+            os.sep.join(['T', 'v', 'src']))
+
+        with self.assertRaises(ValueError):
+            self.registry.resolve(FormatterSpec('tagged', {'tag' : 'no_such.name'}))
+        with self.assertRaises(ValueError):
+            self.registry.resolve(object())
+
+    def test_resolve_callable(self):
+        formatter = self.registry.resolve(len)
+        self.assertIs(formatter.bind(SimpleClass('src')), len)
+
+
+class TestAttributeModelFormatter(unittest.TestCase):
+    def test_spec_resolved_once(self):
+        spec = FormatterSpec('os.path.join', None)
+        with mock.patch('kaleidoscope.formatter.FormatterRegistry.resolve_name',\
+            wraps=FormatterRegistry.resolve_name) as resolve_name:
+            models = [AttributeModel(SimpleClass(str(n)), 'name', render_method=spec)\
+                for n in range(5)]
+        self.assertLessEqual(resolve_name.call_count, 1)
+        self.assertIs(models[0].formatter, models[4].formatter)
+        self.assertIsInstance(models[0].formatter, Formatter)
+
+    def test_named_render_method(self):
+        registry = FormatterRegistry()
+        registry.register('tagged', tagged)
+        with mock.patch('kaleidoscope.model.attribute.formatter_registry', registry):
+            am = AttributeModel(SimpleClass('abc'), 'name', render_method='tagged')
+        self.assertTrue(am.uses_named_render_method())
+        self.assertEqual(am.get_view_text()[0], '- abc abc')
+
+
+
+class TestScopedKwargs(unittest.TestCase):
+    def setUp(self):
+        del evaluations[:]
+        self.expression = '{}.expensive_setup()'.format(__name__)
+
+    def test_expression_is_scoped(self):
+        registry = FormatterRegistry()
+        registry.register('tagged', tagged)
+        formatter = registry.resolve(FormatterSpec('tagged', {'tag' : self.expression}))
+        self.assertEqual(formatter.kwargs, dict())
+        self.assertEqual(formatter.scoped_kwargs['tag'].scope, 'render')
+
+    def test_render_scope(self):
+        kwarg = ScopedKwarg(self.expression)
+        with render_scope():
+            values = [kwarg.get_value() for n in range(3)]
+            with render_scope():
+                values.append(kwarg.get_value())
+        self.assertEqual(values, ['1'] * 4)
+        with render_scope():
+            self.assertEqual(kwarg.get_value(), '2')
+        #- outside of a render, every use evaluates
+        kwarg.get_value()
+        kwarg.get_value()
+        self.assertEqual(len(evaluations), 4)
+
+    def test_ttl_and_process_scope(self):
+        kwarg = ScopedKwarg(self.expression, scope='ttl', ttl=60)
+        self.assertEqual([kwarg.get_value() for n in range(3)], ['1'] * 3)
+        with mock.patch('time.monotonic', return_value=kwarg._expires + 1):
+            self.assertEqual(kwarg.get_value(), '2')
+
+        kwarg = ScopedKwarg(self.expression, scope='process')
+        self.assertEqual([kwarg.get_value() for n in range(3)], ['3'] * 3)
+
+        with self.assertRaises(ValueError):
+            ScopedKwarg(self.expression, scope='ttl')
+        with self.assertRaises(ValueError):
+            ScopedKwarg(self.expression, scope='forever')
+
+    def test_concurrent_refresh(self):
+        for kwarg in (ScopedKwarg('{}.slow_setup()'.format(__name__), scope='process'),\
+            ScopedKwarg('{}.slow_setup()'.format(__name__), scope='ttl', ttl=60)):
+            del evaluations[:]
+            barrier = threading.Barrier(8)
+            values = list()
+            def get_value():
+                barrier.wait()
+                values.append(kwarg.get_value())
+            threads = [threading.Thread(target=get_value) for n in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(values, ['1'] * 8)
+            self.assertEqual(len(evaluations), 1)
+
+    def test_shared_by_group(self):
+        registry = FormatterRegistry()
+        registry.register('tagged', tagged)
+        spec = ObjectModelSpec(attributes=[AttributeSpec('name', None,\
+            FormatterSpec('tagged', {'tag' : {'expression' : self.expression}}))])
+        with mock.patch('kaleidoscope.model.attribute.formatter_registry', registry),\
+            render_scope():
+            object_models = [ObjectModel(SimpleClass(str(n)), spec) for n in range(10)]
+            GroupModel(object_models=object_models).render_view().get_render_output()
+        self.assertEqual(len(evaluations), 1)
+
+
+
+def shout(value):
+    shout.calls += 1
+    return value.upper()
+shout.calls = 0
+
+def shout_batch(values, sources):
+    shout_batch.calls += 1
+    return [value.upper() + '!' for value in values]
+shout_batch.calls = 0
+
+
+class TestBatchFormatter(unittest.TestCase):
+    def setUp(self):
+        shout.calls = shout_batch.calls = 0
+        shout.batch = shout_batch
+        self.objects = [SimpleClass('name{}'.format(n)) for n in range(10)]
+
+    def tearDown(self):
+        del shout.batch
+
+    def render(self, spec):
+        object_models = [ObjectModel(obj, spec) for obj in self.objects]
+        return GroupModel(object_models=object_models, align=True).render_view(\
+            render_prologue=False).get_render_output()
+
+    def test_one_call_per_column(self):
+        output = self.render(ObjectModelSpec(attributes=[('name', None, shout)]))
+        self.assertEqual(shout_batch.calls, 1)
+        self.assertEqual(shout.calls, 0)
+        self.assertIn('NAME9!', output)
+
+    def test_named_formatter_kwargs(self):
+        def tagged_batch(values, sources, tag='-', sep=' '):
+            return [sep.join([tag, value, source.name]) for value, source in\
+                zip(values, sources)]
+        tagged.batch = tagged_batch
+        registry = FormatterRegistry()
+        registry.register('tagged', tagged)
+        spec = ObjectModelSpec(attributes=[AttributeSpec('name', None,\
+            FormatterSpec('tagged', {'tag' : "'T'"}))])
+        try:
+            with mock.patch('kaleidoscope.model.attribute.formatter_registry', registry):
+                output = self.render(spec)
+        finally:
+            del tagged.batch
+        self.assertIn('T name3 name3', output)
+
+    def test_callable_prefetch(self):
+        def lookup(value, prefetched=None):
+            return '{}:{}'.format(value, prefetched)
+        lookup.prefetch = lambda values, sources: 'TABLE'
+        spec = ObjectModelSpec(attributes=[('name', None, lookup)])
+        self.assertIn('name3:TABLE', self.render(spec))
+        output = GroupModel().render_table_view(self.objects, spec).get_render_output()
+        self.assertIn('name3:TABLE', output)
+
+    def test_bad_batch_falls_back(self):
+        shout.batch = lambda values, sources: values[1:]
+        with self.assertLogs('kaleidoscope.model.group', level='ERROR'):
+            output = self.render(ObjectModelSpec(attributes=[('name', None, shout)]))
+        self.assertEqual(shout.calls, 10)
+        self.assertIn('NAME9', output)
+
+
+class FakeEC2Client(object):
+    """in-process stand-in for a boto3 EC2 client; records describe_security_groups calls"""
+    def __init__(self, region_name, group_names):
+        self.meta = mock.Mock(region_name=region_name)
+        self.group_names = group_names
+        self.calls = list()
+
+    def describe_security_groups(self, Filters):
+        self.calls.append(Filters)
+        group_ids = Filters[0]['Values']
+        return {'SecurityGroups' : [{'GroupId' : group_id, 'GroupName' :\
+            self.group_names[group_id]} for group_id in group_ids\
+            if group_id in self.group_names]}
+
+
+class FailingEC2Client(FakeEC2Client):
+    def describe_security_groups(self, Filters):
+        self.calls.append(Filters)
+        raise RuntimeError('An error occurred (RequestLimitExceeded)')
+
+
+class FakeSecurityGroup(object):
+    def __init__(self, group_id, client, referenced_group_ids):
+        self.group_id = group_id
+        self.owner_id = '1234'
+        self.meta = mock.Mock(client=client)
+        pairs = [{'GroupId' : ref_id, 'UserId' : '1234'} for ref_id in referenced_group_ids]
+        self.ip_permissions = [{'IpProtocol' : 'tcp', 'FromPort' : 22, 'ToPort' : 22,\
+            'IpRanges' : [], 'UserIdGroupPairs' : pairs}]
+
+
+class TestIpPermissionsPrefetch(unittest.TestCase):
+    formatter_name = 'boto3.resources.factory.ec2.SecurityGroup.ip_permissions'\
+        '.format_ip_permissions'
+
+    def setUp(self):
+        group_names = {'sg-ref-{}'.format(n) : 'referenced-{}'.format(n) for n in range(50)}
+        self.clients = [FakeEC2Client(region, group_names) for region in\
+            ('us-east-1', 'eu-west-1')]
+        self.security_groups = [FakeSecurityGroup('sg-{}'.format(n),\
+            self.clients[n % 2], ['sg-{}'.format(n), 'sg-ref-{}'.format(n % 50),\
+            'sg-ref-{}'.format((n + 1) % 50), 'sg-gone']) for n in range(2000)]
+
+    def test_batched_lookups(self):
+        spec = ObjectModelSpec(attributes=[AttributeSpec('ip_permissions', None,\
+            FormatterSpec(self.formatter_name, None))])
+        object_models = [ObjectModel(sg, spec) for sg in self.security_groups]
+        output = GroupModel(object_models=object_models).render_view().get_render_output()
+
+        #- one call per region instead of one per rule
+        self.assertEqual([len(client.calls) for client in self.clients], [1, 1])
+        self.assertIn('Security Group Id: sg-ref-1 (referenced-1) | UserId: 1234', output)
+        self.assertIn('Security Group Id: sg-gone | UserId: 1234', output)
+        self.assertIn('Security Group Id: self', output)
+
+    def test_without_prefetch(self):
+        from kaleidoscope.formatter import registry
+        format_ip_permissions = registry.lookup(self.formatter_name)
+        sg = self.security_groups[3]
+        lines = format_ip_permissions(sg.ip_permissions, source=sg)
+        self.assertIn('Security Group Id: sg-ref-4 (referenced-4) | UserId: 1234', lines)
+        self.assertEqual(len(self.clients[1].calls), 1)
+
+    def test_failed_lookups(self):
+        self.clients = [FailingEC2Client(region, dict()) for region in\
+            ('us-east-1', 'eu-west-1')]
+        for n, sg in enumerate(self.security_groups):
+            sg.meta.client = self.clients[n % 2]
+        spec = ObjectModelSpec(attributes=[AttributeSpec('ip_permissions', None,\
+            FormatterSpec(self.formatter_name, None))])
+        object_models = [ObjectModel(sg, spec) for sg in self.security_groups]
+        with self.assertLogs('kaleidoscope', level='WARNING'):
+            output = GroupModel(object_models=object_models).render_view()\
+                .get_render_output()
+
+        #- each region is tried once, not once per object, and goes without names
+        self.assertEqual([len(client.calls) for client in self.clients], [1, 1])
+        self.assertIn('Security Group Id: sg-ref-1 | UserId: 1234', output)
+        self.assertNotIn('(referenced-', output)
+
+        from kaleidoscope.formatter import registry
+        format_ip_permissions = registry.lookup(self.formatter_name)
+        sg = self.security_groups[3]
+        with self.assertLogs('kaleidoscope', level='WARNING'):
+            lines = format_ip_permissions(sg.ip_permissions, source=sg)
+        self.assertIn('Security Group Id: sg-ref-4 | UserId: 1234', lines)
+
+
+if __name__ == '__main__':
+    unittest.main()
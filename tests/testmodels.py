@@ -1,9 +1,18 @@
 import unittest
 import operator
+import re
+from unittest import mock
 import copy
+import os
+import threading
 from kaleidoscope.model import AttributeModel, ObjectModel, GroupModel, CollectionModel
 from kaleidoscope.spec.object import ObjectModelSpec
+from kaleidoscope.spec.attribute import AttributeSpec
+from kaleidoscope.view import AttributeView, ObjectView
 from kaleidoscope.color import Color
+from kaleidoscope.instrument import collecting
+from kaleidoscope.parallel import compile_spec
+import kaleidoscope.defaults as defaults
 
 class SimpleClass(object):
     """Simple Class for testing of attributes"""
@@ -12,6 +21,18 @@ class SimpleClass(object):
         self.list_attribute = list([0,1,2,3,4,5])
         self.dict_attribute = dict({'key1' : 'value1', 'key2' : 'value2'})
 
+_parent_pid = os.getpid()
+
+def format_where(value):
+    """picklable formatter that tells which process ran it"""
+    return '{}@{}'.format(value, 'parent' if os.getpid() == _parent_pid else 'worker')
+
+def format_odd(value):
+    """picklable formatter that fails on odd values"""
+    if value % 2:
+        raise ValueError('odd value: {}'.format(value))
+    return str(value)
+
 class TestAttributeModel(unittest.TestCase):
     def setUp(self):
         self.simple = SimpleClass()
@@ -45,6 +66,17 @@ class TestAttributeModel(unittest.TestCase):
         self.assertEqual(view.get_render_output(), expected)
         view.render()
 
+    def test_subscript_expression(self):
+        am = AttributeModel(self.simple, "dict_attribute['key2']", color=Color('green'))
+        view = am.render_view()
+        expected = '\x1b[32m\x1b[40m\x1b[22mvalue2\x1b[0m'
+        self.assertEqual(view.get_render_output(), expected)
+
+    def test_dotted_expression(self):
+        self.simple.nested = SimpleClass()
+        am = AttributeModel(self.simple, "nested.list_attribute[2]")
+        self.assertEqual(am.render_view().text, '2')
+
     def test_get_source(self):
         am = AttributeModel(self.simple, 'list_attribute')
         self.assertEqual(self.simple, am.get_source())
@@ -94,8 +126,43 @@ class TestObjectModel(unittest.TestCase):
         self.assertEqual(expected, actual)
         om.render()
 
-        
-        
+    def test_slots(self):
+        """Test the per object models and views don't carry a __dict__"""
+        om = ObjectModel(self.simple, spec=self.oms)
+        ov = om.render_view()
+        for instance in (om, om.attribute_models[0], ov, ov.attribute_views[0]):
+            self.assertFalse(hasattr(instance, '__dict__'), type(instance))
+        self.assertIsInstance(ov, ObjectView)
+        self.assertIsInstance(ov.attribute_views[0], AttributeView)
+
+    def test_shared_columns(self):
+        """Test every ObjectModel of a spec shares one AttributeColumn per attribute"""
+        oms = [ObjectModel(SimpleClass(), spec=self.oms) for n in range(3)]
+        for n in range(len(self.om_modeled_attributes)):
+            columns = set(id(om.attribute_models[n].column) for om in oms)
+            self.assertEqual(len(columns), 1)
+
+    def test_columns_follow_attribute_edits(self):
+        """Test the shared columns are made again when the spec attributes are edited"""
+        spec = ObjectModelSpec(attributes=['simple_attribute'])
+        self.assertEqual([am.name for am in ObjectModel(self.simple, spec).attribute_models],\
+            ['simple_attribute'])
+
+        spec.attributes.append(AttributeSpec('list_attribute', None, None))
+        self.assertEqual([am.name for am in ObjectModel(self.simple, spec).attribute_models],\
+            ['simple_attribute', 'list_attribute'])
+
+        spec.attributes[0] = AttributeSpec("dict_attribute['key1']", None, None)
+        om = ObjectModel(self.simple, spec)
+        self.assertEqual([am.name for am in om.attribute_models],\
+            ["dict_attribute['key1']", 'list_attribute'])
+        self.assertEqual(om.attribute_models[0].format_value()[0], ['value1'])
+
+        spec.attributes = [AttributeSpec('simple_attribute', None, None)]
+        self.assertEqual(len(ObjectModel(self.simple, spec).attribute_models), 1)
+
+
+
 class TestGroupModel(unittest.TestCase):
     """Test the GroupModel class"""
     def setUp(self):
@@ -232,6 +299,211 @@ class TestGroupModel(unittest.TestCase):
 
 
 
+    def test_align_formats_once(self):
+        """Test that aligning a group only runs each attribute formatter once"""
+        calls = list()
+        def counting_formatter(value):
+            calls.append(value)
+            return str(value)
+
+        oms = ObjectModelSpec(attributes=[('name', None, counting_formatter), 'mood'])
+        oms_models = [ObjectModel(self.simple1, oms), ObjectModel(self.simple3, oms)]
+        gm = GroupModel(object_models=oms_models, align=True)
+        gm.render_view().get_render_output()
+        self.assertEqual(len(calls), 2)
+
+    def test_render_window(self):
+        """Test only the object models in the window are formatted and aligned"""
+        calls = list()
+        def counting_formatter(value):
+            calls.append(value)
+            return str(value)
+
+        oms = ObjectModelSpec(attributes=[('name', None, counting_formatter), 'mood'])
+        self.simple3.name = 'a_much_longer_name'
+        objects = [self.simple1, self.simple2, self.simple3, self.simple4]
+        gm = GroupModel(object_models=[ObjectModel(obj_x, oms) for obj_x in objects],\
+            align=True, offset=1, limit=1)
+        lines = [re.sub(r'\x1b\[[0-9;]*m', '', line) for line in\
+            gm.render_view().get_render_output().split('\n')]
+        self.assertEqual(lines, ['... 1 more', '1: default_name | happy', '... 2 more'])
+        self.assertEqual(calls, ['default_name'])
+
+        gm = GroupModel(object_models=[ObjectModel(obj_x, oms) for obj_x in objects],\
+            tail=2, hidden=(0, 5))
+        lines = [re.sub(r'\x1b\[[0-9;]*m', '', line) for line in\
+            gm.render_view().get_render_output().split('\n')]
+        self.assertEqual(lines, ['... 2 more', '2: a_much_longer_name | happy',\
+            '3: default_name | happy', '... 5 more'])
+
+    def test_align_window(self):
+        """Test streaming alignment from a lookahead window that only widens columns"""
+        oms = ObjectModelSpec(attributes=['name', 'mood'])
+        objects = [self.simple1, self.simple2, self.simple3]
+        objects[2].name = 'a_much_longer_name'
+        object_models = (ObjectModel(obj_x, oms) for obj_x in objects)
+        gm = GroupModel()
+        views = list(gm.iter_object_views(object_models, render_prologue=False,\
+            align_window=2, header=True))
+        lines = [re.sub(r'\x1b\[[0-9;]*m', '', view.get_render_output()) for view in views]
+        self.assertEqual(lines, [
+            'name         | mood ',
+            'default_name | happy',
+            'default_name | happy',
+            'name               | mood ',
+            'a_much_longer_name | happy'])
+
+    def test_align_window_short_input(self):
+        """Test the lookahead window is flushed when the input runs out first"""
+        oms = ObjectModelSpec(attributes=['name', 'mood'])
+        object_models = iter([ObjectModel(self.simple1, oms)])
+        gm = GroupModel()
+        views = list(gm.iter_object_views(object_models, align_window=10))
+        self.assertEqual(len(views), 1)
+
+    def test_stream_view_stats(self):
+        """Test rendering a streamed group view while collecting stats"""
+        oms = ObjectModelSpec(attributes=['name', 'mood'])
+        object_models = (ObjectModel(obj_x, oms) for obj_x in\
+            [self.simple1, self.simple2, self.simple3])
+        gm = GroupModel()
+        view = gm.stream_view(object_models)
+        view.render_method = mock.Mock()
+        with collecting() as stats:
+            view.render()
+        self.assertEqual(view.render_method.call_count, 1)
+        self.assertEqual(stats.rows, 3)
+
+    def test_no_debug_formatting(self):
+        """Test that models aren't formatted for debug messages when DEBUG is off"""
+        gm = GroupModel(object_models=[self.om5, self.om6, self.om7], align=True)
+        with mock.patch.object(AttributeModel, '__repr__', side_effect=AssertionError):
+            gm.render_view().get_render_output()
+
+    def test_fetch_workers(self):
+        """Test that slow attributes are read concurrently and rows stay in order"""
+        lock = threading.Lock()
+        in_flight = [0, 0]
+
+        class SlowClass(object):
+            #- every read waits for 3 others to be in flight at the same time
+            barrier = threading.Barrier(4, timeout=10)
+
+            def __init__(self, n):
+                self.n = n
+            @property
+            def slow(self):
+                with lock:
+                    in_flight[0] += 1
+                    in_flight[1] = max(in_flight)
+                try:
+                    self.barrier.wait()
+                finally:
+                    with lock:
+                        in_flight[0] -= 1
+                return 'slow{}'.format(self.n)
+
+        oms = ObjectModelSpec(attributes=['n', 'slow'])
+        object_models = [ObjectModel(SlowClass(n), oms) for n in range(20)]
+        gm = GroupModel(object_models=object_models, align=True, fetch_workers=10)
+        output = gm.render_view(render_prologue=False).get_render_output()
+        self.assertTrue(4 <= in_flight[1] <= 10, in_flight[1])
+        lines = re.sub(r'\x1b\[[0-9;]*m', '', output).split('\n')
+        self.assertEqual(lines, ['{: <2} | slow{: <2}'.format(n, n) for n in range(20)])
+
+        #- streamed
+        in_flight[1] = 0
+        object_models = (ObjectModel(SlowClass(n), oms) for n in range(20))
+        views = list(GroupModel(fetch_workers=10).iter_object_views(object_models))
+        self.assertTrue(4 <= in_flight[1] <= 10, in_flight[1])
+        self.assertIn('slow19', views[-1].get_render_output())
+
+    def test_fetch_workers_errors(self):
+        """Test that attributes failing to be read fail the same way as without threads"""
+        oms = ObjectModelSpec(attributes=['name', 'no_such_attribute'])
+        gm = GroupModel(object_models=[ObjectModel(self.simple1, oms),\
+            ObjectModel(self.simple2, oms)], fetch_workers=4)
+        with self.assertRaises(AttributeError):
+            gm.render_view()
+
+    def test_format_processes(self):
+        """Test formatting a group in a process pool"""
+        class Row(object):
+            def __init__(self, n):
+                self.n = n
+                self.name = 'row{}'.format(n)
+
+        oms = ObjectModelSpec(attributes=[('n', None, format_where), 'name',\
+            ('name', None, lambda value: value.upper())])
+        rows = [Row(n) for n in range(50)]
+        serial = GroupModel(object_models=[ObjectModel(row, oms) for row in rows],\
+            align=True).render_view(render_prologue=False).get_render_output()
+
+        #- too few rows to start the pool for
+        gm = GroupModel(object_models=[ObjectModel(row, oms) for row in rows],\
+            align=True, format_processes=2)
+        self.assertEqual(gm.render_view(render_prologue=False).get_render_output(), serial)
+
+        gm = GroupModel(object_models=[ObjectModel(row, oms) for row in rows],\
+            align=True, format_processes=2)
+        with mock.patch.object(defaults, 'format_processes_min_rows', 10):
+            output = gm.render_view(render_prologue=False).get_render_output()
+
+        #- picklable formatters ran in the workers; the lambda and str ran here
+        self.assertNotIn('@parent', output)
+        self.assertEqual(output, serial.replace('@parent', '@worker'))
+        self.assertIn('ROW49', output)
+        self.assertEqual(compile_spec(gm.object_models[0])[0].names, ('n',))
+
+    def test_format_processes_errors(self):
+        """Test that chunks failing in the pool are logged once and redone here"""
+        class Row(object):
+            def __init__(self, n):
+                self.n = n
+
+        oms = ObjectModelSpec(attributes=[('n', None, format_odd)])
+        gm = GroupModel(object_models=[ObjectModel(Row(n), oms) for n in range(40)],\
+            format_processes=2)
+        with mock.patch.object(defaults, 'format_processes_min_rows', 10),\
+            self.assertLogs('kaleidoscope.parallel', level='ERROR') as logs,\
+            self.assertRaises(ValueError):
+            gm.render_view()
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('formatting 40 of 40 rows in the pool failed', logs.output[0])
+
+
+    def test_render_table(self):
+        """Test that a columnar RenderTable renders like the per object models"""
+        objects = [self.simple1, self.simple3, self.simple4]
+        def flavor_lines(flavors):
+            return list(flavors)
+        spec = ObjectModelSpec(attributes=[('name', 4), ('flavors', None, flavor_lines),\
+            'mood'])
+        for align in (True, False):
+            colors = ['green', 'yellow']
+            expected = GroupModel(object_models=[ObjectModel(obj_x, spec) for obj_x in\
+                objects], colors=colors, align=align).render_view().get_render_output()
+            table_view = GroupModel(colors=colors, align=align).render_table_view(objects,\
+                spec)
+            self.assertEqual(table_view.get_render_output(), expected)
+
+        table = GroupModel().make_table(objects, spec)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(list(table.line_counts[1]), [3, 3, 2])
+        self.assertEqual(table.column_width(0), 4)
+        self.assertEqual(table.column_width(1), len('mint chocolate chip'))
+        self.assertEqual(table.get_lines(1, 2), ['caramel', 'dead rodent guts'])
+
+        #- rows read in a thread pool end up in the same places
+        threaded = GroupModel(fetch_workers=4).make_table(objects, spec)
+        for m in range(3):
+            for n in range(3):
+                self.assertEqual(threaded.get_lines(m, n), table.get_lines(m, n))
+
+
+
+
+
 class TestCollectionModel(unittest.TestCase):
     """Test the CollectionModel class"""
     def setUp():
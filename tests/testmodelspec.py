@@ -1,6 +1,7 @@
 """Test the model specifications"""
 import unittest
 from kaleidoscope.spec.object import ObjectModelSpec
+from kaleidoscope.spec.attribute import compile_accessor
 
 class Simple(object):
     def __init__(self):
@@ -18,5 +19,14 @@ class TestObjectModelSpec(unittest.TestCase):
         self.assertEqual(next(oms.colors).color, 'bright green on black')
         self.assertEqual(oms.attributes[0].name,'simple_attribute')
 
+    def test_attribute_accessor(self):
+        oms = ObjectModelSpec(attributes=['simple_attribute', "dict_attribute['key1']",\
+            'list_attribute.__len__()'])
+        accessors = [attr.accessor for attr in oms.attributes]
+        self.assertEqual(accessors[0](self.simple), '_simple_value_')
+        self.assertEqual(accessors[1](self.simple), 'value1')
+        self.assertEqual(accessors[2](self.simple), 6)
+        self.assertIs(accessors[1], compile_accessor("dict_attribute['key1']"))
+
 if __name__ == '__main__':
     unittest.main()
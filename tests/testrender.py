@@ -1,6 +1,35 @@
 """Test the render.color module"""
+import asyncio
+import contextlib
+import gc
+import io
+import itertools
+import re
+import tempfile
 import unittest
+from unittest import mock
+import kaleidoscope.defaults as defaults
 from kaleidoscope.rendersys import Render
+from kaleidoscope.spec import ObjectModelSpec
+from kaleidoscope.cellcache import CellCache
+from kaleidoscope.watch import Watcher
+from kaleidoscope.color import Color
+from kaleidoscope.model.attribute import spec_columns
+from thewired import NamespaceLookupError
+
+#- Render() caches the parsed object spec file; keep that out of the real cache dir
+_cache_dir = None
+_cache_dir_patch = None
+
+def setUpModule():
+    global _cache_dir, _cache_dir_patch
+    _cache_dir = tempfile.TemporaryDirectory()
+    _cache_dir_patch = mock.patch.object(defaults, 'cache_dir', _cache_dir.name)
+    _cache_dir_patch.start()
+
+def tearDownModule():
+    _cache_dir_patch.stop()
+    _cache_dir.cleanup()
 
 class SimpleClass(object):
     def __init__(self, *args,**kwargs):
@@ -8,6 +37,39 @@ class SimpleClass(object):
             setattr(self,k,v)
 
 
+class FakeTerminal(object):
+    """TerminalWriter stand-in that keeps the screen as a list of lines"""
+    def __init__(self, height=100):
+        self.height = height
+        self.screen = list()
+        self.cursor = 0
+        self.ops = list()
+
+    def clear(self):
+        self.ops.append(('clear',))
+        self.screen = list()
+        self.cursor = 0
+
+    def move_to(self, line):
+        self.cursor = line
+
+    def write_line(self, text):
+        self.ops.append(('write', self.cursor))
+        while len(self.screen) <= self.cursor:
+            self.screen.append('')
+        self.screen[self.cursor] = re.sub(r'\x1b\[[0-9;]*m', '', text)
+
+    def flush(self):
+        pass
+
+    def get_height(self):
+        return self.height
+
+    def take_ops(self):
+        ops, self.ops = self.ops, list()
+        return ops
+
+
 class TestRenderingEngine(unittest.TestCase):
     def setUp(self):
         self.r = Render()
@@ -21,5 +83,439 @@ class TestRenderingEngine(unittest.TestCase):
         l_specname = self.r.make_default_specname_from_object(l)
         self.assertEqual('builtins.int', l_specname)
 
+    def test_builtin_specname_generator(self):
+        l_specname = self.r.make_default_specname_from_object(x for x in [1,2,3])
+        self.assertEqual('builtins.int', l_specname)
+
+    def test_render_stream(self):
+        output = io.StringIO()
+        def objects():
+            for n in range(3):
+                if n > 0:
+                    #- previous rows were written before this one was produced
+                    self.assertEqual(output.getvalue().count('\n'), n)
+                yield SimpleClass(a='A{}'.format(n), b='B{}'.format(n))
+
+        count = self.r.render_stream(objects(), attributes=['a', 'b'], file=output)
+        self.assertEqual(count, 3)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn('A2', lines[2])
+
+    def test_render_stream_empty(self):
+        output = io.StringIO()
+        self.assertEqual(self.r.render_stream(iter([]), attributes=['a'], file=output), 0)
+        self.assertEqual(output.getvalue(), '')
+
+    def test_spec_cache(self):
+        resolve = mock.Mock(side_effect=lambda specname:\
+            ObjectModelSpec(colors=['red', 'blue'], attributes=['a']))
+        with mock.patch.object(self.r, '_resolve_object_spec', resolve):
+            spec = self.r.lookup_object_spec('test.SimpleClass')
+            first_color = next(spec.colors)
+            #- a cache hit is a copy with its own color cycles, sharing the columns
+            other = self.r.lookup_object_spec('test.SimpleClass')
+            self.assertIsNot(other, spec)
+            self.assertEqual(next(spec.colors), Color('blue'))
+            self.assertEqual(next(other.colors), first_color)
+            self.assertEqual(next(spec.colors), first_color)
+            self.assertEqual(spec_columns(other), spec_columns(spec))
+            self.assertEqual(resolve.call_count, 1)
+
+            self.r.init_object_spec_ns()
+            self.assertNotEqual(spec_columns(self.r.lookup_object_spec('test.SimpleClass')),\
+                spec_columns(spec))
+            self.assertEqual(resolve.call_count, 2)
+
+    def test_resolve_object_spec(self):
+        class SubClass(SimpleClass):
+            pass
+
+        class Proxy(object):
+            def __init__(self, wrapped):
+                self.wrapped = wrapped
+            @property
+            def __class__(self):
+                return self.wrapped.__class__
+
+        specname = Render.make_specname_from_class(SimpleClass)
+        known = {specname, 'styled'}
+        def lookup(specname):
+            if specname not in known:
+                raise NamespaceLookupError(specname)
+        lookup = mock.Mock(side_effect=lookup)
+        resolve = mock.Mock(side_effect=lambda specname:\
+            ObjectModelSpec(attributes=['a'], description=specname))
+
+        with mock.patch.object(self.r.spec.object, '_lookup', lookup),\
+            mock.patch.object(self.r, '_resolve_object_spec', resolve):
+            spec = self.r.resolve_object_spec(SubClass(a=1))
+            self.assertEqual(spec.description, specname)
+            lookups = lookup.call_count
+            #- subclasses and proxies resolve from the class cache, to copies of the
+            #- same cached spec
+            self.assertEqual(spec_columns(self.r.resolve_object_spec(SubClass(a=2))),\
+                spec_columns(spec))
+            self.assertEqual(spec_columns(self.r.resolve_object_spec(Proxy(SubClass(a=3)))),\
+                spec_columns(spec))
+            self.assertEqual(lookup.call_count, lookups)
+            self.assertEqual(resolve.call_count, 1)
+
+            #- misses are cached too
+            self.assertIsNone(self.r.resolve_object_spec(1))
+            lookups = lookup.call_count
+            self.assertIsNone(self.r.resolve_object_spec(2))
+            self.assertEqual(lookup.call_count, lookups)
+
+            self.assertEqual(self.r.resolve_object_spec(SimpleClass(style='styled'))\
+                .description, 'styled')
+            self.assertEqual(self.r.resolve_object_spec(1, runtime_key='styled')\
+                .description, 'styled')
+            self.assertIsNone(self.r.resolve_object_spec(1, runtime_key='missing'))
+
+    def test_mixed_types_collection(self):
+        class OtherClass(SimpleClass):
+            pass
+        class Unknown(object):
+            pass
+
+        specs = {
+            Render.make_specname_from_class(SimpleClass) : ObjectModelSpec(attributes=['a']),
+            Render.make_specname_from_class(OtherClass) : ObjectModelSpec(attributes=['b'])
+        }
+        def lookup(specname):
+            if specname not in specs:
+                raise NamespaceLookupError(specname)
+
+        objects = [SimpleClass(a='a0'), OtherClass(b='b0'), Unknown(), SimpleClass(a='a1')]
+        with mock.patch.object(self.r.spec.object, '_lookup', mock.Mock(side_effect=lookup)),\
+            mock.patch.object(self.r, '_resolve_object_spec', specs.get):
+            self.assertEqual(list(self.r.partition_by_type(objects).values()),\
+                [[objects[0], objects[3]], [objects[1]], [objects[2]]])
+            with self.assertLogs('kaleidoscope.rendersys', level='WARNING'):
+                collection_model = self.r.make_collection_model(objects)
+
+        self.assertEqual([len(g.object_models) for g in collection_model.group_models],\
+            [2, 1])
+        self.assertEqual(collection_model.get_source(), [objects[0], objects[3], objects[1]])
+        output = collection_model.render_view().get_render_output()
+        self.assertEqual(re.sub(r'\x1b\[[0-9;]*m', '', output), '0: a0\n1: a1\n0: b0')
+
+    def test_collection_shared_spec(self):
+        class Base(SimpleClass):
+            pass
+        class A(Base):
+            pass
+        class B(Base):
+            pass
+
+        specs = {Render.make_specname_from_class(Base) : ObjectModelSpec(attributes=['a'])}
+        def lookup(specname):
+            if specname not in specs:
+                raise NamespaceLookupError(specname)
+
+        objects = [A(a=1), B(a=2), A(a=3)]
+        with mock.patch.object(self.r.spec.object, '_lookup', mock.Mock(side_effect=lookup)),\
+            mock.patch.object(self.r, '_resolve_object_spec', specs.get):
+            collection_model = self.r.make_collection_model(objects)
+
+        #- subclasses that resolve to the same spec share its group
+        self.assertEqual([len(g.object_models) for g in collection_model.group_models],\
+            [3])
+        self.assertEqual(collection_model.group_models[0].name,\
+            Render.make_specname_from_class(Base))
+
+    def test_collection_styles(self):
+        specs = {
+            Render.make_specname_from_class(SimpleClass) : ObjectModelSpec(attributes=['a']),
+            'fancy' : ObjectModelSpec(attributes=['b'])
+        }
+        def lookup(specname):
+            if specname not in specs:
+                raise NamespaceLookupError(specname)
+
+        objects = [SimpleClass(a='a0', b='b0'), SimpleClass(a='a1', b='b1', style='fancy'),\
+            SimpleClass(a='a2', b='b2', style='no_such_style')]
+        with mock.patch.object(self.r.spec.object, '_lookup', mock.Mock(side_effect=lookup)),\
+            mock.patch.object(self.r, '_resolve_object_spec', specs.get):
+            collection_model = self.r.make_collection_model(objects)
+
+        #- a style takes priority over the class, like in resolve_object_spec
+        self.assertEqual([g.name for g in collection_model.group_models],\
+            [Render.make_specname_from_class(SimpleClass), 'fancy'])
+        self.assertEqual(collection_model.get_source(), [objects[0], objects[2], objects[1]])
+        output = collection_model.render_view().get_render_output()
+        self.assertEqual(re.sub(r'\x1b\[[0-9;]*m', '', output), '0: a0\n1: a2\n0: b1')
+
+    def test_columns_once_per_render(self):
+        spec = ObjectModelSpec(attributes=['a'])
+        objects = [SimpleClass(a=n) for n in range(20)]
+        with mock.patch('kaleidoscope.model.object.spec_columns',\
+            side_effect=AssertionError), contextlib.redirect_stdout(io.StringIO()):
+            self.r.render_object(objects, spec=spec)
+            self.r.render_stream(objects, spec=spec)
+
+    def test_lookup_model_spec(self):
+        spec_map = {'SimpleClass' : 'by class', 'styled' : 'by style', 'key' : 'by key'}
+        class SubClass(SimpleClass):
+            pass
+        self.assertEqual(self.r.lookup_model_spec(SubClass(), spec_map=spec_map),\
+            'by class')
+        self.assertEqual(self.r.lookup_model_spec(SubClass(style='styled'),\
+            spec_map=spec_map), 'by style')
+        self.assertEqual(self.r.lookup_model_spec(SubClass(), runtime_key='key',\
+            spec_map=spec_map), 'by key')
+        self.assertIsNone(self.r.lookup_model_spec(1, spec_map=spec_map))
+
+    def test_instrument(self):
+        collected = list()
+        stats = self.r.instrument(callback=collected.append)
+        objects = [SimpleClass(a='A{}'.format(n), b='B{}'.format(n)) for n in range(4)]
+        self.r.render_stream(objects, attributes=['a', 'b'], file=io.StringIO())
+        self.r.render_stream(objects, attributes=['a', 'b'], file=io.StringIO())
+
+        #- one callback per top level render call
+        self.assertEqual(len(collected), 2)
+        self.assertEqual(stats.rows, 8)
+        self.assertGreater(stats.bytes_emitted, 0)
+        for stage in ('model_construction', 'attribute_fetch', 'formatting', 'layout',\
+            'emission'):
+            self.assertGreater(stats.stage_times[stage], 0, stage)
+        self.assertEqual(set(name for name, _ in stats.slowest_attributes()), {'a', 'b'})
+        self.assertEqual(stats.formatter_calls['builtins.str'], 16)
+
+        self.assertIsNone(self.r.instrument(False))
+        self.r.render_stream(objects, attributes=['a', 'b'], file=io.StringIO())
+        self.assertEqual(len(collected), 2)
+
+    def test_render_async(self):
+        output = io.StringIO()
+        in_flight = list()
+        max_in_flight = list([0])
+
+        class AsyncClass(SimpleClass):
+            @property
+            async def slow(self):
+                in_flight.append(self)
+                max_in_flight[0] = max(max_in_flight[0], len(in_flight))
+                #- later objects finish first
+                await asyncio.sleep(0.01 * (5 - self.n))
+                in_flight.remove(self)
+                return 'S{}'.format(self.n)
+
+        async def shout(value):
+            await asyncio.sleep(0)
+            return value.upper()
+
+        async def objects():
+            for n in range(5):
+                if n == 4:
+                    #- everything but the object still being formatted is written
+                    self.assertEqual(output.getvalue().count('\n'), 3)
+                yield AsyncClass(n=n, a='a{}'.format(n))
+
+        count = asyncio.run(self.r.render_async(objects(),\
+            attributes=['slow', ('a', None, shout)], file=output, concurrency=2))
+        self.assertEqual(count, 5)
+        self.assertLessEqual(max_in_flight[0], 2)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 5)
+        for n, line in enumerate(lines):
+            self.assertIn('S{}'.format(n), line)
+            self.assertIn('A{}'.format(n), line)
+
+    def test_render_async_sync_iterable(self):
+        output = io.StringIO()
+        objects = [SimpleClass(a='A{}'.format(n), b='B{}'.format(n)) for n in range(3)]
+        stats = self.r.instrument()
+        count = asyncio.run(self.r.render_async(objects, attributes=['a', 'b'],\
+            file=output, align_window=3, header=True))
+        #- header plus the objects
+        self.assertEqual(count, 4)
+        self.assertEqual(stats.rows, 4)
+        self.assertEqual(stats.formatter_calls['builtins.str'], 6)
+        self.assertIn('A2', output.getvalue().splitlines()[3])
+        self.assertEqual(asyncio.run(self.r.render_async(iter([]), attributes=['a'],\
+            file=output)), 0)
+
+    def test_watch(self):
+        terminal = FakeTerminal()
+        formatted = list()
+        def format_state(state):
+            formatted.append(state)
+            return state
+        spec = ObjectModelSpec(attributes=['name', ('state', None, format_state)],\
+            key='name')
+        polls = [
+            [SimpleClass(name='a', state='up'), SimpleClass(name='b', state='up')],
+            #- nothing changed
+            [SimpleClass(name='a', state='up'), SimpleClass(name='b', state='up')],
+            #- one row changed, same width
+            [SimpleClass(name='a', state='up'), SimpleClass(name='b', state='dn')],
+            #- a column got wider
+            [SimpleClass(name='a', state='stopped'), SimpleClass(name='b', state='dn')],
+            #- a row went away
+            [SimpleClass(name='b', state='dn')]]
+        screens = list()
+        def sleep(seconds):
+            screens.append((list(terminal.screen), terminal.take_ops()))
+
+        watcher = self.r.watch(lambda: polls[len(screens)], spec=spec, writer=terminal,\
+            count=len(polls), sleep=sleep)
+        sleep(0)
+
+        self.assertEqual(screens[0][0], ['0: a | up', '1: b | up'])
+        self.assertEqual(screens[0][1], [('clear',), ('write', 0), ('write', 1)])
+        self.assertEqual(screens[1], (screens[0][0], list()))
+        self.assertEqual(screens[2], (['0: a | up', '1: b | dn'], [('write', 1)]))
+        self.assertEqual(screens[3][0], ['0: a | stopped', '1: b | dn     '])
+        self.assertEqual(screens[3][1][0], ('clear',))
+        self.assertEqual(screens[4][0], ['0: b | dn'])
+        #- unchanged rows are not formatted again
+        self.assertEqual(formatted, ['up', 'up', 'dn', 'stopped'])
+        self.assertEqual(watcher.key, 'name')
+
+        with self.assertRaises(ValueError):
+            self.r.watch([SimpleClass(name='a')], attributes=['name'], writer=terminal,\
+                count=1)
+
+    def test_watch_terminal_height(self):
+        terminal = FakeTerminal(height=4)
+        spec = ObjectModelSpec(attributes=['name', 'state'], key='name')
+        watcher = Watcher(spec, writer=terminal)
+        def objects(**states):
+            return [SimpleClass(name=name, state=states.get(name, 'up')) for name in\
+                'abcde']
+
+        #- 3 lines for rows (one is kept free for the cursor) and one of them for the rest
+        self.assertEqual(watcher.refresh(objects()), 2)
+        self.assertEqual(terminal.screen, ['0: a | up', '1: b | up', '... 3 more'])
+        terminal.take_ops()
+
+        watcher.refresh(objects(b='dn'))
+        self.assertEqual(terminal.take_ops(), [('write', 1)])
+        #- rows that aren't on the screen aren't drawn
+        self.assertEqual(watcher.refresh(objects(b='dn', e='dn')), 0)
+        self.assertEqual(terminal.take_ops(), list())
+        self.assertEqual(len(terminal.screen), 3)
+
+        terminal.height = 10
+        watcher.refresh(objects(b='dn', e='dn'))
+        self.assertEqual(terminal.screen, ['0: a | up', '1: b | dn', '2: c | up',\
+            '3: d | up', '4: e | dn'])
+
+    def test_watch_duplicate_keys(self):
+        terminal = FakeTerminal()
+        spec = ObjectModelSpec(attributes=['name', 'az'], key='name')
+        watcher = Watcher(spec, writer=terminal)
+        watcher.refresh([SimpleClass(name='web', az='a')])
+        screen = list(terminal.screen)
+        with self.assertRaises(ValueError):
+            watcher.refresh([SimpleClass(name='web', az='a'), SimpleClass(name='web',\
+                az='b')])
+        self.assertEqual(terminal.screen, screen)
+
+    def test_cell_cache(self):
+        formatted = list()
+        def format_state(state):
+            formatted.append(state)
+            return state.upper()
+        spec = ObjectModelSpec(attributes=['name', ('state', None, format_state)])
+        cache = CellCache()
+        r = Render(cell_cache=cache)
+        objects = [SimpleClass(name='a', state='up'), SimpleClass(name='b', state='dn')]
+        def render(objects):
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                r.render_object(objects, spec=spec)
+            return output.getvalue()
+
+        first = render(objects)
+        self.assertIn('UP', first)
+        self.assertEqual(formatted, ['up', 'dn'])
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 4, 4))
+
+        #- unchanged objects are neither fetched nor formatted again
+        objects[0].state = 'changed'
+        self.assertEqual(render(objects), first)
+        self.assertEqual(formatted, ['up', 'dn'])
+        self.assertEqual((cache.hits, cache.misses), (4, 4))
+
+        cache.invalidate(objects[0])
+        self.assertIn('CHANGED', render(objects))
+        self.assertEqual(formatted, ['up', 'dn', 'changed'])
+
+        #- cells go away with their objects
+        del objects[1]
+        gc.collect()
+        render(objects)
+        self.assertEqual(len(cache), 2)
+
+    def test_cell_cache_fingerprint_and_eviction(self):
+        formatted = list()
+        def format_state(state):
+            formatted.append(state)
+            return state
+        spec = ObjectModelSpec(attributes=[('state', None, format_state)])
+        cache = CellCache(maxsize=2, fingerprint=lambda obj: (obj.name, obj.state))
+        r = Render(cell_cache=cache)
+        def render(objects):
+            with contextlib.redirect_stdout(io.StringIO()):
+                r.render_object(objects, spec=spec)
+
+        render([SimpleClass(name='a', state='up'), SimpleClass(name='b', state='up')])
+        #- new objects with the same fingerprint hit; a changed fingerprint misses
+        render([SimpleClass(name='a', state='up'), SimpleClass(name='b', state='dn')])
+        self.assertEqual(formatted, ['up', 'up', 'dn'])
+        self.assertEqual(cache.summary()['hits'], 1)
+        #- the hit made ('a', 'up') more recently used than ('b', 'up')
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(len(cache), 2)
+        render([SimpleClass(name='a', state='up'), SimpleClass(name='b', state='up')])
+        self.assertEqual(formatted, ['up', 'up', 'dn', 'up'])
+
+    def test_render_window(self):
+        formatted = list()
+        def format_name(name):
+            formatted.append(name)
+            return name
+        spec = ObjectModelSpec(attributes=[('name', None, format_name)])
+        objects = [SimpleClass(name='n{}'.format(n)) for n in range(100)]
+        objects[50].name = 'a_much_longer_name'
+        def render(objects, **kwargs):
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                self.r.render_object(objects, spec=spec, **kwargs)
+            return re.sub(r'\x1b\[[0-9;]*m', '', output.getvalue()).split('\n')[:-1]
+
+        self.assertEqual(render(objects, head=2), ['0: n0', '1: n1', '... 98 more'])
+        self.assertEqual(formatted, ['n0', 'n1'])
+        #- indexes are padded to the width of the row count, as without a window
+        self.assertEqual(render(objects, tail=1), ['... 99 more', '99 : n99'])
+        self.assertEqual(render(iter(objects), offset=10, limit=1),\
+            ['... 10 more', '10: n10', '... more'])
+        self.assertEqual(render(itertools.repeat(objects[3]), head=2),\
+            ['0: n3', '1: n3', '... more'])
+        self.assertEqual(formatted, ['n0', 'n1', 'n99', 'n10', 'n3', 'n3'])
+
+        #- mixed types go through a collection
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.r.render_object([1, 2, 3], limit=1)
+        self.assertEqual(re.sub(r'\x1b\[[0-9;]*m', '', output.getvalue()).split('\n')[-2],\
+            '... 2 more')
+
+        with self.assertRaises(ValueError):
+            Render(columnar=True, format_processes=2)
+        with self.assertRaises(ValueError):
+            Render(columnar=True, cell_cache=CellCache())
+
+        r = Render(columnar=True, fetch_workers=4)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            r.render_object(objects, spec=spec, offset=98)
+        self.assertEqual(re.sub(r'\x1b\[[0-9;]*m', '', output.getvalue()).split('\n'),\
+            ['... 98 more', '98 : n98', '99 : n99', ''])
+
 if __name__ == '__main__':
     unittest.main()
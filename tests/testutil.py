@@ -0,0 +1,150 @@
+"""Test the util module"""
+import json
+import os
+import pickle
+import tempfile
+import unittest
+from unittest import mock
+
+from kaleidoscope import util
+
+SPEC_YAML = """
+builtins:
+    int:
+        description: plain ints
+        colors:
+            - green
+        attributes:
+            - real
+            - imag:
+                length: 4
+"""
+
+class TestYamlCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.config_dir = self.tmpdir.name
+        self.cache_dir = os.path.join(self.tmpdir.name, 'cache')
+        self.write_spec(SPEC_YAML)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_spec(self, text, mtime_ns=None):
+        filepath = os.path.join(self.config_dir, 'objectspec.yaml')
+        with open(filepath, 'wt') as fp:
+            fp.write(text)
+        if mtime_ns is not None:
+            os.utime(filepath, ns=(mtime_ns, mtime_ns))
+
+    def load(self):
+        return util.load_yaml_file('objectspec.yaml', dir=self.config_dir,\
+            cache_dir=self.cache_dir)
+
+    def test_plain_data(self):
+        data = self.load()
+        self.assertIs(type(data), dict)
+        self.assertIs(type(data['builtins']['int']['attributes']), list)
+        self.assertEqual(data['builtins']['int']['attributes'][1], {'imag' : {'length' : 4}})
+        self.assertEqual(data, util.load_yaml_file('objectspec.yaml', dir=self.config_dir))
+
+    def test_cache_skips_parsing(self):
+        data = self.load()
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        with mock.patch.object(util, 'parse_yaml') as parse_yaml:
+            self.assertEqual(self.load(), data)
+            #- touched, not changed: the contents hash the same
+            os.utime(os.path.join(self.config_dir, 'objectspec.yaml'), ns=(1, 1))
+            self.assertEqual(self.load(), data)
+        parse_yaml.assert_not_called()
+
+    def test_cache_invalidated_by_change(self):
+        self.write_spec(SPEC_YAML, mtime_ns=1)
+        self.load()
+        self.write_spec(SPEC_YAML.replace('plain ints', 'changed'), mtime_ns=2)
+        self.assertEqual(self.load()['builtins']['int']['description'], 'changed')
+
+    def test_cache_hit_skips_reading(self):
+        data = self.load()
+        filepath = os.path.realpath(os.path.join(self.config_dir, 'objectspec.yaml'))
+        with mock.patch('builtins.open', side_effect=open) as opened:
+            self.assertEqual(self.load(), data)
+        self.assertNotIn(filepath, [call_x.args[0] for call_x in opened.call_args_list])
+
+    def test_broken_cache(self):
+        self.load()
+        for name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, name), 'wb') as fp:
+                fp.write(b'not json')
+        self.assertEqual(self.load()['builtins']['int']['description'], 'plain ints')
+
+    def test_cache_is_json(self):
+        self.load()
+        for name in os.listdir(self.cache_dir):
+            #- a pickle in its place is never loaded
+            with open(os.path.join(self.cache_dir, name), 'wb') as fp:
+                pickle.dump({'version' : util._YAML_CACHE_VERSION}, fp)
+        with mock.patch.object(pickle, 'load', side_effect=AssertionError),\
+            mock.patch.object(pickle, 'loads', side_effect=AssertionError):
+            self.assertEqual(self.load()['builtins']['int']['description'], 'plain ints')
+        for name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, name), 'rt') as fp:
+                self.assertEqual(json.load(fp)['data']['builtins']['int']['colors'],\
+                    ['green'])
+
+    def test_data_json_cant_hold(self):
+        self.write_spec('1: one\n2: two\n')
+        self.assertEqual(self.load(), {1 : 'one', 2 : 'two'})
+        self.assertFalse(os.path.exists(self.cache_dir) and os.listdir(self.cache_dir))
+        self.assertEqual(self.load(), {1 : 'one', 2 : 'two'})
+
+
+class TestWindow(unittest.TestCase):
+    def test_sequence(self):
+        self.assertEqual(util.window(list(range(10)), offset=2, limit=3), ([2, 3, 4], 2, 5))
+        self.assertEqual(util.window(range(10), offset=8, limit=5), ([8, 9], 8, 0))
+        self.assertEqual(util.window((1, 2, 3), offset=5), ([], 3, 0))
+
+    def test_sequence_tail_only_indexes_the_tail(self):
+        seen = list()
+        class Recorded(list):
+            def __getitem__(self, index):
+                seen.append(index)
+                return super().__getitem__(index)
+            def __iter__(self):
+                raise AssertionError("iterated through the whole sequence")
+
+        self.assertEqual(util.window(Recorded(range(1000)), tail=2), ([998, 999], 998, 0))
+        self.assertEqual(seen, [998, 999])
+
+    def test_iterator(self):
+        #- how many are left after the window isn't known without a len()
+        self.assertEqual(util.window(iter(range(10)), offset=2, limit=3),\
+            ([2, 3, 4], 2, None))
+        self.assertEqual(util.window(iter(range(10)), offset=7, limit=3), ([7, 8, 9], 7, 0))
+        self.assertEqual(util.window(iter(range(10)), offset=12), ([], 10, 0))
+        self.assertEqual(util.window(iter(range(10)), tail=3), ([7, 8, 9], 7, 0))
+        self.assertEqual(util.window(iter(range(10)), limit=0), ([], 0, None))
+        self.assertEqual(util.window({1, 2, 3}, limit=1)[1:], (0, 2))
+        self.assertEqual(util.window({1, 2, 3}, tail=1)[1:], (2, 0))
+
+    def test_endless_iterator(self):
+        pulled = list()
+        def endless():
+            n = 0
+            while True:
+                pulled.append(n)
+                yield n
+                n += 1
+
+        self.assertEqual(util.window(endless(), offset=2, limit=3), ([2, 3, 4], 2, None))
+        #- one past the window to see that there are more
+        self.assertEqual(len(pulled), 6)
+
+    def test_tail_with_offset(self):
+        with self.assertRaises(ValueError):
+            util.window([1, 2], offset=1, tail=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
+import os
 import unittest
+from kaleidoscope.color import ColoredText
 from kaleidoscope.view.attribute import AttributeView
 from kaleidoscope.view.object import ObjectView
+from kaleidoscope.view.group import GroupView
 
 class TestAttributeView(unittest.TestCase):
     def test_init(self):
@@ -20,9 +23,29 @@ class TestObjectView(unittest.TestCase):
         self.assertEqual(ov.get_render_output(),'1_test_attribute | 2_test_attribute') 
 
 
+    def test_multiline_stanza(self):
+        av1 = AttributeView('a\nbbb')
+        av2 = AttributeView('c')
+        ov = ObjectView([av1, av2], delimiters=[' | '], prologue=ColoredText('0: ', None))
+        self.assertEqual(ov.get_render_output(limit_to_screen=False),\
+            '0: a   | c\nbbb    |  ')
+
+    def test_single_attribute(self):
+        ov = ObjectView([AttributeView('single')], delimiters=[])
+        self.assertEqual(ov.get_render_output(), 'single')
+
+    def test_limit_to_screen(self):
+        ov = ObjectView(self.avs, delimiters=[' | '])
+        ov.term_size = os.terminal_size((20, 24))
+        self.assertEqual(ov.get_render_output(), '1_test_attribute | 2')
+        self.assertEqual(ov.get_render_output(limit_to_screen=False),\
+            '1_test_attribute | 2_test_attribute')
+
+
 class TestGroupView(unittest.TestCase):
-    def setup(self):
-        pass
+    def test_render_output(self):
+        ovs = [ObjectView([AttributeView(str(n))], delimiters=[]) for n in range(3)]
+        self.assertEqual(GroupView(object_views=ovs).get_render_output(), '0\n1\n2')
         
 
 